@@ -9,6 +9,7 @@ lazy-loading skill content on demand.
 from __future__ import annotations
 
 import asyncio
+import os
 from pathlib import Path
 from typing import AsyncIterator, Self
 
@@ -42,6 +43,9 @@ class SkillManager:
 
     SKILL_FILENAME = "SKILL.md"
 
+    # Maximum SKILL.md files read concurrently during discovery
+    DISCOVER_CONCURRENCY = 32
+
     def __init__(
         self,
         skill_paths: list[Path] | None = None,
@@ -143,31 +147,70 @@ class SkillManager:
         return self._metadata_index
 
     async def _scan_directory(self, directory: Path) -> AsyncIterator[Skill]:
-        """Scan a directory for SKILL.md files."""
+        """
+        Scan a directory for SKILL.md files.
+
+        Files are read concurrently in worker threads and parsed on the
+        event loop; skills are yielded in directory order.
+        """
         if not directory.is_dir():
             return
 
-        # Look for SKILL.md in subdirectories
-        for subdir in directory.iterdir():
-            if subdir.is_dir():
-                skill_file = subdir / self.SKILL_FILENAME
-                if skill_file.exists():
-                    try:
-                        # Only load metadata for discovery
-                        skill = self.parser.parse_file(skill_file, metadata_only=True)
-                        yield skill
-                    except Exception as e:
-                        # Log error but continue scanning
-                        print(f"Warning: Failed to parse {skill_file}: {e}")
+        skill_files = await asyncio.to_thread(self._find_skill_files, directory)
+        semaphore = asyncio.Semaphore(self.DISCOVER_CONCURRENCY)
+
+        async def read(path: Path) -> bytes:
+            async with semaphore:
+                return await asyncio.to_thread(self._read_file, path)
+
+        contents = await asyncio.gather(
+            *(read(path) for path, _ in skill_files), return_exceptions=True
+        )
+        for (skill_file, warn), content in zip(skill_files, contents):
+            try:
+                if isinstance(content, BaseException):
+                    raise content
+                # Only load metadata for discovery
+                skill = self.parser.parse_bytes(
+                    content, source_path=skill_file, metadata_only=True
+                )
+            except Exception as e:
+                # Log error but continue scanning
+                if warn:
+                    print(f"Warning: Failed to parse {skill_file}: {e}")
+                continue
+            yield skill
+
+    def _find_skill_files(self, directory: Path) -> list[tuple[Path, bool]]:
+        """
+        List the SKILL.md files of a skills directory.
+
+        Returns:
+            (path, warn_on_error) pairs: one per subdirectory containing a
+            SKILL.md, then the directory's own SKILL.md if present
+        """
+        found = []
+        # scandir entries know their type, so subdirectories cost no stat
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    skill_file = os.path.join(entry.path, self.SKILL_FILENAME)
+                    if os.path.exists(skill_file):
+                        found.append((Path(skill_file), True))
 
         # Also check for SKILL.md in the directory itself
         direct_skill = directory / self.SKILL_FILENAME
         if direct_skill.exists():
-            try:
-                skill = self.parser.parse_file(direct_skill, metadata_only=True)
-                yield skill
-            except Exception:
-                pass
+            found.append((direct_skill, False))
+        return found
+
+    @staticmethod
+    def _read_file(path: Path) -> bytes:
+        """Read a whole file with a single read sized from fstat."""
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            # Files reporting no size (e.g. pseudo files) are read to EOF
+            return f.read(size) if size else f.readall()
 
     def _register_skill(self, skill: Skill) -> None:
         """Register a skill in the internal index."""
@@ -430,10 +473,9 @@ class SkillManager:
         sandbox_uploads = "/home/gem/uploads"
         await client.mkdir(sandbox_uploads)
 
-        # Upload file
-        content = local_file.read_bytes()
+        # Upload file (streamed from disk)
         sandbox_path = f"{sandbox_uploads}/{local_file.name}"
-        await client.upload_file(content, sandbox_path)
+        await client.upload_file(local_file, sandbox_path)
 
         return sandbox_path
 
@@ -475,14 +517,13 @@ class SkillManager:
                     else:
                         # Download file
                         try:
-                            content = await client.download_file(file_info.path)
-
                             # Determine local path (preserve subdirectory structure)
                             rel_path = file_info.path.replace(sandbox_path, "").lstrip("/")
                             local_path = local_output_dir / rel_path if rel_path else local_output_dir / file_info.name
                             local_path.parent.mkdir(parents=True, exist_ok=True)
 
-                            local_path.write_bytes(content)
+                            # Stream straight to disk
+                            await client.download_file_to(file_info.path, local_path)
                             downloaded_count += 1
                             logger.progress(f"  已下载: {file_info.name}")
                         except Exception as download_err:
@@ -510,13 +551,16 @@ class SkillManager:
         """
         Get all skill metadata as dictionaries.
 
-        Useful for sending to LLM as a skill catalog.
+        Useful for sending to LLM as a skill catalog. Built from flat dict
+        literals; the lists are shallow copies so callers cannot change the
+        (frozen) metadata behind its precomputed lowercase keys.
         """
         return [
             {
                 "name": m.name,
                 "description": m.description,
-                "triggers": m.triggers,
+                "triggers": list(m.triggers),
+                "tags": list(m.tags),
             }
             for m in self._metadata_index
         ]
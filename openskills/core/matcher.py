@@ -5,10 +5,31 @@ The matcher uses various strategies to find the most relevant infographic-skills
 for a given user input.
 """
 
+import heapq
 import re
 from dataclasses import dataclass
 
 from openskills.models.metadata import SkillMetadata
+from openskills.utils.automaton import KeywordAutomaton
+
+_WORD_RE = re.compile(r"\w+")
+_CJK_RE = re.compile(r"[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]")
+
+# Words ignored when comparing descriptions with a query
+_STOP_WORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will",
+    "would", "could", "should", "may", "might", "must", "shall",
+    "can", "need", "dare", "ought", "used", "to", "of", "in",
+    "for", "on", "with", "at", "by", "from", "as", "into",
+    "through", "during", "before", "after", "above", "below",
+    "between", "under", "again", "further", "then", "once",
+    "here", "there", "when", "where", "why", "how", "all",
+    "each", "few", "more", "most", "other", "some", "such",
+    "no", "nor", "not", "only", "own", "same", "so", "than",
+    "too", "very", "just", "and", "but", "if", "or", "because",
+    "this", "that", "these", "those", "it", "its",
+})
 
 
 @dataclass
@@ -19,6 +40,16 @@ class MatchResult:
     matched_by: str  # What triggered the match
 
 
+@dataclass(slots=True)
+class _SkillKeys:
+    """Query-independent matching keys of one skill."""
+    triggers: list[tuple[str, str, frozenset[str]]]  # (trigger, lowercased, words)
+    exact: dict[str, str]  # lowercased trigger -> first trigger with that form
+    name: str  # lowercased, "-" and "_" replaced by spaces
+    name_words: frozenset[str]
+    desc_words: frozenset[str]
+
+
 class SkillMatcher:
     """
     Skill matching engine.
@@ -29,6 +60,10 @@ class SkillMatcher:
     3. Name match - medium priority
     4. Description keyword match - lower priority
 
+    Per-skill keys are computed once per metadata list: exact triggers are
+    a dict lookup, and contained triggers and tags are found with a single
+    Aho-Corasick scan of the query.
+
     Future improvements could include:
     - Semantic similarity using embeddings
     - LLM-based intent classification
@@ -50,6 +85,15 @@ class SkillMatcher:
         """
         self.min_score = min_score
 
+        # Keys of the last metadata list matched against, rebuilt when the
+        # list's contents change (SkillMetadata is immutable)
+        self._indexed: tuple[SkillMetadata, ...] = ()
+        self._keys: list[_SkillKeys] = []
+        # Lowercased triggers and tags -> (skill position, kind, original)
+        self._automaton: KeywordAutomaton[tuple[int, str, str]] = KeywordAutomaton()
+        # Empty triggers and tags, which every query contains
+        self._always_contained: dict[int, list[tuple[str, str]]] = {}
+
     def match(
         self,
         query: str,
@@ -67,17 +111,75 @@ class SkillMatcher:
         Returns:
             List of matching metadata, sorted by score (highest first)
         """
-        results: list[MatchResult] = []
+        self._prepare(metadata_list)
+
+        query_lower = query.lower().strip()
+        query_words = frozenset(self._tokenize(query_lower))
+
+        # Every trigger and tag contained in the query, from one scan
+        contained = {k: list(v) for k, v in self._always_contained.items()}
+        for _, (position, kind, text) in self._automaton.iter(query_lower):
+            contained.setdefault(position, []).append((kind, text))
 
-        for metadata in metadata_list:
-            result = self._score_match(query, metadata)
+        results: list[MatchResult] = []
+        for position, metadata in enumerate(metadata_list):
+            result = self._score(
+                metadata,
+                self._keys[position],
+                query_lower,
+                query_words,
+                contained.get(position, ()),
+            )
             if result and result.score >= self.min_score:
                 results.append(result)
 
-        # Sort by score descending
-        results.sort(key=lambda r: r.score, reverse=True)
+        # Top results by score; like a stable descending sort, ties keep
+        # catalog order, but only `limit` results are kept ordered
+        top = heapq.nlargest(limit, results, key=lambda r: r.score)
+
+        return [r.metadata for r in top]
+
+    def _prepare(self, metadata_list: list[SkillMetadata]) -> None:
+        """Index the keys of metadata_list unless it is the list indexed last."""
+        if len(metadata_list) == len(self._indexed) and all(
+            a is b for a, b in zip(metadata_list, self._indexed)
+        ):
+            return
+
+        self._indexed = tuple(metadata_list)
+        self._keys = [self._skill_keys(metadata) for metadata in metadata_list]
+        self._automaton = KeywordAutomaton()
+        self._always_contained = {}
+        for position, (metadata, keys) in enumerate(zip(metadata_list, self._keys)):
+            keywords = [("trigger", trigger, lower) for trigger, lower, _ in keys.triggers]
+            keywords += [("tag", *pair) for pair in zip(metadata.tags, metadata._tags_lc)]
+            for kind, text, lower in keywords:
+                if lower:
+                    self._automaton.add(lower, (position, kind, text))
+                else:
+                    self._always_contained.setdefault(position, []).append((kind, text))
+        self._automaton.build()
+
+    def _skill_keys(self, metadata: SkillMetadata) -> _SkillKeys:
+        """
+        Compute the query-independent matching keys of a skill.
 
-        return [r.metadata for r in results[:limit]]
+        Lowercased triggers and tags come precomputed from SkillMetadata.
+        """
+        name = metadata.name.lower().replace("-", " ").replace("_", " ")
+        exact: dict[str, str] = {}
+        for trigger, lower in zip(metadata.triggers, metadata._triggers_lc):
+            exact.setdefault(lower, trigger)
+        return _SkillKeys(
+            triggers=[
+                (trigger, lower, frozenset(self._tokenize(lower)))
+                for trigger, lower in zip(metadata.triggers, metadata._triggers_lc)
+            ],
+            exact=exact,
+            name=name,
+            name_words=frozenset(self._tokenize(name)),
+            desc_words=self._extract_keywords(metadata.description),
+        )
 
     def _score_match(self, query: str, metadata: SkillMetadata) -> MatchResult | None:
         """
@@ -91,93 +193,99 @@ class SkillMatcher:
             MatchResult with score, or None if no match
         """
         query_lower = query.lower().strip()
+        keys = self._skill_keys(metadata)
+        contained = [
+            ("trigger", trigger) for trigger, lower, _ in keys.triggers if lower in query_lower
+        ]
+        contained += [
+            ("tag", tag) for tag, lower in zip(metadata.tags, metadata._tags_lc)
+            if lower in query_lower
+        ]
+        return self._score(
+            metadata, keys, query_lower, frozenset(self._tokenize(query_lower)), contained
+        )
+
+    def _score(
+        self,
+        metadata: SkillMetadata,
+        keys: _SkillKeys,
+        query_lower: str,
+        query_words: frozenset[str],
+        contained: list[tuple[str, str]] | tuple[()],
+    ) -> MatchResult | None:
+        """
+        Score a skill from its precomputed keys.
+
+        Args:
+            metadata: Skill metadata to match against
+            keys: The skill's matching keys
+            query_lower: Lowercased, stripped query
+            query_words: Tokens of the query
+            contained: (kind, text) of the skill's triggers and tags found
+                in the query
+
+        Returns:
+            MatchResult with score, or None if no match
+        """
         best_score = 0.0
         matched_by = ""
 
         # Check exact trigger match
-        for trigger in metadata.triggers:
-            trigger_lower = trigger.lower()
-            if trigger_lower == query_lower:
-                return MatchResult(metadata, self.EXACT_TRIGGER_SCORE, f"exact trigger: {trigger}")
-
-            # Check if trigger is contained in query
-            if trigger_lower in query_lower:
-                # Give higher score for longer triggers (more specific matches)
-                score = self.PARTIAL_TRIGGER_SCORE
-                if score > best_score:
-                    best_score = score
-                    matched_by = f"partial trigger: {trigger}"
-
+        trigger = keys.exact.get(query_lower)
+        if trigger is not None:
+            return MatchResult(metadata, self.EXACT_TRIGGER_SCORE, f"exact trigger: {trigger}")
+
+        # Check if a trigger is contained in the query
+        partial = next((text for kind, text in contained if kind == "trigger"), None)
+        if partial is not None:
+            best_score = self.PARTIAL_TRIGGER_SCORE
+            matched_by = f"partial trigger: {partial}"
+        else:
             # Check if all words in trigger appear in query (for multi-word triggers)
-            trigger_words = set(self._tokenize(trigger_lower))
-            query_words = set(self._tokenize(query_lower))
-            if trigger_words and trigger_words.issubset(query_words):
-                score = self.PARTIAL_TRIGGER_SCORE * 0.9  # Slightly lower than substring match
-                if score > best_score:
-                    best_score = score
+            for trigger, _, trigger_words in keys.triggers:
+                if trigger_words and trigger_words <= query_words:
+                    best_score = self.PARTIAL_TRIGGER_SCORE * 0.9  # Slightly lower than substring
                     matched_by = f"trigger words: {trigger}"
+                    break
 
         # Check name match
-        name_lower = metadata.name.lower().replace("-", " ").replace("_", " ")
-        name_words = set(self._tokenize(name_lower))
-        query_words = set(self._tokenize(query_lower))
-
-        if name_lower in query_lower or query_lower in name_lower:
+        if keys.name in query_lower or query_lower in keys.name:
             score = self.NAME_MATCH_SCORE
             if score > best_score:
                 best_score = score
                 matched_by = f"name: {metadata.name}"
-        elif name_words and name_words.issubset(query_words):
+        elif keys.name_words and keys.name_words <= query_words:
             score = self.NAME_MATCH_SCORE * 0.9
             if score > best_score:
                 best_score = score
                 matched_by = f"name words: {metadata.name}"
 
         # Check description keywords
-        desc_words = self._extract_keywords(metadata.description)
-        query_word_set = set(self._tokenize(query_lower))
-        common_words = desc_words & query_word_set
-
+        common_words = keys.desc_words & query_words
         if common_words:
             # Score based on overlap ratio
-            overlap_ratio = len(common_words) / max(len(desc_words), 1)
+            overlap_ratio = len(common_words) / max(len(keys.desc_words), 1)
             score = self.DESCRIPTION_MATCH_SCORE * (0.5 + overlap_ratio * 0.5)
             if score > best_score:
                 best_score = score
                 matched_by = f"description keywords: {', '.join(common_words)}"
 
         # Check tags
-        for tag in metadata.tags:
-            if tag.lower() in query_lower:
-                score = self.TAG_MATCH_SCORE
-                if score > best_score:
-                    best_score = score
-                    matched_by = f"tag: {tag}"
+        tag = next((text for kind, text in contained if kind == "tag"), None)
+        if tag is not None and self.TAG_MATCH_SCORE > best_score:
+            best_score = self.TAG_MATCH_SCORE
+            matched_by = f"tag: {tag}"
 
         if best_score > 0:
             return MatchResult(metadata, best_score, matched_by)
 
         return None
 
-    def _extract_keywords(self, text: str) -> set[str]:
+    def _extract_keywords(self, text: str) -> frozenset[str]:
         """Extract significant keywords from text."""
         words = self._tokenize(text.lower())
         # Filter out common stop words
-        stop_words = {
-            "a", "an", "the", "is", "are", "was", "were", "be", "been",
-            "being", "have", "has", "had", "do", "does", "did", "will",
-            "would", "could", "should", "may", "might", "must", "shall",
-            "can", "need", "dare", "ought", "used", "to", "of", "in",
-            "for", "on", "with", "at", "by", "from", "as", "into",
-            "through", "during", "before", "after", "above", "below",
-            "between", "under", "again", "further", "then", "once",
-            "here", "there", "when", "where", "why", "how", "all",
-            "each", "few", "more", "most", "other", "some", "such",
-            "no", "nor", "not", "only", "own", "same", "so", "than",
-            "too", "very", "just", "and", "but", "if", "or", "because",
-            "this", "that", "these", "those", "it", "its",
-        }
-        return {w for w in words if len(w) > 2 and w not in stop_words}
+        return frozenset(w for w in words if len(w) > 2 and w not in _STOP_WORDS)
 
     def _tokenize(self, text: str) -> list[str]:
         """Tokenize text into words."""
@@ -186,10 +294,10 @@ class SkillMatcher:
         tokens = []
 
         # Match word characters (including Unicode letters/numbers)
-        words = re.findall(r"[\w]+", text, re.UNICODE)
+        words = _WORD_RE.findall(text)
         for word in words:
             # Check if word contains CJK characters
-            if re.search(r"[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]", word):
+            if _CJK_RE.search(word):
                 # For CJK, also add individual characters and bigrams
                 tokens.append(word)
                 for i in range(len(word)):
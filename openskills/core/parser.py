@@ -5,6 +5,9 @@ Parses SKILL.md files into Skill objects, handling the three-layer
 progressive disclosure structure.
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Any
 
@@ -30,6 +33,20 @@ class SkillParser:
 
     REQUIRED_FIELDS = ["name", "description"]
 
+    # Maximum number of parsed SKILL.md headers kept in the parse cache
+    HEADER_CACHE_SIZE = 1024
+
+    def __init__(self):
+        """Initialize the parser."""
+        # blake2b(content) -> (frontmatter, body, metadata). Keyed by digest
+        # so cached entries do not keep whole file contents alive as keys;
+        # the frontmatter dict is shared and treated as read-only.
+        self._header_cache: OrderedDict[
+            bytes, tuple[dict[str, Any], str, SkillMetadata]
+        ] = OrderedDict()
+        # FileLoader parses from worker threads
+        self._header_lock = threading.Lock()
+
     def parse_file(
         self,
         path: Path,
@@ -49,12 +66,35 @@ class SkillParser:
             FileNotFoundError: If the file doesn't exist
             ValueError: If the file format is invalid
         """
-        if not path.exists():
-            raise FileNotFoundError(f"Skill file not found: {path}")
-
-        content = path.read_text(encoding="utf-8")
+        try:
+            content = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Skill file not found: {path}") from None
         return self.parse_content(content, source_path=path, metadata_only=metadata_only)
 
+    def parse_bytes(
+        self,
+        data: bytes | memoryview,
+        source_path: Path | None = None,
+        metadata_only: bool = False,
+    ) -> Skill:
+        """
+        Parse raw UTF-8 encoded SKILL.md content.
+
+        Accepts any buffer (bytes, memoryview over an mmap, ...) so callers
+        can hand over file contents without an intermediate read copy.
+
+        Args:
+            data: The raw bytes of the SKILL.md file
+            source_path: Optional path to the source file
+            metadata_only: If True, only parse metadata (Layer 1)
+
+        Returns:
+            A Skill object
+        """
+        content = str(data, "utf-8")
+        return self.parse_content(content, source_path=source_path, metadata_only=metadata_only)
+
     def parse_content(
         self,
         content: str,
@@ -72,13 +112,7 @@ class SkillParser:
         Returns:
             A Skill object
         """
-        frontmatter, body = parse_frontmatter(content)
-
-        # Validate required fields
-        self._validate_frontmatter(frontmatter)
-
-        # Parse metadata (Layer 1)
-        metadata = self._parse_metadata(frontmatter)
+        frontmatter, body, metadata = self._parse_header(content)
 
         # Parse resources definition (Layer 3 - definitions only, not content)
         resources = self._parse_resources(frontmatter, source_path)
@@ -99,6 +133,38 @@ class SkillParser:
 
         return skill
 
+    def _parse_header(self, content: str) -> tuple[dict[str, Any], str, SkillMetadata]:
+        """
+        Parse frontmatter, body and metadata (Layer 1), memoized by content.
+
+        Resources are not cached: auto-discovered references depend on the
+        skill directory, not only on the SKILL.md content.
+
+        Returns:
+            (frontmatter, body, metadata); the frontmatter must not be mutated
+        """
+        key = hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest()
+        with self._header_lock:
+            cached = self._header_cache.get(key)
+            if cached is not None:
+                self._header_cache.move_to_end(key)
+                return cached
+
+        frontmatter, body = parse_frontmatter(content)
+
+        # Validate required fields
+        self._validate_frontmatter(frontmatter)
+
+        # Parse metadata (Layer 1)
+        metadata = self._parse_metadata(frontmatter)
+
+        entry = (frontmatter, body, metadata)
+        with self._header_lock:
+            self._header_cache[key] = entry
+            if len(self._header_cache) > self.HEADER_CACHE_SIZE:
+                self._header_cache.popitem(last=False)
+        return entry
+
     def _validate_frontmatter(self, frontmatter: dict[str, Any]) -> None:
         """Validate that required fields are present."""
         missing = [f for f in self.REQUIRED_FIELDS if f not in frontmatter]
@@ -129,26 +195,11 @@ class SkillParser:
 
         # Parse references from frontmatter
         for ref_data in frontmatter.get("references", []):
-            if isinstance(ref_data, dict):
-                # Parse mode field
-                mode_str = ref_data.get("mode", "implicit")
-                try:
-                    mode = ReferenceMode(mode_str)
-                except ValueError:
-                    mode = ReferenceMode.IMPLICIT
-
-                path = ref_data.get("path", "")
-                declared_paths.add(path)
-                references.append(Reference(
-                    path=path,
-                    condition=ref_data.get("condition", ""),
-                    description=ref_data.get("description", ""),
-                    mode=mode,
-                ))
-            elif isinstance(ref_data, str):
-                # Simple path string - default to implicit
-                declared_paths.add(ref_data)
-                references.append(Reference(path=ref_data))
+            # Dict entry, or a simple path string (implicit mode)
+            if isinstance(ref_data, (dict, str)):
+                reference = Reference.from_frontmatter(ref_data)
+                declared_paths.add(reference.path)
+                references.append(reference)
 
         # Auto-discover references from references/ directory
         if source_path:
@@ -160,15 +211,7 @@ class SkillParser:
         # Parse scripts
         for script_data in frontmatter.get("scripts", []):
             if isinstance(script_data, dict):
-                scripts.append(Script(
-                    name=script_data.get("name", ""),
-                    path=script_data.get("path", ""),
-                    description=script_data.get("description", ""),
-                    args=script_data.get("args", []),
-                    timeout=script_data.get("timeout", 30),
-                    sandbox=script_data.get("sandbox", True),
-                    outputs=script_data.get("outputs", []),
-                ))
+                scripts.append(Script.from_frontmatter(script_data))
 
         return SkillResources(references=references, scripts=scripts, dependency=dependency)
 
@@ -196,7 +239,8 @@ class SkillParser:
                     # Create relative path from skill root
                     rel_path = f"references/{item.relative_to(base_path)}"
                     if rel_path not in declared_paths:
-                        discovered.append(Reference(
+                        # Values are built here, nothing to validate
+                        discovered.append(Reference.model_construct(
                             path=rel_path,
                             description=f"Auto-discovered: {item.name}",
                             mode=ReferenceMode.IMPLICIT,
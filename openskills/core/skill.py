@@ -53,6 +53,7 @@ class Skill(BaseModel):
 
     model_config = {
         "arbitrary_types_allowed": True,
+        "defer_build": True,
     }
 
     @property
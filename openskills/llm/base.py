@@ -7,12 +7,57 @@ multimodal messages (text + images).
 
 import base64
 import mimetypes
+import mmap
+import os
+import weakref
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import AsyncIterator, Union
 
+from openskills.utils import jsonlib
+
+
+# Leading bytes of common image formats
+_IMAGE_SIGNATURES = {
+    b"\x89PNG\r\n\x1a\n": "image/png",
+    b"\xff\xd8\xff": "image/jpeg",
+    b"GIF87a": "image/gif",
+    b"GIF89a": "image/gif",
+}
+# Distinct signature lengths: one dict lookup per length, whatever the
+# number of formats
+_SIGNATURE_LENGTHS = tuple(sorted({len(s) for s in _IMAGE_SIGNATURES}, reverse=True))
+
+
+def _sniff_image_type(head: bytes) -> str | None:
+    """Detect an image media type from the first bytes of the file."""
+    for length in _SIGNATURE_LENGTHS:
+        media_type = _IMAGE_SIGNATURES.get(head[:length])
+        if media_type is not None:
+            return media_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+class _EncodedFile:
+    """Base64 payload of an image file, shared by the images loaded from it."""
+
+    __slots__ = ("media_type", "data", "__weakref__")
+
+    def __init__(self, media_type: str | None, data: str):
+        self.media_type = media_type
+        self.data = data
+
+
+# Payloads of live images by (resolved path, mtime_ns, size), so attaching
+# the same file to several messages keeps a single encoded copy in memory
+_encoded_files: "weakref.WeakValueDictionary[tuple[str, int, int], _EncodedFile]" = (
+    weakref.WeakValueDictionary()
+)
+
 
 class ContentType(str, Enum):
     """Type of content in a message."""
@@ -28,7 +73,7 @@ class ImageDetail(str, Enum):
     AUTO = "auto"
 
 
-@dataclass
+@dataclass(slots=True)
 class TextContent:
     """Text content part of a message."""
     type: str = field(default="text", init=False)
@@ -39,7 +84,7 @@ class TextContent:
         return {"type": "text", "text": self.text}
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageContent:
     """
     Image content part of a message.
@@ -55,6 +100,12 @@ class ImageContent:
     file_path: Path | None = None
     media_type: str = "image/jpeg"
     detail: ImageDetail = ImageDetail.AUTO
+    # Shared payload of the loaded file, kept alive while this image is
+    _encoded: _EncodedFile | None = field(default=None, init=False, repr=False, compare=False)
+    # (media_type, base64_data, data URL) of the last get_url() call
+    _data_url: tuple[str, str, str] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     def __post_init__(self):
         """Load image from file if file_path is provided."""
@@ -67,24 +118,50 @@ class ImageContent:
             return
 
         path = Path(self.file_path).expanduser().resolve()
-        if not path.exists():
-            raise FileNotFoundError(f"Image file not found: {path}")
-
-        # Detect media type
-        mime_type, _ = mimetypes.guess_type(str(path))
-        if mime_type:
-            self.media_type = mime_type
-
-        # Read and encode
-        with open(path, "rb") as f:
-            self.base64_data = base64.b64encode(f.read()).decode("utf-8")
+        try:
+            f = open(path, "rb")
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Image file not found: {path}") from None
+
+        with f:
+            stat = os.fstat(f.fileno())
+            key = (str(path), stat.st_mtime_ns, stat.st_size)
+            encoded = _encoded_files.get(key)
+            if encoded is None:
+                if stat.st_size:
+                    # Encoded straight from the mapped file, without a read copy
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        media_type = _sniff_image_type(data[:12])
+                        b64 = base64.b64encode(data)
+                else:
+                    media_type, b64 = None, b""
+                # Content signature first, then the file extension
+                encoded = _EncodedFile(
+                    media_type or mimetypes.guess_type(path.name)[0], b64.decode("ascii")
+                )
+                _encoded_files[key] = encoded
+
+        self._encoded = encoded
+        self.media_type = encoded.media_type or self.media_type
+        self.base64_data = encoded.data
 
     def get_url(self) -> str:
         """Get the image URL (converts base64 to data URL if needed)."""
         if self.url:
             return self.url
         if self.base64_data:
-            return f"data:{self.media_type};base64,{self.base64_data}"
+            # Base64 payloads can be megabytes; build the data URL once per
+            # payload rather than on every serialization
+            cached = self._data_url
+            if (
+                cached is not None
+                and cached[1] is self.base64_data
+                and cached[0] == self.media_type
+            ):
+                return cached[2]
+            url = f"data:{self.media_type};base64,{self.base64_data}"
+            self._data_url = (self.media_type, self.base64_data, url)
+            return url
         raise ValueError("No image data available")
 
     def to_dict(self) -> dict:
@@ -93,7 +170,9 @@ class ImageContent:
             "type": "image_url",
             "image_url": {
                 "url": self.get_url(),
-                "detail": self.detail.value,
+                # ImageDetail is a str enum, so it serializes as its value;
+                # a plain "low"/"high"/"auto" string works as well
+                "detail": self.detail,
             }
         }
 
@@ -102,7 +181,7 @@ class ImageContent:
 MessageContent = Union[TextContent, ImageContent]
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     A chat message with support for multimodal content.
@@ -139,7 +218,7 @@ class Message:
 
     def is_multimodal(self) -> bool:
         """Check if this message contains images."""
-        return len(self.images) > 0
+        return bool(self.images)
 
     def to_api_content(self) -> str | list[dict]:
         """
@@ -147,19 +226,12 @@ class Message:
 
         Returns string for text-only, list for multimodal.
         """
-        if not self.is_multimodal():
+        if not self.images:
             return self.content
 
-        parts = []
-
-        # Add text content first
-        if self.content:
-            parts.append(TextContent(text=self.content).to_dict())
-
-        # Add images
-        for image in self.images:
-            parts.append(image.to_dict())
-
+        # Text content first, then images
+        parts = [{"type": "text", "text": self.content}] if self.content else []
+        parts.extend(image.to_dict() for image in self.images)
         return parts
 
     def to_dict(self) -> dict:
@@ -172,6 +244,10 @@ class Message:
             result["name"] = self.name
         return result
 
+    def to_json_bytes(self) -> bytes:
+        """Serialize the API message to compact UTF-8 JSON (orjson when installed)."""
+        return jsonlib.dumps(self.to_dict())
+
     @classmethod
     def user(cls, content: str, images: list[ImageContent] | None = None) -> "Message":
         """Create a user message."""
@@ -188,12 +264,50 @@ class Message:
         return cls(role="system", content=content)
 
 
-@dataclass
 class ToolCall:
-    """A tool/function call from the model."""
-    id: str
-    name: str
-    arguments: str  # JSON string
+    """
+    A tool/function call from the model.
+
+    Streamed tool calls keep only the raw UTF-8 argument bytes in
+    ``arguments_bytes``, which can be passed to ``json.loads`` directly;
+    the ``arguments`` JSON string is decoded from them on first access.
+    Callers may still construct a ToolCall from an ``arguments`` string.
+    """
+
+    __slots__ = ("id", "name", "_arguments", "arguments_bytes")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        arguments: str | None = None,
+        arguments_bytes: bytes | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self._arguments = arguments
+        self.arguments_bytes = arguments_bytes
+
+    @property
+    def arguments(self) -> str:
+        """Arguments as a JSON string, decoded once from arguments_bytes if needed."""
+        if self._arguments is None:
+            raw = self.arguments_bytes
+            self._arguments = raw.decode("utf-8") if raw is not None else ""
+        return self._arguments
+
+    @arguments.setter
+    def arguments(self, value: str) -> None:
+        self._arguments = value
+        self.arguments_bytes = None
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ToolCall):
+            return NotImplemented
+        return (self.id, self.name, self.arguments) == (other.id, other.name, other.arguments)
+
+    def __repr__(self) -> str:
+        return f"ToolCall(id={self.id!r}, name={self.name!r}, arguments={self.arguments!r})"
 
 
 @dataclass
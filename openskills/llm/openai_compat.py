@@ -5,9 +5,12 @@ Works with OpenAI, Claude (via proxy), and other compatible APIs.
 Supports multimodal messages (text + images).
 """
 
-import json
+import asyncio
+import contextlib
+import io
 import os
-from typing import AsyncIterator
+import random
+from typing import AsyncIterator, NamedTuple
 
 import httpx
 
@@ -19,6 +22,27 @@ from openskills.llm.base import (
     ToolCall,
     ImageContent,
 )
+from openskills.utils import jsonlib
+
+# Marks the end of a stream in the chat_stream producer queue
+_STREAM_END = object()
+
+
+async def _aiter_byte_lines(response: httpx.Response) -> AsyncIterator[bytes]:
+    """
+    Iterate over the raw lines of a streaming response as bytes.
+
+    Unlike ``response.aiter_lines()`` this never decodes the body into
+    ``str``, so SSE payloads can be handed to the JSON parser as-is.
+    """
+    buffer = b""
+    async for chunk in response.aiter_bytes():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.rstrip(b"\r")
+    if buffer:
+        yield buffer.rstrip(b"\r")
 
 
 class OpenAICompatClient(BaseLLMClient):
@@ -68,6 +92,7 @@ class OpenAICompatClient(BaseLLMClient):
         self.timeout = timeout
         self.max_retries = max_retries
 
+        self._headers = self._build_headers()
         self._client = httpx.AsyncClient(
             timeout=httpx.Timeout(timeout),
             limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
@@ -100,25 +125,12 @@ class OpenAICompatClient(BaseLLMClient):
         Returns:
             ChatResponse with the completion
         """
-        request_messages = self._prepare_messages(messages, system)
-
-        payload = {
-            "model": model or self.model,
-            "messages": request_messages,
-            "temperature": temperature,
-            **kwargs,
-        }
-
-        if max_tokens:
-            payload["max_tokens"] = max_tokens
-
-        if tools:
-            payload["tools"] = tools
-            if tool_choice:
-                payload["tool_choice"] = tool_choice
+        payload = self._build_payload(
+            messages, system, temperature, max_tokens, model, tools, tool_choice, **kwargs
+        )
 
         response = await self._make_request(payload)
-        data = response.json()
+        data = jsonlib.loads(response.content)
         choice = data["choices"][0]
         message = choice["message"]
 
@@ -154,6 +166,9 @@ class OpenAICompatClient(BaseLLMClient):
         """
         Send a streaming chat completion request.
 
+        At most OPENSKILLS_STREAM_BUFFER chunks (default 64) are read ahead
+        of the consumer.
+
         Args:
             messages: List of chat messages (can include images)
             system: Optional system prompt
@@ -167,13 +182,63 @@ class OpenAICompatClient(BaseLLMClient):
         Yields:
             StreamChunk objects as they arrive
         """
-        request_messages = self._prepare_messages(messages, system)
+        payload = self._build_payload(
+            messages, system, temperature, max_tokens, model, tools, tool_choice,
+            stream=True, **kwargs,
+        )
+
+        # A producer task reads the SSE stream into a bounded queue. When the
+        # consumer falls behind the queue fills up, the producer stops
+        # reading, and the socket applies backpressure instead of chunks
+        # piling up in memory.
+        queue: asyncio.Queue = asyncio.Queue(
+            maxsize=int(os.getenv("OPENSKILLS_STREAM_BUFFER", "64"))
+        )
+        producer = asyncio.create_task(
+            self._pump_stream(self._chat_url(), self._prepare_payload(payload), queue)
+        )
 
+        try:
+            while True:
+                item = await queue.get()
+                if item is _STREAM_END:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await producer
+
+    async def _pump_stream(self, url: str, payload: dict, queue: asyncio.Queue) -> None:
+        """Feed parsed stream chunks into a queue, ending with a sentinel or error."""
+        try:
+            async with contextlib.aclosing(self._stream_events(url, payload)) as events:
+                async for chunk in events:
+                    await queue.put(chunk)
+        except Exception as e:
+            await queue.put(e)
+            return
+        await queue.put(_STREAM_END)
+
+    def _build_payload(
+        self,
+        messages: list[Message],
+        system: str | None,
+        temperature: float,
+        max_tokens: int | None,
+        model: str | None,
+        tools: list[dict] | None,
+        tool_choice: str | dict | None,
+        **kwargs,
+    ) -> dict:
+        """Build the chat completions request body."""
         payload = {
             "model": model or self.model,
-            "messages": request_messages,
+            "messages": self._prepare_messages(messages, system),
             "temperature": temperature,
-            "stream": True,
             **kwargs,
         }
 
@@ -185,27 +250,45 @@ class OpenAICompatClient(BaseLLMClient):
             if tool_choice:
                 payload["tool_choice"] = tool_choice
 
+        return payload
+
+    def _prepare_payload(self, payload: dict) -> dict:
+        """Hook to adapt the request body for a specific provider."""
+        return payload
+
+    def _chat_url(self) -> str:
+        """Get the chat completions URL."""
+        return f"{self.base_url}/chat/completions"
+
+    async def _stream_events(self, url: str, payload: dict) -> AsyncIterator[StreamChunk]:
+        """POST a streaming request and parse the SSE events into chunks."""
         async with self._client.stream(
             "POST",
-            f"{self.base_url}/chat/completions",
+            url,
             headers=self._get_headers(),
-            json=payload,
+            content=jsonlib.dumps(payload),
         ) as response:
             response.raise_for_status()
 
             # Track tool call accumulation for streaming
             current_tool_calls: dict[int, dict] = {}
 
-            async for line in response.aiter_lines():
-                if not line.startswith("data: "):
+            async for line in _aiter_byte_lines(response):
+                if not line.startswith(b"data: "):
                     continue
 
-                data_str = line[6:]
-                if data_str.strip() == "[DONE]":
+                data_bytes = line[6:]
+                if data_bytes.strip() == b"[DONE]":
                     break
 
+                # A JSON event must end in "}" or "]"; skip fragments cheaply
+                # instead of letting the parser fail on them.
+                if data_bytes.rstrip()[-1:] not in (b"}", b"]"):
+                    continue
+
                 try:
-                    data = json.loads(data_str)
+                    # Both JSON backends decode UTF-8 bytes themselves
+                    data = jsonlib.loads(data_bytes)
                     choice = data["choices"][0]
                     delta = choice.get("delta", {})
                     finish_reason = choice.get("finish_reason")
@@ -222,7 +305,7 @@ class OpenAICompatClient(BaseLLMClient):
                                 current_tool_calls[idx] = {
                                     "id": tc.get("id", ""),
                                     "name": "",
-                                    "arguments": "",
+                                    "arg_buf": io.BytesIO(),
                                 }
                             if "id" in tc:
                                 current_tool_calls[idx]["id"] = tc["id"]
@@ -230,18 +313,20 @@ class OpenAICompatClient(BaseLLMClient):
                                 if "name" in tc["function"]:
                                     current_tool_calls[idx]["name"] = tc["function"]["name"]
                                 if "arguments" in tc["function"]:
-                                    current_tool_calls[idx]["arguments"] += tc["function"]["arguments"]
+                                    current_tool_calls[idx]["arg_buf"].write(
+                                        tc["function"]["arguments"].encode("utf-8")
+                                    )
 
                     # On finish, return accumulated tool calls
                     if finish_reason and current_tool_calls:
-                        tool_calls = [
-                            ToolCall(
+                        tool_calls = []
+                        for tc in current_tool_calls.values():
+                            raw = tc["arg_buf"].getvalue()
+                            tool_calls.append(ToolCall(
                                 id=tc["id"],
                                 name=tc["name"],
-                                arguments=tc["arguments"],
-                            )
-                            for tc in current_tool_calls.values()
-                        ]
+                                arguments_bytes=raw,
+                            ))
 
                     yield StreamChunk(
                         content=content,
@@ -249,39 +334,45 @@ class OpenAICompatClient(BaseLLMClient):
                         tool_calls=tool_calls,
                     )
 
-                except json.JSONDecodeError:
+                except jsonlib.JSONDecodeError:
                     continue
 
-    async def _make_request(
-        self,
-        payload: dict,
-        retries: int = 0,
-    ) -> httpx.Response:
-        """Make an API request with retry logic."""
-        try:
-            response = await self._client.post(
-                f"{self.base_url}/chat/completions",
-                headers=self._get_headers(),
-                json=payload,
-            )
-            response.raise_for_status()
-            return response
-
-        except httpx.HTTPStatusError as e:
-            # Retry on 5xx errors or rate limits
-            if e.response.status_code >= 500 or e.response.status_code == 429:
-                if retries < self.max_retries:
-                    import asyncio
-                    await asyncio.sleep(2 ** retries)  # Exponential backoff
-                    return await self._make_request(payload, retries + 1)
-            raise
-
-        except httpx.RequestError:
-            if retries < self.max_retries:
-                import asyncio
-                await asyncio.sleep(2 ** retries)
-                return await self._make_request(payload, retries + 1)
-            raise
+    async def _make_request(self, payload: dict) -> httpx.Response:
+        """
+        Make an API request with retry logic.
+
+        5xx, 429 and transport errors are retried with exponential backoff
+        (1s, 2s, 4s, ...) plus a little jitter so that parallel callers do
+        not retry in lockstep.
+        """
+        url = self._chat_url()
+        # Serialize once; retries resend the same bytes
+        body = jsonlib.dumps(self._prepare_payload(payload))
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.post(
+                    url,
+                    headers=self._get_headers(),
+                    content=body,
+                )
+                response.raise_for_status()
+                return response
+
+            except httpx.HTTPStatusError as e:
+                # Retry on 5xx errors or rate limits
+                status = e.response.status_code
+                if (status < 500 and status != 429) or attempt >= self.max_retries:
+                    raise
+
+            except httpx.RequestError:
+                if attempt >= self.max_retries:
+                    raise
+
+            delay = 2 ** attempt
+            await asyncio.sleep(delay + random.uniform(0, 0.1) * delay)
+
+        raise AssertionError("unreachable")  # pragma: no cover
 
     def _prepare_messages(
         self,
@@ -289,19 +380,17 @@ class OpenAICompatClient(BaseLLMClient):
         system: str | None,
     ) -> list[dict]:
         """Prepare messages for the API request."""
-        result = []
-
+        # Use the message's to_dict method for proper multimodal support
         if system:
-            result.append({"role": "system", "content": system})
-
-        for msg in messages:
-            # Use the message's to_dict method for proper multimodal support
-            result.append(msg.to_dict())
-
-        return result
+            return [{"role": "system", "content": system}, *(m.to_dict() for m in messages)]
+        return [m.to_dict() for m in messages]
 
     def _get_headers(self) -> dict:
-        """Get request headers."""
+        """Get request headers (built once; httpx does not mutate them)."""
+        return self._headers
+
+    def _build_headers(self) -> dict:
+        """Build request headers."""
         headers = {
             "Content-Type": "application/json",
             **self.default_headers,
@@ -372,17 +461,18 @@ class AzureOpenAIClient(OpenAICompatClient):
         self.model = self.deployment
         self.base_url = self.endpoint
 
+        self._headers = self._build_headers()
         self._client = httpx.AsyncClient(
             timeout=httpx.Timeout(timeout),
             limits=httpx.Limits(max_keepalive_connections=5, max_connections=10),
         )
 
-    def _get_chat_url(self) -> str:
+    def _chat_url(self) -> str:
         """Get the Azure chat completions URL."""
         return f"{self.endpoint}/openai/deployments/{self.deployment}/chat/completions?api-version={self.api_version}"
 
-    def _get_headers(self) -> dict:
-        """Get request headers for Azure."""
+    def _build_headers(self) -> dict:
+        """Build request headers for Azure."""
         headers = {
             "Content-Type": "application/json",
             **self.default_headers,
@@ -391,130 +481,37 @@ class AzureOpenAIClient(OpenAICompatClient):
             headers["api-key"] = self.api_key
         return headers
 
-    async def _make_request(
-        self,
-        payload: dict,
-        retries: int = 0,
-    ) -> httpx.Response:
-        """Make an API request to Azure OpenAI."""
-        # Remove model from payload - Azure uses deployment in URL
-        payload = {k: v for k, v in payload.items() if k != "model"}
-
-        try:
-            response = await self._client.post(
-                self._get_chat_url(),
-                headers=self._get_headers(),
-                json=payload,
-            )
-            response.raise_for_status()
-            return response
-
-        except httpx.HTTPStatusError as e:
-            if e.response.status_code >= 500 or e.response.status_code == 429:
-                if retries < self.max_retries:
-                    import asyncio
-                    await asyncio.sleep(2 ** retries)
-                    return await self._make_request(payload, retries + 1)
-            raise
-
-        except httpx.RequestError:
-            if retries < self.max_retries:
-                import asyncio
-                await asyncio.sleep(2 ** retries)
-                return await self._make_request(payload, retries + 1)
-            raise
-
-    async def chat_stream(
-        self,
-        messages: list[Message],
-        system: str | None = None,
-        temperature: float = 0.7,
-        max_tokens: int | None = None,
-        model: str | None = None,
-        tools: list[dict] | None = None,
-        tool_choice: str | dict | None = None,
-        **kwargs,
-    ) -> AsyncIterator[StreamChunk]:
-        """Send a streaming chat completion request to Azure OpenAI."""
-        request_messages = self._prepare_messages(messages, system)
-
-        payload = {
-            "messages": request_messages,
-            "temperature": temperature,
-            "stream": True,
-            **kwargs,
-        }
-
-        if max_tokens:
-            payload["max_tokens"] = max_tokens
-
-        if tools:
-            payload["tools"] = tools
-            if tool_choice:
-                payload["tool_choice"] = tool_choice
-
-        async with self._client.stream(
-            "POST",
-            self._get_chat_url(),
-            headers=self._get_headers(),
-            json=payload,
-        ) as response:
-            response.raise_for_status()
-
-            current_tool_calls: dict[int, dict] = {}
-
-            async for line in response.aiter_lines():
-                if not line.startswith("data: "):
-                    continue
-
-                data_str = line[6:]
-                if data_str.strip() == "[DONE]":
-                    break
-
-                try:
-                    data = json.loads(data_str)
-                    choice = data["choices"][0]
-                    delta = choice.get("delta", {})
-                    finish_reason = choice.get("finish_reason")
-
-                    content = delta.get("content", "")
-
-                    tool_calls = []
-                    if "tool_calls" in delta:
-                        for tc in delta["tool_calls"]:
-                            idx = tc.get("index", 0)
-                            if idx not in current_tool_calls:
-                                current_tool_calls[idx] = {
-                                    "id": tc.get("id", ""),
-                                    "name": "",
-                                    "arguments": "",
-                                }
-                            if "id" in tc:
-                                current_tool_calls[idx]["id"] = tc["id"]
-                            if "function" in tc:
-                                if "name" in tc["function"]:
-                                    current_tool_calls[idx]["name"] = tc["function"]["name"]
-                                if "arguments" in tc["function"]:
-                                    current_tool_calls[idx]["arguments"] += tc["function"]["arguments"]
-
-                    if finish_reason and current_tool_calls:
-                        tool_calls = [
-                            ToolCall(
-                                id=tc["id"],
-                                name=tc["name"],
-                                arguments=tc["arguments"],
-                            )
-                            for tc in current_tool_calls.values()
-                        ]
-
-                    yield StreamChunk(
-                        content=content,
-                        finish_reason=finish_reason,
-                        tool_calls=tool_calls,
-                    )
-
-                except json.JSONDecodeError:
-                    continue
+    def _prepare_payload(self, payload: dict) -> dict:
+        """Remove model from payload - Azure uses deployment in URL."""
+        # The payload is built fresh for every call, so strip it in place
+        payload.pop("model", None)
+        return payload
+
+
+class _ProviderConfig(NamedTuple):
+    """Connection defaults for an OpenAI-compatible provider."""
+    base_url: str
+    api_key_env: str | None
+    default_model: str
+
+
+_PROVIDER_CONFIGS: dict[str, _ProviderConfig] = {
+    "openai": _ProviderConfig(
+        "https://api.openai.com/v1", "OPENAI_API_KEY", "gpt-4",
+    ),
+    "ollama": _ProviderConfig(
+        "http://localhost:11434/v1", None, "llama2",
+    ),
+    "together": _ProviderConfig(
+        "https://api.together.xyz/v1", "TOGETHER_API_KEY", "mistralai/Mixtral-8x7B-Instruct-v0.1",
+    ),
+    "groq": _ProviderConfig(
+        "https://api.groq.com/openai/v1", "GROQ_API_KEY", "mixtral-8x7b-32768",
+    ),
+    "deepseek": _ProviderConfig(
+        "https://api.deepseek.com/v1", "DEEPSEEK_API_KEY", "deepseek-chat",
+    ),
+}
 
 
 # Convenience function to create a client
@@ -559,46 +556,18 @@ def create_client(
             **kwargs,
         )
 
-    provider_configs = {
-        "openai": {
-            "base_url": "https://api.openai.com/v1",
-            "api_key_env": "OPENAI_API_KEY",
-            "default_model": "gpt-4",
-        },
-        "ollama": {
-            "base_url": "http://localhost:11434/v1",
-            "api_key_env": None,
-            "default_model": "llama2",
-        },
-        "together": {
-            "base_url": "https://api.together.xyz/v1",
-            "api_key_env": "TOGETHER_API_KEY",
-            "default_model": "mistralai/Mixtral-8x7B-Instruct-v0.1",
-        },
-        "groq": {
-            "base_url": "https://api.groq.com/openai/v1",
-            "api_key_env": "GROQ_API_KEY",
-            "default_model": "mixtral-8x7b-32768",
-        },
-        "deepseek": {
-            "base_url": "https://api.deepseek.com/v1",
-            "api_key_env": "DEEPSEEK_API_KEY",
-            "default_model": "deepseek-chat",
-        },
-    }
-
-    config = provider_configs.get(provider, {})
+    config = _PROVIDER_CONFIGS.get(provider)
 
     # Get API key
-    if not api_key and config.get("api_key_env"):
-        api_key = os.getenv(config["api_key_env"], "")
+    if not api_key and config and config.api_key_env:
+        api_key = os.getenv(config.api_key_env, "")
 
     # Get base URL
-    base_url = kwargs.pop("base_url", None) or config.get("base_url")
+    base_url = kwargs.pop("base_url", None) or (config.base_url if config else None)
 
     # Get model
     if not model:
-        model = config.get("default_model", "gpt-4")
+        model = config.default_model if config else "gpt-4"
 
     return OpenAICompatClient(
         api_key=api_key,
@@ -5,9 +5,14 @@ Handles the integration of skill instructions and resources into
 the LLM conversation.
 """
 
+import re
+
 from openskills.core.skill import Skill
 from openskills.models.metadata import SkillMetadata
 
+# Pattern: [INVOKE:name] or [INVOKE:name(args)]
+_INVOKE_RE = re.compile(r"\[INVOKE:(\w+)(?:\((.*?)\))?\]")
+
 
 class PromptBuilder:
     """
@@ -28,21 +33,19 @@ To use a skill, indicate which skill you want to use and I will provide the deta
 
     SKILL_ACTIVE_TEMPLATE = """## Active Skill: {name}
 
-{instruction}
-"""
+{instruction}"""
 
-    SCRIPT_AVAILABLE_TEMPLATE = """
-## Available Actions
+    SCRIPT_AVAILABLE_TEMPLATE = """## Available Actions
 
 You can invoke the following scripts when needed:
 
 {scripts_list}
 
-To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required parameters.
-"""
+To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required parameters."""
 
     def __init__(self):
-        pass
+        # (fingerprint, rendered catalog) of the last build_skill_catalog call
+        self._catalog_cache: tuple[tuple, str] | None = None
 
     def build_skill_catalog(self, metadata_list: list[SkillMetadata]) -> str:
         """
@@ -60,16 +63,20 @@ To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required
         if not metadata_list:
             return ""
 
-        skills_lines = []
+        # The catalog is usually rebuilt every turn from the same metadata
+        key = tuple((m.name, m.description, tuple(m.triggers)) for m in metadata_list)
+        if self._catalog_cache is not None and self._catalog_cache[0] == key:
+            return self._catalog_cache[1]
+
+        lines = []
         for meta in metadata_list:
-            triggers = ", ".join(meta.triggers) if meta.triggers else "N/A"
-            skills_lines.append(
-                f"- **{meta.name}**: {meta.description}\n"
-                f"  Triggers: {triggers}"
-            )
+            lines.append(f"- **{meta.name}**: {meta.description}")
+            lines.append(f"  Triggers: {', '.join(meta.triggers) if meta.triggers else 'N/A'}")
 
-        skills_list = "\n".join(skills_lines)
-        return self.SKILL_CATALOG_TEMPLATE.format(skills_list=skills_list)
+        skills_list = "\n".join(lines)
+        catalog = self.SKILL_CATALOG_TEMPLATE.format(skills_list=skills_list)
+        self._catalog_cache = (key, catalog)
+        return catalog
 
     def build_active_skill_prompt(
         self,
@@ -88,6 +95,8 @@ To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required
         Returns:
             Formatted skill prompt
         """
+        # Sections carry no leading/trailing blank lines; the final join
+        # inserts exactly one blank line between them.
         parts = []
 
         # Add instruction content
@@ -111,9 +120,9 @@ To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required
         if include_references:
             for ref in skill.references:
                 if ref.is_loaded() and ref.content:
-                    parts.append(f"\n## Reference: {ref.path}\n\n{ref.content}")
+                    parts.append(f"## Reference: {ref.path}\n\n{ref.content}")
 
-        return "\n".join(parts)
+        return "\n\n".join(parts)
 
     def build_system_prompt(
         self,
@@ -158,18 +167,7 @@ To invoke a script, use the format: `[INVOKE:{{script_name}}]` with any required
         Returns:
             List of (script_name, args) tuples
         """
-        import re
-
-        invocations = []
-
-        # Pattern: [INVOKE:name] or [INVOKE:name(args)]
-        pattern = r"\[INVOKE:(\w+)(?:\((.*?)\))?\]"
-        matches = re.findall(pattern, text)
-
-        for name, args in matches:
-            invocations.append((name, args or ""))
-
-        return invocations
+        return [(m.group(1), m.group(2) or "") for m in _INVOKE_RE.finditer(text)]
 
     def format_script_result(self, script_name: str, result: str) -> str:
         """
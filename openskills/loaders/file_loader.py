@@ -4,6 +4,11 @@ File system loader for infographic-skills.
 Loads infographic-skills from local file system directories.
 """
 
+import asyncio
+import mmap
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import AsyncIterator
 
@@ -20,6 +25,13 @@ class FileLoader:
 
     SKILL_FILENAME = "SKILL.md"
 
+    # Directory names never descended into by find_skills (hidden
+    # directories are always skipped as well)
+    SKIP_DIRS = frozenset({"node_modules", "__pycache__", ".venv", "venv", "target"})
+
+    # Maximum number of parsed infographic-skills kept in the parse cache
+    CACHE_SIZE = 512
+
     def __init__(self, parser: SkillParser | None = None):
         """
         Initialize the loader.
@@ -29,6 +41,11 @@ class FileLoader:
         """
         self.parser = parser or SkillParser()
 
+        # (path, mtime_ns, size, metadata_only) -> Skill; a changed file gets
+        # a new key, so stale entries simply age out of the LRU
+        self._cache: OrderedDict[tuple[str, int, int, bool], Skill] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
     async def load_from_directory(
         self,
         directory: Path,
@@ -49,31 +66,50 @@ class FileLoader:
         if not directory.exists() or not directory.is_dir():
             return
 
-        # Scan subdirectories for SKILL.md
-        for path in directory.iterdir():
-            if path.is_dir():
-                skill_file = path / self.SKILL_FILENAME
-                if skill_file.exists():
-                    try:
-                        skill = self.parser.parse_file(skill_file, metadata_only=metadata_only)
-                        yield skill
-                    except Exception as e:
-                        # Log warning but continue
-                        print(f"Warning: Failed to load skill from {skill_file}: {e}")
+        # Scan subdirectories for SKILL.md (DirEntry caches the type bits,
+        # so no extra stat per entry)
+        with os.scandir(directory) as it:
+            skill_files = [
+                Path(entry.path) / self.SKILL_FILENAME
+                for entry in it
+                if entry.is_dir()
+            ]
+        skill_files = [f for f in skill_files if f.exists()]
+
+        # Parse in worker threads so disk I/O does not block the event loop,
+        # yielding infographic-skills in completion order
+        tasks = [
+            asyncio.create_task(asyncio.to_thread(self._parse_or_warn, f, metadata_only))
+            for f in skill_files
+        ]
+        for next_done in asyncio.as_completed(tasks):
+            skill = await next_done
+            if skill is not None:
+                yield skill
 
         # Check directory root for SKILL.md
         root_skill = directory / self.SKILL_FILENAME
         if root_skill.exists():
             try:
-                skill = self.parser.parse_file(root_skill, metadata_only=metadata_only)
+                skill = await asyncio.to_thread(self._parse_cached, root_skill, metadata_only)
                 yield skill
             except Exception:
                 pass
 
+    def _parse_or_warn(self, skill_file: Path, metadata_only: bool) -> Skill | None:
+        """Parse a skill file, printing a warning instead of raising."""
+        try:
+            return self._parse_cached(skill_file, metadata_only)
+        except Exception as e:
+            # Log warning but continue
+            print(f"Warning: Failed to load skill from {skill_file}: {e}")
+            return None
+
     async def load_skill(
         self,
         path: Path,
         metadata_only: bool = False,
+        use_mmap: bool = False,
     ) -> Skill:
         """
         Load a single skill.
@@ -81,6 +117,9 @@ class FileLoader:
         Args:
             path: Path to SKILL.md file or directory containing it
             metadata_only: If True, only load metadata
+            use_mmap: If True, map the file into memory instead of reading
+                it. The content is still decoded into one str, so this saves
+                no copy; it only avoids a read() of the file
 
         Returns:
             The loaded Skill
@@ -96,7 +135,45 @@ class FileLoader:
         if not path.exists():
             raise FileNotFoundError(f"Skill not found: {path}")
 
-        return self.parser.parse_file(path, metadata_only=metadata_only)
+        return self._parse_cached(path, metadata_only, use_mmap=use_mmap)
+
+    def _parse_cached(self, path: Path, metadata_only: bool, use_mmap: bool = False) -> Skill:
+        """
+        Parse a skill file, reusing the previous result if it is unchanged.
+
+        Files are keyed on their modification time and size, so an unchanged
+        SKILL.md is not parsed again. Each caller gets its own deep copy of
+        the cached Skill, since loading instructions and references mutates
+        it in place.
+        """
+        st = os.stat(path)
+        key = (str(path), st.st_mtime_ns, st.st_size, metadata_only)
+
+        with self._cache_lock:
+            skill = self._cache.get(key)
+            if skill is not None:
+                self._cache.move_to_end(key)
+                return skill.model_copy(deep=True)
+
+        if use_mmap and st.st_size:
+            skill = self._parse_mmap(path, metadata_only)
+        else:
+            skill = self.parser.parse_file(path, metadata_only=metadata_only)
+
+        with self._cache_lock:
+            self._cache[key] = skill
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+        return skill.model_copy(deep=True)
+
+    def _parse_mmap(self, path: Path, metadata_only: bool) -> Skill:
+        """Parse a skill file through a read-only memory map."""
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view:
+                return self.parser.parse_bytes(
+                    view, source_path=path, metadata_only=metadata_only
+                )
 
     def find_skills(self, directory: Path) -> list[Path]:
         """
@@ -114,8 +191,10 @@ class FileLoader:
         if not directory.exists():
             return skills
 
-        # Use glob to find all SKILL.md files
-        for skill_file in directory.rglob(self.SKILL_FILENAME):
-            skills.append(skill_file)
+        # Walk the tree, pruning hidden and vendored directories in place
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in self.SKIP_DIRS]
+            if self.SKILL_FILENAME in files:
+                skills.append(Path(root) / self.SKILL_FILENAME)
 
         return skills
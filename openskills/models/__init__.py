@@ -1,12 +1,13 @@
 """Data models for OpenSkills."""
 
-from openskills.models.metadata import SkillMetadata
+from openskills.models.metadata import SkillIndex, SkillMetadata
 from openskills.models.instruction import SkillInstruction
 from openskills.models.dependency import SkillDependency
 from openskills.models.resource import Reference, Script, ReferenceMode
 
 __all__ = [
     "SkillMetadata",
+    "SkillIndex",
     "SkillInstruction",
     "SkillDependency",
     "Reference",
@@ -5,9 +5,18 @@ Dependencies define what packages and system commands need to be
 installed/executed before running a skill's scripts.
 """
 
-from typing import Any
+import hashlib
+import shlex
+from functools import lru_cache
+from typing import Any, ClassVar
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+
+@lru_cache(maxsize=256)
+def _pip_install_command(flags: str, packages: tuple[str, ...]) -> str:
+    """Build (once per package list) the pip install command for packages."""
+    return f"pip install {flags} " + shlex.join(packages)
 
 
 class SkillDependency(BaseModel):
@@ -27,28 +36,49 @@ class SkillDependency(BaseModel):
             - Pillow>=9.0
           system:
             - mkdir -p output/images
+          parallel: true   # optional: system commands are independent
         ---
     """
 
-    python: list[str] = Field(
-        default_factory=list,
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
+    # Options for every generated pip install command
+    PIP_FLAGS: ClassVar[str] = "--prefer-binary --no-input --disable-pip-version-check --quiet"
+
+    python: tuple[str, ...] = Field(
+        default_factory=tuple,
         description="Python packages to install (pip format)",
         examples=[["numpy>=1.20", "pandas==2.0.0", "requests"]],
     )
 
-    system: list[str] = Field(
-        default_factory=list,
+    system: tuple[str, ...] = Field(
+        default_factory=tuple,
         description="System commands to execute for setup",
         examples=[["mkdir -p output/images", "chmod +x scripts/*.sh"]],
     )
 
+    parallel: bool = Field(
+        default=False,
+        description=(
+            "Whether the system commands are independent of each other and of "
+            "the Python install, so setup may run them concurrently"
+        ),
+    )
+
     @classmethod
-    def from_dict(cls, data: dict[str, Any] | None) -> "SkillDependency":
+    def from_dict(cls, data: dict[str, Any] | None, validate: bool = False) -> "SkillDependency":
         """
         Parse dependency configuration from frontmatter dict.
 
+        The YAML loader already yields lists of strings, so validation is
+        skipped by default (the lists are only frozen into tuples); pass
+        ``validate=True`` for untrusted input. A single string is taken as
+        a one-item list; any other non-list value is always validated, so
+        it raises instead of being split into characters.
+
         Args:
             data: Dictionary from SKILL.md frontmatter, or None
+            validate: Whether to run full pydantic validation
 
         Returns:
             SkillDependency instance
@@ -56,31 +86,95 @@ class SkillDependency(BaseModel):
         if not data:
             return cls()
 
-        return cls(
-            python=data.get("python", []),
-            system=data.get("system", []),
+        python = data.get("python", []) or []
+        system = data.get("system", []) or []
+        parallel = data.get("parallel", False)
+        if isinstance(python, str):
+            python = [python]
+        if isinstance(system, str):
+            system = [system]
+        if validate or not (
+            isinstance(python, (list, tuple)) and isinstance(system, (list, tuple))
+        ):
+            return cls(python=python, system=system, parallel=parallel)
+        return cls.model_construct(
+            python=tuple(python), system=tuple(system), parallel=bool(parallel)
         )
 
+    def __hash__(self) -> int:
+        """Hash by content, also for lists set through ``model_copy(update=...)``."""
+        return hash((tuple(self.python), tuple(self.system), self.parallel))
+
     def has_dependencies(self) -> bool:
         """Check if any dependencies are defined."""
         return bool(self.python or self.system)
 
+    def cache_key(self) -> str:
+        """
+        Content key of this dependency set, for "already installed" checks.
+
+        Package order does not matter to pip, so packages are sorted;
+        system commands keep their order since they run in sequence.
+
+        Returns:
+            32-character hex digest
+        """
+        text = "|".join(sorted(self.python)) + "||" + "|".join(self.system)
+        return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+    def get_parallel_groups(self) -> list[list[str]]:
+        """
+        Group system commands into batches that may run concurrently.
+
+        Groups run one after another; commands within a group have no
+        ordering between them. Unless ``parallel`` is set every command is
+        its own group, i.e. fully sequential.
+
+        Returns:
+            List of command groups, in execution order
+        """
+        if not self.system:
+            return []
+        if self.parallel:
+            return [list(self.system)]
+        return [[cmd] for cmd in self.system]
+
     def get_pip_install_command(self) -> str | None:
         """
         Generate pip install command for Python dependencies.
 
+        Each requirement is shell-quoted only where needed, so specifiers
+        such as ``pkg[extra]>=1.0`` reach pip intact. All packages go to a
+        single pip run (one resolver pass) with PIP_FLAGS, which prefer
+        wheels and skip prompts and the pip version check.
+
+        Commands are memoized by package list, so repeated setups of the
+        same skill (or of skills sharing packages) skip the quoting; keying
+        on the packages rather than the instance stays correct for copies
+        made with ``model_copy(update=...)``.
+
         Returns:
             pip install command string, or None if no Python dependencies
         """
         if not self.python:
             return None
-        packages = " ".join(f'"{pkg}"' for pkg in self.python)
-        return f"pip install {packages}"
+        return _pip_install_command(self.PIP_FLAGS, tuple(self.python))
 
     def get_pip_packages(self) -> list[str]:
-        """Get list of Python packages for installation."""
-        return self.python.copy()
+        """
+        Get list of Python packages for installation.
+
+        Returns a list the caller may modify; iterate ``python`` directly
+        when only reading.
+        """
+        return list(self.python)
 
     def get_system_commands(self) -> list[str]:
-        """Get list of system commands to execute."""
-        return self.system.copy()
+        """
+        Get list of system commands to execute.
+
+        Returns a list the caller may modify; iterate ``system`` directly
+        when only reading.
+        """
+        return list(self.system)
+
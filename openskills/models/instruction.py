@@ -5,7 +5,7 @@ The instruction layer contains the actual rules and guidelines for the skill.
 This is loaded only when a skill is selected for use.
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
 
 
 class SkillInstruction(BaseModel):
@@ -16,6 +16,8 @@ class SkillInstruction(BaseModel):
     This is injected into the LLM's system prompt when the skill is active.
     """
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     content: str = Field(
         ...,
         description="The markdown content of the skill instructions",
@@ -26,6 +28,17 @@ class SkillInstruction(BaseModel):
         description="Original raw content including frontmatter",
     )
 
+    # Derived from content once; the model is frozen so they never go stale
+    _system_prompt: str = PrivateAttr(default="")
+    _token_estimate: int = PrivateAttr(default=0)
+
+    @model_validator(mode="after")
+    def _precompute_derived(self) -> "SkillInstruction":
+        """Cache the stripped prompt and token estimate."""
+        self._system_prompt = self.content.strip()
+        self._token_estimate = len(self.content) >> 2
+        return self
+
     def get_system_prompt(self) -> str:
         """
         Get the instruction content formatted for use as a system prompt.
@@ -33,7 +46,7 @@ class SkillInstruction(BaseModel):
         Returns:
             The instruction content ready for LLM injection
         """
-        return self.content.strip()
+        return self._system_prompt
 
     def get_token_estimate(self) -> int:
         """
@@ -44,4 +57,4 @@ class SkillInstruction(BaseModel):
         Returns:
             Estimated token count
         """
-        return len(self.content) // 4
+        return self._token_estimate
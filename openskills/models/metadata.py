@@ -5,7 +5,34 @@ The metadata layer contains lightweight information used for skill discovery
 and matching. This is always loaded to enable quick indexing.
 """
 
-from pydantic import BaseModel, Field
+import re
+import sys
+from functools import lru_cache
+from typing import Iterable
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, model_validator
+
+from openskills.utils.automaton import KeywordAutomaton
+
+_WORD_RE = re.compile(r"\w+")
+# Matches nothing; keyword pattern of a model built without validation
+_NEVER_RE = re.compile(r"(?!)")
+
+
+@lru_cache(maxsize=1024)
+def tokenize_query(query: str) -> frozenset[str]:
+    """
+    Split a query into a set of lowercase word tokens.
+
+    Cached, since the same query is matched against every registered skill.
+
+    Args:
+        query: User input
+
+    Returns:
+        Set of word tokens
+    """
+    return frozenset(_WORD_RE.findall(query.lower()))
 
 
 class SkillMetadata(BaseModel):
@@ -17,6 +44,8 @@ class SkillMetadata(BaseModel):
     many infographic-skills are registered.
     """
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     name: str = Field(
         ...,
         description="Unique identifier for the skill",
@@ -52,6 +81,29 @@ class SkillMetadata(BaseModel):
         examples=[["productivity", "meeting", "summary"]],
     )
 
+    # Lowercased matching keys, computed once after validation
+    _triggers_lc: tuple[str, ...] = PrivateAttr(default=())
+    _tags_lc: tuple[str, ...] = PrivateAttr(default=())
+    _name_lc: str = PrivateAttr(default="")
+    _desc_tokens: frozenset[str] = PrivateAttr(default=frozenset())
+    # Triggers and name as one alternation, so a query is scanned once
+    _keyword_re: re.Pattern[str] = PrivateAttr(default=_NEVER_RE)
+
+    @model_validator(mode="after")
+    def _precompute_match_keys(self) -> "SkillMetadata":
+        """Cache the lowercased keys used by matches_query and SkillMatcher."""
+        # Interned: many skills share triggers and tags
+        self._triggers_lc = tuple(sys.intern(t.lower()) for t in self.triggers)
+        self._tags_lc = tuple(sys.intern(t.lower()) for t in self.tags)
+        self._name_lc = self.name.lower()
+        self._keyword_re = re.compile(
+            "|".join(re.escape(k) for k in (*self._triggers_lc, self._name_lc))
+        )
+        self._desc_tokens = frozenset(
+            w for w in _WORD_RE.findall(self.description.lower()) if len(w) > 3
+        )
+        return self
+
     def matches_query(self, query: str) -> bool:
         """
         Check if this skill matches a user query.
@@ -62,21 +114,68 @@ class SkillMetadata(BaseModel):
         Returns:
             True if the skill matches the query
         """
-        query_lower = query.lower()
+        return (
+            # Check triggers and name
+            self._keyword_re.search(query.lower()) is not None
+            # Check if any significant words from description match (whole
+            # words only, so "cat" does not match "category")
+            or not self._desc_tokens.isdisjoint(tokenize_query(query))
+        )
+
 
-        # Check triggers
-        for trigger in self.triggers:
-            if trigger.lower() in query_lower:
-                return True
+class SkillIndex:
+    """
+    Keyword index over many skills.
 
-        # Check name and description
-        if self.name.lower() in query_lower:
-            return True
+    Answers the same question as ``SkillMetadata.matches_query`` for a whole
+    registry at once: all trigger and name keywords are compiled into a single
+    Aho-Corasick automaton, so a query is scanned once regardless of how many
+    infographic-skills are indexed, and description words are looked up per
+    query token.
+    """
 
-        # Check if any significant words from description match
-        desc_words = self.description.lower().split()
-        for word in desc_words:
-            if len(word) > 3 and word in query_lower:
-                return True
+    def __init__(self, metadata: Iterable[SkillMetadata] = ()):
+        """
+        Initialize the index.
 
-        return False
+        Args:
+            metadata: Initial skill metadata to index
+        """
+        self._skills: list[SkillMetadata] = []
+        self._automaton: KeywordAutomaton[int] = KeywordAutomaton()
+        self._by_desc_token: dict[str, list[int]] = {}
+        for meta in metadata:
+            self.add(meta)
+
+    def __len__(self) -> int:
+        return len(self._skills)
+
+    def add(self, metadata: SkillMetadata) -> None:
+        """
+        Add a skill to the index.
+
+        Args:
+            metadata: Skill metadata to index
+        """
+        skill_id = len(self._skills)
+        self._skills.append(metadata)
+
+        for keyword in (*metadata._triggers_lc, metadata._name_lc):
+            self._automaton.add(keyword, skill_id)
+        for token in metadata._desc_tokens:
+            self._by_desc_token.setdefault(token, []).append(skill_id)
+
+    def query(self, query: str) -> list[SkillMetadata]:
+        """
+        Find all infographic-skills matching a query.
+
+        Args:
+            query: User input to match against
+
+        Returns:
+            Matching skill metadata, in the order they were added
+        """
+        skill_ids = {skill_id for _, skill_id in self._automaton.iter(query.lower())}
+        for token in tokenize_query(query):
+            skill_ids.update(self._by_desc_token.get(token, ()))
+        return [self._skills[skill_id] for skill_id in sorted(skill_ids)]
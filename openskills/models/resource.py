@@ -19,7 +19,7 @@ from enum import Enum
 from pathlib import Path
 from typing import Any
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 
 from openskills.models.dependency import SkillDependency
 
@@ -54,6 +54,9 @@ class Reference(BaseModel):
     content involves financial topics.
     """
 
+    # Not frozen: content is filled in when the reference is loaded
+    model_config = ConfigDict(defer_build=True)
+
     path: str = Field(
         ...,
         description="Relative path to the reference file (should be in references/ directory)",
@@ -82,7 +85,38 @@ class Reference(BaseModel):
         exclude=True,  # Don't serialize
     )
 
-    _resolved_path: Path | None = None
+    _resolved_path: Path | None = PrivateAttr(default=None)
+
+    @classmethod
+    def from_frontmatter(cls, data: dict[str, Any] | str) -> "Reference":
+        """
+        Build a reference from a SKILL.md ``references`` entry.
+
+        This is the single validation point for frontmatter references; code
+        deriving references from already-validated ones should use
+        ``model_copy`` (which does not re-validate).
+
+        Args:
+            data: Entry dict, or a bare path string (implicit mode)
+
+        Returns:
+            Validated Reference instance
+        """
+        if isinstance(data, str):
+            return cls.model_construct(path=data)
+
+        # Unknown modes fall back to implicit instead of failing the skill
+        try:
+            mode = ReferenceMode(data.get("mode", "implicit"))
+        except ValueError:
+            mode = ReferenceMode.IMPLICIT
+
+        return cls.model_validate({
+            "path": data.get("path", ""),
+            "condition": data.get("condition", ""),
+            "description": data.get("description", ""),
+            "mode": mode,
+        })
 
     def is_loaded(self) -> bool:
         """Check if the reference content has been loaded."""
@@ -121,6 +155,8 @@ class Script(BaseModel):
     sending notifications, or running calculations.
     """
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     name: str = Field(
         ...,
         description="Unique name for the script",
@@ -162,7 +198,28 @@ class Script(BaseModel):
         examples=[["/home/gem/output"]],
     )
 
-    _resolved_path: Path | None = None
+    _resolved_path: Path | None = PrivateAttr(default=None)
+
+    @classmethod
+    def from_frontmatter(cls, data: dict[str, Any]) -> "Script":
+        """
+        Build a script from a SKILL.md ``scripts`` entry.
+
+        Args:
+            data: Entry dict from frontmatter
+
+        Returns:
+            Validated Script instance
+        """
+        return cls.model_validate({
+            "name": data.get("name", ""),
+            "path": data.get("path", ""),
+            "description": data.get("description", ""),
+            "args": data.get("args", []),
+            "timeout": data.get("timeout", 30),
+            "sandbox": data.get("sandbox", True),
+            "outputs": data.get("outputs", []),
+        })
 
     def get_invocation_hint(self) -> str:
         """
@@ -180,23 +237,38 @@ class Script(BaseModel):
 class SkillResources(BaseModel):
     """Container for all resources associated with a skill."""
 
+    model_config = ConfigDict(defer_build=True, frozen=True)
+
     references: list[Reference] = Field(default_factory=list)
     scripts: list[Script] = Field(default_factory=list)
     dependency: SkillDependency = Field(default_factory=SkillDependency)
 
+    # Lookup indexes, built on first access. The lists themselves can still
+    # be appended to, so each index remembers the length it was built from.
+    _ref_by_path: dict[str, Reference] | None = PrivateAttr(default=None)
+    _ref_count: int = PrivateAttr(default=0)
+    _script_by_name: dict[str, Script] | None = PrivateAttr(default=None)
+    _script_count: int = PrivateAttr(default=0)
+
     def get_reference(self, path: str) -> Reference | None:
         """Get a reference by path."""
-        for ref in self.references:
-            if ref.path == path:
-                return ref
-        return None
+        if self._ref_by_path is None or self._ref_count != len(self.references):
+            index: dict[str, Reference] = {}
+            for ref in self.references:
+                index.setdefault(ref.path, ref)
+            self._ref_by_path = index
+            self._ref_count = len(self.references)
+        return self._ref_by_path.get(path)
 
     def get_script(self, name: str) -> Script | None:
         """Get a script by name."""
-        for script in self.scripts:
-            if script.name == name:
-                return script
-        return None
+        if self._script_by_name is None or self._script_count != len(self.scripts):
+            index: dict[str, Script] = {}
+            for script in self.scripts:
+                index.setdefault(script.name, script)
+            self._script_by_name = index
+            self._script_count = len(self.scripts)
+        return self._script_by_name.get(name)
 
     def get_applicable_references(self, context: str) -> list[Reference]:
         """Get all references that should be loaded for the given context."""
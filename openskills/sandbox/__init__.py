@@ -3,39 +3,62 @@ Sandbox module for isolated script execution.
 
 This module provides integration with AIO Sandbox for secure,
 isolated execution of skill scripts.
+
+Only SandboxClient and CommandResult are imported eagerly (the client
+imports httpx on first use, so this is cheap); everything else is
+resolved on first attribute access (PEP 562).
 """
 
-from openskills.sandbox.client import (
-    SandboxClient,
-    CommandResult,
-    CodeResult,
-    FileInfo,
-    SessionInfo,
-    SandboxInfo,
-    SandboxExecutionError,
-    SandboxConnectionError,
-)
-from openskills.sandbox.executor import SandboxExecutor
-from openskills.sandbox.manager import SandboxManager, SandboxStrategy
-from openskills.sandbox.logger import SandboxLogger, get_logger, set_logger
-
-__all__ = [
+import importlib
+from typing import TYPE_CHECKING
+
+from openskills.sandbox.client import SandboxClient, CommandResult
+
+if TYPE_CHECKING:
+    from openskills.sandbox.client import (
+        CodeResult,
+        FileInfo,
+        SessionInfo,
+        SandboxInfo,
+        SandboxExecutionError,
+        SandboxConnectionError,
+    )
+    from openskills.sandbox.executor import SandboxExecutor
+    from openskills.sandbox.manager import SandboxManager, SandboxStrategy
+    from openskills.sandbox.logger import SandboxLogger, get_logger, set_logger
+
+# Public name -> defining module
+_LAZY = {
     # Client
-    "SandboxClient",
-    "CommandResult",
-    "CodeResult",
-    "FileInfo",
-    "SessionInfo",
-    "SandboxInfo",
-    "SandboxExecutionError",
-    "SandboxConnectionError",
+    "CodeResult": "openskills.sandbox.client",
+    "FileInfo": "openskills.sandbox.client",
+    "SessionInfo": "openskills.sandbox.client",
+    "SandboxInfo": "openskills.sandbox.client",
+    "SandboxExecutionError": "openskills.sandbox.client",
+    "SandboxConnectionError": "openskills.sandbox.client",
     # Executor
-    "SandboxExecutor",
+    "SandboxExecutor": "openskills.sandbox.executor",
     # Manager
-    "SandboxManager",
-    "SandboxStrategy",
+    "SandboxManager": "openskills.sandbox.manager",
+    "SandboxStrategy": "openskills.sandbox.manager",
     # Logger
-    "SandboxLogger",
-    "get_logger",
-    "set_logger",
-]
+    "SandboxLogger": "openskills.sandbox.logger",
+    "get_logger": "openskills.sandbox.logger",
+    "set_logger": "openskills.sandbox.logger",
+}
+
+__all__ = ["SandboxClient", "CommandResult", *_LAZY]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    # Cache so later lookups bypass __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
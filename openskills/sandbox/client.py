@@ -7,13 +7,316 @@ commands and managing files in an isolated environment.
 AIO Sandbox API docs: http://localhost:8080/v1/docs
 """
 
+import asyncio
+import base64
+import copy
+import functools
+import importlib.util
+import inspect
+import os
+import random
+import re
+import secrets
+import shlex
+import time
 from dataclasses import dataclass, field
-from typing import Self
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    BinaryIO,
+    Callable,
+    Iterable,
+    Self,
+    TypeVar,
+)
+from urllib.parse import quote
+
+from openskills.utils import jsonlib
+
+if TYPE_CHECKING:
+    import httpx
+
+
+# Headers for request bodies pre-serialized with jsonlib.dumps
+_JSON_HEADERS = {"content-type": "application/json"}
+
+# find/search requests: newline-delimited results when the server can
+# stream them, a single JSON document otherwise
+_NDJSON_HEADERS = {
+    "content-type": "application/json",
+    "accept": "application/x-ndjson, application/json;q=0.9",
+}
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Process-wide HTTP clients shared by SandboxClient(shared=True), keyed by
+# (base URL, timeout). httpx clients are bound to the event loop they were
+# created on, so the loop is stored alongside each client.
+_SHARED_CLIENTS: dict[
+    tuple[str, float], tuple["httpx.AsyncClient", asyncio.AbstractEventLoop]
+] = {}
+
+
+# Candidate field names for list_files entries across API conventions
+_NAME_KEYS = ("name", "Name")
+_PATH_KEYS = ("path", "Path")
+_DIR_KEYS = ("is_directory", "is_dir", "isDir", "IsDir")
+_SIZE_KEYS = ("size", "Size")
+_MODIFIED_KEYS = ("modified", "modified_time", "modTime")
+
+# Endpoints on the exec/file hot path, resolved once per base URL by
+# _endpoint_urls so httpx does not re-merge them with base_url per request
+_HOT_PATHS = (
+    "/v1/shell/exec",
+    "/v1/shell/exec-many",
+    "/v1/shell/write",
+    "/v1/shell/view",
+    "/v1/file/read",
+    "/v1/file/write",
+    "/v1/file/list",
+    "/v1/file/upload",
+    "/v1/file/download",
+    "/v1/code/execute",
+)
+
+
+def _pick(entry: dict, keys: tuple[str, ...], default=""):
+    """Return the first truthy value among keys, or default."""
+    for key in keys:
+        value = entry.get(key)
+        if value:
+            return value
+    return default
 
-import httpx
 
+def _parse_aio_file(entry: dict) -> "FileInfo":
+    """Parse a list_files entry in AIO Sandbox format."""
+    return FileInfo(
+        name=entry.get("name") or "",
+        path=entry.get("path") or "",
+        is_dir=bool(entry["is_directory"]),
+        size=entry.get("size") or 0,
+        modified=_pick(entry, _MODIFIED_KEYS),
+    )
 
-@dataclass
+
+def _parse_generic_file(entry: dict) -> "FileInfo":
+    """Parse a list_files entry in any other supported format."""
+    is_dir = (
+        _pick(entry, _DIR_KEYS, False)
+        or entry.get("type") == "directory"
+        or entry.get("mode", "").startswith("d")  # Unix-style mode
+    )
+    return FileInfo(
+        name=_pick(entry, _NAME_KEYS),
+        path=_pick(entry, _PATH_KEYS),
+        is_dir=bool(is_dir),
+        size=_pick(entry, _SIZE_KEYS, 0),
+        modified=_pick(entry, _MODIFIED_KEYS),
+    )
+
+
+T = TypeVar("T")
+
+# Default number of in-flight requests for the batch helpers
+DEFAULT_CONCURRENCY = 16
+
+
+async def _gather_bounded(
+    func: Callable[..., Awaitable[T]],
+    items: Iterable[Any],
+    concurrency: int,
+) -> list[T]:
+    """Await func(item) for every item, at most concurrency at a time, in order."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+# Largest content sent inline in a JSON body; bigger files are uploaded raw
+_JSON_CONTENT_LIMIT = 1 << 20
+
+
+def _is_text(data: bytes) -> bool:
+    """Cheap probe: small and NUL-free in the first 4 KiB (binary formats rarely are)."""
+    return len(data) < _JSON_CONTENT_LIMIT and b"\x00" not in data[:4096]
+
+
+def _unwrap(data: dict) -> dict:
+    """Return the ``data`` envelope of an AIO Sandbox response, or the response itself."""
+    return data["data"] if "data" in data else data
+
+
+def _command_result(data: dict) -> "CommandResult":
+    """Build a CommandResult from an exec response (AIO envelope or plain fields)."""
+    # AIO Sandbox 响应格式: {"data": {"output": "...", "exit_code": 0}, "success": true}
+    # 兼容其他格式: {"exit_code": 0, "stdout": "...", "stderr": "..."}
+    body = _unwrap(data)
+    return CommandResult(
+        exit_code=body.get("exit_code", 0 if data.get("success", True) else 1),
+        stdout=body.get("output", body.get("stdout", "")),
+        stderr=body.get("stderr", ""),
+    )
+
+
+@functools.lru_cache(maxsize=32)
+def _endpoint_urls(base_url: str) -> dict[str, "httpx.URL"]:
+    """Absolute URLs of the hot-path endpoints for a sandbox base URL."""
+    import httpx
+
+    return {path: httpx.URL(base_url + path) for path in _HOT_PATHS}
+
+
+@functools.cache
+def _json_headers() -> "httpx.Headers":
+    """_JSON_HEADERS normalized once, so requests skip re-encoding the dict."""
+    import httpx
+
+    return httpx.Headers(_JSON_HEADERS)
+
+
+# Attempts made by _retry_connect before giving up on an unreachable sandbox
+_CONNECT_ATTEMPTS = 3
+
+
+def _retry_connect(idempotent: bool = True) -> Callable:
+    """
+    Retry a SandboxClient method on connection-level failures.
+
+    A restarting sandbox refuses connections for a moment; retrying with
+    jittered exponential backoff lets the pooled client reconnect instead
+    of failing the caller's whole plan. Retries stop early rather than
+    overrun the call's ``timeout`` (or the client default) or ``deadline``.
+
+    This is the only retry layer: the transport from create_http_client
+    does not retry by itself, so attempts do not multiply.
+
+    Errors that are safe to replay:
+
+    - ``httpx.ConnectError`` / ``httpx.ConnectTimeout`` (also when wrapped
+      in SandboxConnectionError): the connection was never opened, so the
+      server never saw the request. Retried for every call.
+    - ``httpx.RemoteProtocolError``: the connection dropped, possibly
+      after the server received the request. Retried only for idempotent
+      calls.
+
+    Anything else (read timeouts, HTTP errors) is raised unchanged.
+
+    Args:
+        idempotent: Whether the call may be repeated after the server saw
+            it (see above)
+
+    Returns:
+        Decorator for async SandboxClient methods
+    """
+    def decorate(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(self: "SandboxClient", *args, **kwargs) -> T:
+            import httpx
+
+            # Request never sent: safe to replay for any call
+            retryable: tuple[type[Exception], ...] = (httpx.ConnectError, httpx.ConnectTimeout)
+            if idempotent:
+                retryable += (httpx.RemoteProtocolError,)
+
+            bound = signature.bind_partial(self, *args, **kwargs).arguments
+            deadline = time.monotonic() + (bound.get("timeout") or self.timeout)
+            limit = bound.get("deadline") or self._deadline
+            if limit is not None:
+                deadline = min(deadline, limit)
+            for attempt in range(_CONNECT_ATTEMPTS):
+                try:
+                    return await fn(self, *args, **kwargs)
+                except (httpx.TransportError, SandboxConnectionError) as e:
+                    cause = e.__cause__ if isinstance(e, SandboxConnectionError) else e
+                    if not isinstance(cause, retryable):
+                        raise
+                    delay = 0.05 * 2 ** attempt + random.random() * 0.02
+                    last = attempt == _CONNECT_ATTEMPTS - 1
+                    if last or time.monotonic() + delay >= deadline:
+                        if isinstance(e, SandboxConnectionError):
+                            raise
+                        raise SandboxConnectionError(
+                            f"Cannot connect to sandbox at {self.base_url}: {e}"
+                        ) from e
+                    await asyncio.sleep(delay)
+
+        return wrapper
+
+    return decorate
+
+
+def create_http_client(base_url: str, timeout: float) -> "httpx.AsyncClient":
+    """
+    Create a pooled keep-alive HTTP client for a sandbox.
+
+    Connections are kept warm so bursts of exec/file calls skip the TCP/TLS
+    handshake, and multiplexed over HTTP/2 when h2 is installed. The
+    transport does not retry; SandboxClient methods retry connection
+    failures with backoff instead (see _retry_connect).
+
+    Args:
+        base_url: Base URL of the AIO Sandbox server
+        timeout: Default timeout in seconds
+
+    Returns:
+        A new httpx.AsyncClient
+    """
+    import httpx
+
+    transport = httpx.AsyncHTTPTransport(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=32,
+            keepalive_expiry=60.0,
+        ),
+    )
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout(timeout),
+        transport=transport,
+        headers={"User-Agent": "OpenSkills/1"},
+    )
+
+
+def get_shared_client(base_url: str, timeout: float) -> "httpx.AsyncClient":
+    """
+    Get the process-wide HTTP client for a sandbox, creating it if needed.
+
+    Fetch-or-create runs without awaiting, so concurrent tasks on the loop
+    cannot race to create duplicate clients and no lock is needed.
+
+    Args:
+        base_url: Base URL of the AIO Sandbox server
+        timeout: Default timeout in seconds
+
+    Returns:
+        A keep-alive httpx.AsyncClient shared by all callers on this loop
+    """
+    loop = asyncio.get_running_loop()
+    key = (base_url, timeout)
+    entry = _SHARED_CLIENTS.get(key)
+    if entry is not None:
+        client, client_loop = entry
+        if client_loop is loop and not client.is_closed:
+            return client
+
+    client = create_http_client(base_url, timeout)
+    _SHARED_CLIENTS[key] = (client, loop)
+    return client
+
+
+@dataclass(slots=True, frozen=True)
 class CommandResult:
     """Result of a command execution in the sandbox."""
 
@@ -41,7 +344,7 @@ class CommandResult:
             )
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CodeResult:
     """Result of code execution."""
 
@@ -49,7 +352,7 @@ class CodeResult:
     status: str
     stdout: str | None
     stderr: str | None
-    outputs: list[dict] = field(default_factory=list)
+    outputs: tuple[dict, ...] = field(default_factory=tuple)
 
     @property
     def success(self) -> bool:
@@ -60,7 +363,7 @@ class CodeResult:
         return self.stdout or ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class FileInfo:
     """File or directory information."""
 
@@ -76,7 +379,7 @@ class FileInfo:
         return not self.is_dir
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SessionInfo:
     """Shell session information."""
 
@@ -87,8 +390,21 @@ class SessionInfo:
     last_used_at: str
     current_command: str = ""
 
+    @classmethod
+    def from_api(cls, session_id: str, info: dict) -> "SessionInfo":
+        """Build from a session entry of the shell sessions API (positional, no kwarg dispatch)."""
+        get = info.get
+        return cls(
+            session_id,
+            get("working_dir", ""),
+            get("status", ""),
+            get("created_at", ""),
+            get("last_used_at", ""),
+            get("current_command", ""),
+        )
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class SandboxInfo:
     """Sandbox environment information."""
 
@@ -96,9 +412,11 @@ class SandboxInfo:
     home_dir: str
     os: str
     user: str
-    python_versions: list[str] = field(default_factory=list)
-    nodejs_versions: list[str] = field(default_factory=list)
-    available_tools: list[str] = field(default_factory=list)
+    python_versions: tuple[str, ...] = field(default_factory=tuple)
+    nodejs_versions: tuple[str, ...] = field(default_factory=tuple)
+    available_tools: tuple[str, ...] = field(default_factory=tuple)
+    # Optional features the server advertises (e.g. "exec-many")
+    capabilities: tuple[str, ...] = field(default_factory=tuple)
 
 
 class SandboxExecutionError(Exception):
@@ -157,10 +475,29 @@ class SandboxClient:
     DEFAULT_TIMEOUT = 120.0  # 2 minutes default timeout
     HEALTH_CHECK_TIMEOUT = 5.0
 
+    # Largest file prepare_and_write inlines into a single shell command;
+    # bigger files go through mkdir + write_file
+    MAX_INLINE_WRITE = 64 * 1024
+
+    # Known file size above which read_file uses the raw download endpoint
+    # instead of the JSON read
+    RAW_READ_THRESHOLD = 64 * 1024
+
+    # Seconds a file_exists/files_exist answer is reused. Writes and mkdir
+    # through this client invalidate the affected path immediately.
+    STAT_CACHE_TTL = 5.0
+
+    # Seconds get_info/get_code_info answers are reused; the sandbox's
+    # runtime description rarely changes while a client is open
+    INFO_CACHE_TTL = 300.0
+
     def __init__(
         self,
         base_url: str = "http://localhost:8080",
         timeout: float | None = None,
+        shared: bool = True,
+        http_client: "httpx.AsyncClient | None" = None,
+        prewarm: bool = False,
     ):
         """
         Initialize the sandbox client.
@@ -168,26 +505,146 @@ class SandboxClient:
         Args:
             base_url: Base URL of the AIO Sandbox server
             timeout: Default timeout for operations in seconds
+            shared: Reuse a process-wide keep-alive HTTP client for this
+                base URL and timeout instead of opening (and closing) a
+                private one, saving the connection setup on every
+                ``async with``. Close shared clients at shutdown with
+                ``SandboxClient.aclose_shared()``
+            http_client: HTTP client to use instead (e.g. the pool of a
+                SandboxManager, see ``create_http_client``). Its owner
+                closes it; this client never does. Takes precedence over
+                ``shared``
+            prewarm: Open the connection in the background on ``async with``
+                (with a health probe), so the handshake overlaps with the
+                caller's own setup; the first request waits for it instead
+                of opening another connection
         """
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout or self.DEFAULT_TIMEOUT
-        self._client: httpx.AsyncClient | None = None
+        self.shared = shared
+        self._http_client = http_client
+        self.prewarm = prewarm
+        self._client: "httpx.AsyncClient | None" = None
+        # Background connection warmup started by __aenter__ (prewarm=True)
+        self._prewarm_task: asyncio.Task | None = None
+        # path -> (exists, monotonic time of the check)
+        self._stat_cache: dict[str, tuple[bool, float]] = {}
+        # Shell session reused by utility commands (file checks, mkdir);
+        # "" means the sandbox could not create one
+        self._util_session: str | None = None
+        self._util_session_lock = asyncio.Lock()
+        # Held while a command runs in the utility session (one at a time)
+        self._util_session_busy = asyncio.Lock()
+        # Whether HEAD /v1/file/download works (None until first tried)
+        self._head_supported: bool | None = None
+        # Whether POST /v1/shell/exec-many exists (None until first tried)
+        self._exec_many_supported: bool | None = None
+        # Python installer argv prefix, probed on first install
+        self._pip_install: list[str] | None = None
+        # (value, monotonic time fetched) for get_info / get_code_info
+        self._info_cache: tuple[SandboxInfo, float] | None = None
+        self._code_info_cache: tuple[dict, float] | None = None
+        # Hot-path endpoint -> absolute URL, filled in on __aenter__
+        self._urls: dict[str, "httpx.URL"] = {}
+        self._json_headers: "httpx.Headers | dict[str, str]" = _JSON_HEADERS
+        # Absolute time.monotonic() deadline applied to every call (with_deadline)
+        self._deadline: float | None = None
 
     async def __aenter__(self) -> Self:
         """Enter async context and create HTTP client."""
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=httpx.Timeout(self.timeout),
-        )
+        self._urls = _endpoint_urls(self.base_url)
+        self._json_headers = _json_headers()
+        if self._http_client is not None:
+            self._client = self._http_client
+        elif self.shared:
+            self._client = get_shared_client(self.base_url, self.timeout)
+        else:
+            self._client = create_http_client(self.base_url, self.timeout)
+        if self.prewarm:
+            self._prewarm_task = asyncio.create_task(self._prewarm(self._client))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Exit async context and close HTTP client."""
+        """Exit async context and close HTTP client (shared or injected clients stay open)."""
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
         if self._client:
-            await self._client.aclose()
+            if self._util_session:
+                # Best effort: the sandbox reaps idle sessions anyway
+                try:
+                    await self.delete_session(self._util_session)
+                except Exception:
+                    pass
+            self._util_session = None
+            if not self.shared and self._http_client is None:
+                await self._client.aclose()
             self._client = None
 
-    def _ensure_client(self) -> httpx.AsyncClient:
+    @staticmethod
+    async def aclose_shared() -> None:
+        """
+        Close all process-wide shared HTTP clients.
+
+        Clients created on another (possibly closed) event loop cannot be
+        closed from this one and are only dropped.
+        """
+        loop = asyncio.get_running_loop()
+        entries = list(_SHARED_CLIENTS.values())
+        _SHARED_CLIENTS.clear()
+        for client, client_loop in entries:
+            if client_loop is loop:
+                await client.aclose()
+
+    def with_deadline(self, seconds: float) -> "SandboxClient":
+        """
+        Get a view of this client whose calls share one time budget.
+
+        The view shares the open connection and caches; every exec,
+        code and install call made through it gets at most the time left
+        until ``seconds`` from now, and raises TimeoutError once it is spent.
+        Use it inside the original client's ``async with`` block and do not
+        enter or exit the view itself.
+
+        Args:
+            seconds: Total budget for all calls made through the view
+
+        Returns:
+            A shallow copy of this client carrying the deadline
+        """
+        view = copy.copy(self)
+        view._deadline = time.monotonic() + seconds
+        return view
+
+    def _call_timeout(self, timeout: float | None, deadline: float | None) -> float:
+        """
+        Resolve the timeout of one call against an optional deadline.
+
+        Args:
+            timeout: Per-call timeout override (client default if None)
+            deadline: Absolute time.monotonic() deadline (client's if None)
+
+        Returns:
+            Seconds the call may take
+
+        Raises:
+            TimeoutError: If the deadline has already passed
+        """
+        timeout = timeout or self.timeout
+        if deadline is None:
+            deadline = self._deadline
+        if deadline is None:
+            return timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Sandbox call deadline exceeded")
+        return min(remaining, timeout)
+
+    def _url(self, path: str) -> "httpx.URL | str":
+        """Return the pre-resolved URL for a hot-path endpoint, else the path."""
+        return self._urls.get(path, path)
+
+    def _ensure_client(self) -> "httpx.AsyncClient":
         """Ensure HTTP client is initialized."""
         if not self._client:
             raise RuntimeError(
@@ -196,6 +653,65 @@ class SandboxClient:
             )
         return self._client
 
+    async def _prewarm(self, client: "httpx.AsyncClient") -> None:
+        """Open a pooled connection with a health probe (errors are left to real calls)."""
+        try:
+            await client.get("/v1/sandbox", timeout=self.HEALTH_CHECK_TIMEOUT)
+        except Exception:
+            pass
+
+    async def _connected(self) -> "httpx.AsyncClient":
+        """Like _ensure_client, but first waits for a pending prewarm."""
+        client = self._ensure_client()
+        task = self._prewarm_task
+        if task is not None and not task.done():
+            # Shielded: a cancelled caller must not cancel the shared warmup
+            await asyncio.shield(task)
+        return client
+
+    async def _get_json(self, url: str, **kwargs) -> dict:
+        """GET an endpoint and decode its JSON response from the raw body."""
+        response = await (await self._connected()).get(self._url(url), **kwargs)
+        response.raise_for_status()
+        return jsonlib.loads(response.content)
+
+    async def _post_json(self, url: str, payload: dict, **kwargs) -> dict:
+        """POST a pre-serialized JSON payload and decode the JSON response."""
+        response = await (await self._connected()).post(
+            self._url(url), content=jsonlib.dumps(payload), headers=self._json_headers, **kwargs
+        )
+        response.raise_for_status()
+        return jsonlib.loads(response.content)
+
+    async def _post_results(
+        self, url: str, payload: dict, key: str, max_results: int
+    ) -> list:
+        """
+        POST a find/search request and collect at most ``max_results`` items.
+
+        If the server answers with NDJSON (one result per line), reading
+        stops as soon as enough results have arrived and the rest of the
+        body is never downloaded. A plain JSON answer is parsed whole and
+        its ``data[key]`` list truncated.
+        """
+        client = await self._connected()
+        async with client.stream(
+            "POST", self._url(url), content=jsonlib.dumps(payload), headers=_NDJSON_HEADERS
+        ) as response:
+            response.raise_for_status()
+            if "ndjson" in response.headers.get("content-type", ""):
+                results = []
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    results.append(jsonlib.loads(line))
+                    if len(results) >= max_results:
+                        break  # leaving the block closes the response
+                return results
+
+            data = jsonlib.loads(await response.aread())
+        return data.get("data", {}).get(key, [])[:max_results]
+
     # ============================================================
     # Sandbox Info API
     # ============================================================
@@ -204,10 +720,15 @@ class SandboxClient:
         """
         Check if the sandbox is healthy and responsive.
 
+        Always hits the server and never populates the get_info cache, so
+        it stays a cheap liveness probe.
+
         Returns:
             True if sandbox is healthy, False otherwise
         """
-        client = self._ensure_client()
+        import httpx
+
+        client = await self._connected()
         try:
             response = await client.get(
                 "/v1/sandbox",
@@ -221,13 +742,17 @@ class SandboxClient:
         """
         Get sandbox environment information.
 
+        The answer is cached for INFO_CACHE_TTL seconds; call
+        invalidate_info() to force a refetch.
+
         Returns:
             SandboxInfo with version, OS, available tools, etc.
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/sandbox")
-        response.raise_for_status()
-        data = response.json()
+        cached = self._info_cache
+        if cached is not None and time.monotonic() - cached[1] < self.INFO_CACHE_TTL:
+            return cached[0]
+
+        data = await self._get_json("/v1/sandbox")
 
         detail = data.get("data", {}) if isinstance(data.get("data"), dict) else {}
         if not detail:
@@ -236,18 +761,23 @@ class SandboxClient:
         system = detail.get("system", {})
         runtime = detail.get("runtime", {})
 
-        python_versions = [
+        python_versions = tuple(
             p.get("ver", "") for p in runtime.get("python", [])
-        ]
-        nodejs_versions = [
+        )
+        nodejs_versions = tuple(
             n.get("ver", "") for n in runtime.get("nodejs", [])
-        ]
-        tools = []
-        for cat in detail.get("utils", []):
-            for tool in cat.get("tools", []):
-                tools.append(tool.get("name", ""))
+        )
+        tools = tuple(
+            tool.get("name", "")
+            for cat in detail.get("utils", [])
+            for tool in cat.get("tools", [])
+        )
+        # Either a list of names or a {name: enabled} map
+        caps = detail.get("capabilities", data.get("capabilities")) or ()
+        if isinstance(caps, dict):
+            caps = (name for name, enabled in caps.items() if enabled)
 
-        return SandboxInfo(
+        info = SandboxInfo(
             version=data.get("version", ""),
             home_dir=data.get("home_dir", "/home/gem"),
             os=system.get("os", ""),
@@ -255,18 +785,45 @@ class SandboxClient:
             python_versions=python_versions,
             nodejs_versions=nodejs_versions,
             available_tools=tools,
+            capabilities=tuple(caps),
         )
+        self._info_cache = (info, time.monotonic())
+        return info
+
+    async def supports(self, feature: str) -> bool:
+        """
+        Check whether the sandbox advertises an optional feature.
+
+        Answered from the get_info cache, so checking before every setup
+        costs one request per INFO_CACHE_TTL rather than one per check.
+
+        Args:
+            feature: Capability name, e.g. "exec-many"
+
+        Returns:
+            True if the server lists the feature, False otherwise (also
+            when the server info cannot be fetched)
+        """
+        import httpx
+
+        try:
+            info = await self.get_info()
+        except httpx.HTTPError:
+            return False
+        return feature in info.capabilities
 
     # ============================================================
     # Shell API
     # ============================================================
 
+    @_retry_connect(idempotent=False)
     async def exec_command(
         self,
         command: str,
         timeout: float | None = None,
         workdir: str | None = None,
         session_id: str | None = None,
+        deadline: float | None = None,
     ) -> CommandResult:
         """
         Execute a shell command in the sandbox.
@@ -276,6 +833,8 @@ class SandboxClient:
             timeout: Optional timeout override in seconds
             workdir: Optional working directory
             session_id: Optional session ID for persistent sessions
+            deadline: Optional absolute time.monotonic() deadline; the
+                call's timeout is capped by the time remaining
 
         Returns:
             CommandResult with exit code, stdout, and stderr
@@ -283,8 +842,12 @@ class SandboxClient:
         Raises:
             SandboxConnectionError: If cannot connect to sandbox
             httpx.TimeoutException: If command times out
+            TimeoutError: If the deadline has already passed
         """
-        client = self._ensure_client()
+        import httpx
+
+        client = await self._connected()
+        call_timeout = self._call_timeout(timeout, deadline)
 
         payload: dict = {"command": command}
         if workdir:
@@ -294,35 +857,183 @@ class SandboxClient:
 
         try:
             response = await client.post(
-                "/v1/shell/exec",
-                json=payload,
-                timeout=timeout or self.timeout,
+                self._url("/v1/shell/exec"),
+                content=jsonlib.dumps(payload),
+                headers=self._json_headers,
+                timeout=call_timeout,
             )
             response.raise_for_status()
-            data = response.json()
-
-            # AIO Sandbox 响应格式: {"data": {"output": "...", "exit_code": 0}, "success": true}
-            if "data" in data:
-                result_data = data["data"]
-                output = result_data.get("output", "")
-                exit_code = result_data.get("exit_code", 0 if data.get("success", True) else 1)
-                return CommandResult(
-                    exit_code=exit_code,
-                    stdout=output,
-                    stderr="",
-                )
-            else:
-                # 兼容其他格式
-                return CommandResult(
-                    exit_code=data.get("exit_code", 0),
-                    stdout=data.get("stdout", data.get("output", "")),
-                    stderr=data.get("stderr", ""),
-                )
+            return _command_result(jsonlib.loads(response.content))
         except httpx.ConnectError as e:
             raise SandboxConnectionError(
                 f"Cannot connect to sandbox at {self.base_url}: {e}"
             ) from e
 
+    async def exec_batch(
+        self,
+        commands: list[str],
+        timeout: float | None = None,
+        workdir: str | None = None,
+        session_id: str | None = None,
+        deadline: float | None = None,
+    ) -> list[CommandResult]:
+        """
+        Execute several shell commands sequentially in one round-trip.
+
+        Each command runs in its own subshell (so ``cd``/variables do not
+        leak into the next one, as with separate exec_command calls) and is
+        followed by a delimiter line carrying its exit code. The delimiter
+        includes a random nonce so command output cannot forge it.
+
+        Args:
+            commands: Shell commands to execute, in order
+            timeout: Optional timeout override for the whole batch
+            workdir: Optional working directory
+            session_id: Optional session ID for persistent sessions
+            deadline: Optional absolute time.monotonic() deadline
+
+        Returns:
+            One CommandResult per command. The sandbox reports combined
+            output, so stderr is empty. Commands that never ran (e.g. the
+            batch timed out) get exit code -1.
+
+        Raises:
+            SandboxConnectionError: If cannot connect to sandbox
+        """
+        if not commands:
+            return []
+
+        nonce = secrets.token_hex(8)
+        script = "".join(
+            f"( {cmd}\n); printf '\\n__OS_DELIM_{nonce}_{i}_%s__\\n' \"$?\"\n"
+            for i, cmd in enumerate(commands)
+        )
+        result = await self.exec_command(
+            script, timeout=timeout, workdir=workdir, session_id=session_id, deadline=deadline
+        )
+
+        # The last delimiter may lose its newline if the server trims output
+        delim = re.compile(rf"\n__OS_DELIM_{nonce}_(\d+)_(\d+)__(?:\n|$)")
+        results = [
+            CommandResult(exit_code=-1, stdout="", stderr="Command did not run")
+            for _ in commands
+        ]
+        start = 0
+        for match in delim.finditer(result.stdout):
+            index = int(match.group(1))
+            if index < len(results):
+                results[index] = CommandResult(
+                    exit_code=int(match.group(2)),
+                    stdout=result.stdout[start:match.start()],
+                    stderr="",
+                )
+            start = match.end()
+        return results
+
+    async def exec_many(
+        self,
+        commands: list[str],
+        timeout: float | None = None,
+        workdir: str | None = None,
+        deadline: float | None = None,
+    ) -> AsyncIterator[CommandResult]:
+        """
+        Execute shell commands in order, yielding each result as it finishes.
+
+        The whole list goes out in one request to /v1/shell/exec-many and
+        the server streams one JSON result per line (NDJSON), so a result
+        can be handled while later commands still run. A server without the
+        endpoint (404/405/501 or, once get_info has been fetched, missing
+        from its capabilities; remembered per client) is sent one
+        exec_batch call instead, whose results all arrive at the end.
+
+        Args:
+            commands: Shell commands to execute, in order
+            timeout: Optional timeout override for the whole request
+            workdir: Optional working directory
+            deadline: Optional absolute time.monotonic() deadline
+
+        Yields:
+            One CommandResult per command that ran, in order
+
+        Raises:
+            SandboxConnectionError: If cannot connect to sandbox
+        """
+        import httpx
+
+        if not commands:
+            return
+
+        cached = self._info_cache
+        if self._exec_many_supported is None and cached is not None and cached[0].capabilities:
+            # A server advertising capabilities lists the endpoint if it has it
+            self._exec_many_supported = "exec-many" in cached[0].capabilities
+
+        if self._exec_many_supported is not False:
+            client = await self._connected()
+            payload: dict = {"commands": commands}
+            if workdir:
+                payload["workdir"] = workdir
+            try:
+                async with client.stream(
+                    "POST",
+                    self._url("/v1/shell/exec-many"),
+                    content=jsonlib.dumps(payload),
+                    headers=_NDJSON_HEADERS,
+                    timeout=self._call_timeout(timeout, deadline),
+                ) as response:
+                    if response.status_code not in (404, 405, 501):
+                        response.raise_for_status()
+                        self._exec_many_supported = True
+                        if "ndjson" in response.headers.get("content-type", ""):
+                            async for line in response.aiter_lines():
+                                if line:
+                                    yield _command_result(jsonlib.loads(line))
+                        else:
+                            data = jsonlib.loads(await response.aread())
+                            for item in _unwrap(data).get("results", []):
+                                yield _command_result(item)
+                        return
+            except httpx.ConnectError as e:
+                raise SandboxConnectionError(
+                    f"Cannot connect to sandbox at {self.base_url}: {e}"
+                ) from e
+            self._exec_many_supported = False
+
+        for result in await self.exec_batch(
+            commands, timeout=timeout, workdir=workdir, deadline=deadline
+        ):
+            yield result
+
+    async def exec_parallel(
+        self,
+        commands: list[str],
+        timeout: float | None = None,
+        workdir: str | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[CommandResult]:
+        """
+        Execute independent shell commands concurrently.
+
+        Requests run in parallel over the client's connection pool
+        (multiplexed on one connection with HTTP/2). Use exec_batch when
+        the commands must run in order.
+
+        Args:
+            commands: Shell commands to execute
+            timeout: Optional timeout override in seconds
+            workdir: Optional working directory
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            One CommandResult per command, in input order
+        """
+        return await _gather_bounded(
+            lambda cmd: self.exec_command(cmd, timeout=timeout, workdir=workdir),
+            commands,
+            concurrency,
+        )
+
     async def get_sessions(self) -> list[SessionInfo]:
         """
         Get all active shell sessions.
@@ -330,23 +1041,10 @@ class SandboxClient:
         Returns:
             List of SessionInfo objects
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/shell/sessions")
-        response.raise_for_status()
-        data = response.json()
+        data = await self._get_json("/v1/shell/sessions")
 
-        sessions = []
         sessions_data = data.get("data", {}).get("sessions", {})
-        for session_id, info in sessions_data.items():
-            sessions.append(SessionInfo(
-                session_id=session_id,
-                working_dir=info.get("working_dir", ""),
-                status=info.get("status", ""),
-                created_at=info.get("created_at", ""),
-                last_used_at=info.get("last_used_at", ""),
-                current_command=info.get("current_command", ""),
-            ))
-        return sessions
+        return [SessionInfo.from_api(sid, info) for sid, info in sessions_data.items()]
 
     async def create_session(self, workdir: str | None = None) -> str:
         """
@@ -358,16 +1056,47 @@ class SandboxClient:
         Returns:
             Session ID
         """
-        client = self._ensure_client()
         payload = {}
         if workdir:
             payload["workdir"] = workdir
 
-        response = await client.post("/v1/shell/sessions/create", json=payload)
-        response.raise_for_status()
-        data = response.json()
+        data = await self._post_json("/v1/shell/sessions/create", payload)
         return data.get("data", {}).get("session_id", "")
 
+    async def _util_sid(self) -> str | None:
+        """
+        Get the shell session used for utility commands, creating it once.
+
+        Reusing one session avoids starting a fresh shell for every small
+        command. It keeps the sandbox's default working directory, so
+        relative paths resolve as in sessionless commands. Falls back to
+        sessionless execution (None) if the sandbox cannot create sessions.
+        """
+        import httpx
+
+        if self._util_session is None:
+            async with self._util_session_lock:
+                if self._util_session is None:
+                    try:
+                        self._util_session = await self.create_session()
+                    except (httpx.HTTPError, ValueError):
+                        self._util_session = ""
+        return self._util_session or None
+
+    async def _exec_util(self, command: str) -> CommandResult:
+        """
+        Run a utility command, in the utility session when it is free.
+
+        A shell session runs one command at a time, so a caller that finds
+        it busy (e.g. mkdirs and uploads run through gather) runs its
+        command sessionless instead of interleaving with or queueing on it.
+        """
+        session_id = await self._util_sid()
+        if session_id is None or self._util_session_busy.locked():
+            return await self.exec_command(command)
+        async with self._util_session_busy:
+            return await self.exec_command(command, session_id=session_id)
+
     async def get_session(self, session_id: str) -> SessionInfo | None:
         """
         Get information about a specific session.
@@ -378,21 +1107,13 @@ class SandboxClient:
         Returns:
             SessionInfo or None if not found
         """
-        client = self._ensure_client()
+        client = await self._connected()
         response = await client.get(f"/v1/shell/sessions/{session_id}")
         if response.status_code == 404:
             return None
         response.raise_for_status()
-        data = response.json()
-        info = data.get("data", {})
-        return SessionInfo(
-            session_id=session_id,
-            working_dir=info.get("working_dir", ""),
-            status=info.get("status", ""),
-            created_at=info.get("created_at", ""),
-            last_used_at=info.get("last_used_at", ""),
-            current_command=info.get("current_command", ""),
-        )
+        data = jsonlib.loads(response.content)
+        return SessionInfo.from_api(session_id, data.get("data", {}))
 
     async def delete_session(self, session_id: str) -> bool:
         """
@@ -404,10 +1125,27 @@ class SandboxClient:
         Returns:
             True if deleted successfully
         """
-        client = self._ensure_client()
+        client = await self._connected()
         response = await client.delete(f"/v1/shell/sessions/{session_id}")
         return response.status_code == 200
 
+    async def delete_sessions(
+        self,
+        session_ids: list[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[bool]:
+        """
+        Delete several shell sessions concurrently.
+
+        Args:
+            session_ids: Session IDs
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            One success flag per session, in input order
+        """
+        return await _gather_bounded(self.delete_session, session_ids, concurrency)
+
     async def get_terminal_url(self, session_id: str | None = None) -> str:
         """
         Get WebSocket terminal URL for UI integration.
@@ -421,14 +1159,11 @@ class SandboxClient:
         Returns:
             Terminal WebSocket URL (e.g., "http://localhost:8080/terminal?session_id=xxx")
         """
-        client = self._ensure_client()
         params = {}
         if session_id:
             params["session_id"] = session_id
 
-        response = await client.get("/v1/shell/terminal-url", params=params)
-        response.raise_for_status()
-        data = response.json()
+        data = await self._get_json("/v1/shell/terminal-url", params=params)
         return data.get("data", "")
 
     async def shell_write(self, session_id: str, input_text: str) -> bool:
@@ -442,14 +1177,52 @@ class SandboxClient:
         Returns:
             True if successful
         """
-        client = self._ensure_client()
+        client = await self._connected()
         payload = {
             "session_id": session_id,
             "input": input_text,
         }
-        response = await client.post("/v1/shell/write", json=payload)
+        response = await client.post(
+            self._url("/v1/shell/write"),
+            content=jsonlib.dumps(payload),
+            headers=self._json_headers,
+        )
         return response.status_code == 200
 
+    async def stream_shell(self, session_id: str) -> AsyncIterator[str]:
+        """
+        Stream a shell session's output over the /terminal WebSocket.
+
+        Output is pushed as it is produced, so one consumer loop replaces
+        polling shell_view (an HTTP round-trip per tick). The iterator ends
+        when the server closes the connection. Requires the optional
+        ``websockets`` package.
+
+        Args:
+            session_id: Session ID
+
+        Yields:
+            Terminal output frames as text
+
+        Raises:
+            ImportError: If websockets is not installed
+        """
+        try:
+            import websockets
+        except ImportError as e:
+            raise ImportError(
+                "stream_shell requires the 'websockets' package: "
+                "pip install 'openskills[sandbox]'"
+            ) from e
+
+        # http(s)://host -> ws(s)://host
+        url = f"ws{self.base_url.removeprefix('http')}/terminal?session_id={quote(session_id)}"
+        async with websockets.connect(url) as ws:
+            async for message in ws:
+                if isinstance(message, bytes):
+                    message = message.decode("utf-8", errors="replace")
+                yield message
+
     async def shell_view(self, session_id: str) -> str:
         """
         View current output of a shell session.
@@ -460,10 +1233,7 @@ class SandboxClient:
         Returns:
             Current shell output
         """
-        client = self._ensure_client()
-        response = await client.get(f"/v1/shell/view", params={"session_id": session_id})
-        response.raise_for_status()
-        data = response.json()
+        data = await self._get_json("/v1/shell/view", params={"session_id": session_id})
         return data.get("data", {}).get("output", "")
 
     async def shell_kill(self, session_id: str) -> bool:
@@ -476,47 +1246,75 @@ class SandboxClient:
         Returns:
             True if successful
         """
-        client = self._ensure_client()
-        response = await client.post("/v1/shell/kill", json={"session_id": session_id})
+        client = await self._connected()
+        response = await client.post(
+            "/v1/shell/kill",
+            content=jsonlib.dumps({"session_id": session_id}),
+            headers=self._json_headers,
+        )
         return response.status_code == 200
 
     # ============================================================
     # File API
     # ============================================================
 
+    @_retry_connect()
     async def write_file(
         self,
         path: str,
-        content: str | bytes,
+        content: str | bytes | bytearray | memoryview | BinaryIO,
         mode: str = "0644",
     ) -> None:
         """
         Write a file to the sandbox filesystem.
 
+        Small text is sent as JSON, and so are small UTF-8 byte strings that
+        look like text. Other bytes and text over 1 MiB go through the
+        multipart upload endpoint unchanged, so large or binary files are
+        never escaped into a JSON string; binary file objects are streamed.
+
         Args:
             path: Absolute path in the sandbox
-            content: File content (string or bytes)
+            content: File content (string, bytes-like, or binary file object)
             mode: File permissions (default: 0644)
 
         Raises:
             SandboxConnectionError: If cannot connect to sandbox
             SandboxExecutionError: If file write fails
         """
-        client = self._ensure_client()
+        import httpx
 
-        # Convert bytes to string if needed
-        if isinstance(content, bytes):
-            content_str = content.decode("utf-8", errors="replace")
-        else:
-            content_str = content
-
-        payload = {
-            "file": path,
-            "content": content_str,
-        }
+        client = await self._connected()
+        self._stat_cache.pop(path, None)
 
         try:
-            response = await client.post("/v1/file/write", json=payload)
+            if hasattr(content, "read"):
+                await self.upload_file(content, path)
+                return
+            if isinstance(content, (bytearray, memoryview)):
+                content = bytes(content)
+            elif isinstance(content, str) and len(content) >= _JSON_CONTENT_LIMIT:
+                await self.upload_file(content.encode("utf-8"), path)
+                return
+
+            if isinstance(content, bytes):
+                text = None
+                if _is_text(content):
+                    try:
+                        text = content.decode("utf-8")
+                    except UnicodeDecodeError:
+                        pass
+                if text is None:
+                    await self.upload_file(content, path)
+                    return
+                content = text
+
+            # Serialized straight to bytes (orjson when available)
+            response = await client.post(
+                self._url("/v1/file/write"),
+                content=jsonlib.dumps({"file": path, "content": content}),
+                headers=self._json_headers,
+            )
             response.raise_for_status()
         except httpx.ConnectError as e:
             raise SandboxConnectionError(
@@ -529,12 +1327,31 @@ class SandboxClient:
                 stderr=e.response.text,
             ) from e
 
-    async def read_file(self, path: str) -> str:
+    @_retry_connect()
+    async def read_file(
+        self,
+        path: str,
+        prefer_raw_over: int | None = None,
+        size: int | None = None,
+    ) -> str:
         """
         Read a file from the sandbox filesystem.
 
+        Files come back inside a JSON document with a single request. When
+        the file is known to be large, it is fetched raw from the download
+        endpoint instead, skipping the JSON escaping that roughly doubles
+        it on the wire and the parse on arrival. The size is known when
+        the caller passes ``size``; passing ``prefer_raw_over`` without it
+        sizes the file with a HEAD request first, which only pays off when
+        large files are expected.
+
         Args:
             path: Absolute path in the sandbox
+            prefer_raw_over: Size above which the raw download is used
+                (default RAW_READ_THRESHOLD); if given without ``size``,
+                the file is sized with a HEAD request
+            size: File size in bytes if already known (e.g. from
+                list_files); never triggers a HEAD request
 
         Returns:
             File content as string
@@ -543,18 +1360,32 @@ class SandboxClient:
             SandboxConnectionError: If cannot connect to sandbox
             SandboxExecutionError: If file read fails
         """
-        client = self._ensure_client()
+        import httpx
+
+        client = await self._connected()
 
         payload = {"file": path}
 
         try:
-            response = await client.post("/v1/file/read", json=payload)
+            if size is None and prefer_raw_over is not None:
+                head = await self._head_download(path)
+                length = head.headers.get("content-length") if head is not None else None
+                size = int(length) if length is not None else None
+            threshold = self.RAW_READ_THRESHOLD if prefer_raw_over is None else prefer_raw_over
+            if size is not None and size > threshold:
+                raw = await self.read_file_bytes(path)
+                return raw.decode("utf-8", errors="replace")
+
+            response = await client.post(
+                self._url("/v1/file/read"),
+                content=jsonlib.dumps(payload),
+                headers=self._json_headers,
+            )
             response.raise_for_status()
-            data = response.json()
+            # Parse straight from the body bytes (orjson when available)
+            data = jsonlib.loads(response.content)
             # AIO Sandbox 响应格式: {"data": {"content": "..."}}
-            if "data" in data:
-                return data["data"].get("content", "")
-            return data.get("content", "")
+            return _unwrap(data).get("content", "")
         except httpx.ConnectError as e:
             raise SandboxConnectionError(
                 f"Cannot connect to sandbox at {self.base_url}: {e}"
@@ -566,6 +1397,7 @@ class SandboxClient:
                 stderr=e.response.text,
             ) from e
 
+    @_retry_connect()
     async def list_files(self, path: str = "/home/gem") -> list[FileInfo]:
         """
         List files in a directory.
@@ -576,32 +1408,19 @@ class SandboxClient:
         Returns:
             List of FileInfo objects
         """
-        client = self._ensure_client()
-        response = await client.post("/v1/file/list", json={"path": path})
-        response.raise_for_status()
-        data = response.json()
+        data = await self._post_json("/v1/file/list", {"path": path})
 
-        files = []
         raw_files = data.get("data", {}).get("files", [])
+        if not raw_files:
+            return []
 
-        for f in raw_files:
-            # Handle various API field name conventions
-            is_dir = (
-                f.get("is_directory") or  # AIO Sandbox format
-                f.get("is_dir") or
-                f.get("isDir") or
-                f.get("IsDir") or
-                f.get("type") == "directory" or
-                f.get("mode", "").startswith("d")  # Unix-style mode
-            )
-            files.append(FileInfo(
-                name=f.get("name") or f.get("Name", ""),
-                path=f.get("path") or f.get("Path", ""),
-                is_dir=bool(is_dir),
-                size=f.get("size") or f.get("Size") or 0,
-                modified=f.get("modified") or f.get("modified_time") or f.get("modTime") or "",
-            ))
-        return files
+        # All entries of one response share a format: pick the parser once
+        # from the first entry instead of probing every field name per entry
+        if "is_directory" in raw_files[0]:
+            parse = _parse_aio_file  # AIO Sandbox format
+        else:
+            parse = _parse_generic_file
+        return [parse(f) for f in raw_files]
 
     async def find_files(
         self,
@@ -612,6 +1431,9 @@ class SandboxClient:
         """
         Find files matching a pattern.
 
+        Results are streamed when the server supports NDJSON, so at most
+        ``max_results`` paths are transferred.
+
         Args:
             pattern: Glob pattern (e.g., "*.py")
             path: Directory to search in
@@ -620,16 +1442,12 @@ class SandboxClient:
         Returns:
             List of matching file paths
         """
-        client = self._ensure_client()
         payload = {
             "path": path,
             "pattern": pattern,
             "max_results": max_results,
         }
-        response = await client.post("/v1/file/find", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", {}).get("files", [])
+        return await self._post_results("/v1/file/find", payload, "files", max_results)
 
     async def search_files(
         self,
@@ -641,6 +1459,8 @@ class SandboxClient:
         """
         Search for text in files.
 
+        Results are streamed like find_files.
+
         Args:
             query: Search query (regex supported)
             path: Directory to search in
@@ -650,37 +1470,43 @@ class SandboxClient:
         Returns:
             List of matches with file path, line number, and content
         """
-        client = self._ensure_client()
         payload = {
             "path": path,
             "query": query,
             "file_pattern": file_pattern,
             "max_results": max_results,
         }
-        response = await client.post("/v1/file/search", json=payload)
-        response.raise_for_status()
-        data = response.json()
-        return data.get("data", {}).get("matches", [])
+        return await self._post_results("/v1/file/search", payload, "matches", max_results)
 
     async def upload_file(
         self,
-        local_content: bytes,
+        local_content: bytes | BinaryIO | str | os.PathLike,
         remote_path: str,
         filename: str | None = None,
+        content_type: str = "application/octet-stream",
     ) -> str:
         """
         Upload a file to the sandbox.
 
+        Local paths and binary file objects are streamed in chunks by httpx,
+        so large files are never read into memory first.
+
         Args:
-            local_content: File content as bytes
+            local_content: File content as bytes, a binary file object, or
+                the path of a local file
             remote_path: Full remote file path (e.g., "/home/gem/workspace/file.pdf")
                         or directory path if filename is provided
             filename: Optional filename (if remote_path is a directory)
+            content_type: MIME type sent for the file part
 
         Returns:
             Full path of uploaded file
         """
-        client = self._ensure_client()
+        if isinstance(local_content, (str, os.PathLike)):
+            with open(local_content, "rb") as f:
+                return await self.upload_file(f, remote_path, filename, content_type)
+
+        client = await self._connected()
 
         # 如果提供了 filename，则 remote_path 是目录
         if filename:
@@ -688,12 +1514,13 @@ class SandboxClient:
         else:
             full_path = remote_path
             filename = full_path.split("/")[-1]
+        self._stat_cache.pop(full_path, None)
 
-        files = {"file": (filename, local_content)}
+        files = {"file": (filename, local_content, content_type)}
         data = {"path": full_path}
-        response = await client.post("/v1/file/upload", files=files, data=data)
+        response = await client.post(self._url("/v1/file/upload"), files=files, data=data)
         response.raise_for_status()
-        result = response.json()
+        result = jsonlib.loads(response.content)
         return result.get("data", {}).get("file_path", full_path)
 
     async def download_file(self, path: str) -> bytes:
@@ -706,23 +1533,191 @@ class SandboxClient:
         Returns:
             File content as bytes
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/file/download", params={"path": path})
+        client = await self._connected()
+        response = await client.get(self._url("/v1/file/download"), params={"path": path})
         response.raise_for_status()
         return response.content
 
+    async def read_file_bytes(self, path: str) -> bytes:
+        """
+        Read a file's raw bytes, skipping the JSON endpoint and any decoding.
+
+        Args:
+            path: File path in sandbox
+
+        Returns:
+            File content as bytes
+        """
+        return await self.download_file(path)
+
+    async def download_file_to(
+        self,
+        path: str,
+        sink: BinaryIO | str | os.PathLike,
+        chunk_size: int = 65536,
+    ) -> int:
+        """
+        Stream a file from the sandbox into a local file or binary sink.
+
+        Unlike download_file, the payload is never held in memory as a whole.
+
+        Args:
+            path: File path in sandbox
+            sink: Local file path to write, or a writable binary file object
+            chunk_size: Read size in bytes
+
+        Returns:
+            Number of bytes written
+        """
+        client = await self._connected()
+        written = 0
+        url = self._url("/v1/file/download")
+        async with client.stream("GET", url, params={"path": path}) as response:
+            response.raise_for_status()
+            if isinstance(sink, (str, os.PathLike)):
+                with open(sink, "wb") as f:
+                    async for chunk in response.aiter_bytes(chunk_size):
+                        written += f.write(chunk)
+            else:
+                async for chunk in response.aiter_bytes(chunk_size):
+                    written += sink.write(chunk)
+        return written
+
+    async def read_files(
+        self,
+        paths: list[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[str]:
+        """
+        Read several files concurrently over the pooled connection.
+
+        Args:
+            paths: Absolute paths in the sandbox
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            File contents, in input order
+        """
+        return await _gather_bounded(self.read_file, paths, concurrency)
+
+    async def write_files(
+        self,
+        items: list[tuple[str, str | bytes]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        """
+        Write several files concurrently over the pooled connection.
+
+        Args:
+            items: (path, content) pairs
+            concurrency: Maximum number of requests in flight
+        """
+        await _gather_bounded(lambda item: self.write_file(*item), items, concurrency)
+
+    async def download_files(
+        self,
+        paths: list[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[bytes]:
+        """
+        Download several files concurrently over the pooled connection.
+
+        Args:
+            paths: File paths in sandbox
+            concurrency: Maximum number of requests in flight
+
+        Returns:
+            File contents, in input order
+        """
+        return await _gather_bounded(self.download_file, paths, concurrency)
+
     async def file_exists(self, path: str) -> bool:
         """
         Check if a file exists in the sandbox.
 
+        Tries a bodiless ``HEAD /v1/file/download`` first and falls back to
+        the shell check (files_exist) when the sandbox does not give a clear
+        200/404 answer. Results are cached like files_exist.
+
         Args:
             path: Absolute path in the sandbox
 
         Returns:
             True if file exists, False otherwise
         """
-        result = await self.exec_command(f"test -f {path} && echo 1 || echo 0")
-        return result.stdout.strip() == "1"
+        cached = self._stat_cache.get(path)
+        if cached is not None and time.monotonic() - cached[1] < self.STAT_CACHE_TTL:
+            return cached[0]
+
+        response = await self._head_download(path)
+        if response is not None:
+            return response.status_code == 200
+
+        return (await self.files_exist([path]))[path]
+
+    async def _head_download(self, path: str) -> "httpx.Response | None":
+        """
+        Send a bodiless ``HEAD /v1/file/download`` for a path.
+
+        Records whether the sandbox supports HEAD and caches the existence
+        answer. A 404 only means "file missing" once a 200 has shown the
+        route exists; before that it may come from a sandbox without the
+        download route, so it is neither cached nor returned.
+
+        Returns:
+            The response if it answered clearly (200, or 404 with HEAD
+            known to work), else None
+        """
+        if self._head_supported is False:
+            return None
+        client = await self._connected()
+        response = await client.head(self._url("/v1/file/download"), params={"path": path})
+        if response.status_code == 200 or (
+            response.status_code == 404 and self._head_supported
+        ):
+            self._head_supported = True
+            self._stat_cache[path] = (response.status_code == 200, time.monotonic())
+            return response
+        if response.status_code in (405, 501):
+            self._head_supported = False
+        return None
+
+    async def files_exist(self, paths: list[str]) -> dict[str, bool]:
+        """
+        Check whether several files exist in the sandbox in one round-trip.
+
+        Answers younger than STAT_CACHE_TTL are served from a per-client
+        cache; the remaining paths are tested by a single shell command.
+
+        Args:
+            paths: Absolute paths in the sandbox
+
+        Returns:
+            Mapping of each path to True if it is an existing file
+        """
+        now = time.monotonic()
+        found: dict[str, bool] = {}
+        pending: list[str] = []
+        for path in paths:
+            cached = self._stat_cache.get(path)
+            if cached is not None and now - cached[1] < self.STAT_CACHE_TTL:
+                found[path] = cached[0]
+            elif path not in pending:
+                pending.append(path)
+
+        if pending:
+            quoted = " ".join(shlex.quote(p) for p in pending)
+            result = await self._exec_util(
+                f'for p in {quoted}; do test -f "$p" && echo 1 || echo 0; done'
+            )
+            flags = result.stdout.split()
+            now = time.monotonic()
+            for i, path in enumerate(pending):
+                exists = i < len(flags) and flags[i] == "1"
+                found[path] = exists
+                self._stat_cache[path] = (exists, now)
+
+        return found
 
     async def mkdir(self, path: str, parents: bool = True) -> CommandResult:
         """
@@ -736,7 +1731,44 @@ class SandboxClient:
             CommandResult from mkdir command
         """
         flag = "-p" if parents else ""
-        return await self.exec_command(f"mkdir {flag} {path}")
+        self._stat_cache.pop(path, None)
+        return await self._exec_util(f"mkdir {flag} {path}")
+
+    async def prepare_and_write(
+        self,
+        directory: str,
+        path: str,
+        content: str | bytes,
+    ) -> None:
+        """
+        Create a directory and write a file into it in one round-trip.
+
+        Small files are base64 encoded and decoded by a single shell command
+        (``mkdir -p <dir> && ... | base64 -d > <path>``), so the content is
+        written byte-for-byte with no quoting concerns. Files larger than
+        MAX_INLINE_WRITE fall back to ``mkdir`` followed by ``write_file``.
+
+        Args:
+            directory: Directory to create (with parents)
+            path: Absolute path of the file to write
+            content: File content (string or bytes)
+
+        Raises:
+            SandboxExecutionError: If the command fails
+        """
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        self._stat_cache.pop(path, None)
+        if len(data) > self.MAX_INLINE_WRITE:
+            await self.mkdir(directory)
+            await self.write_file(path, content)
+            return
+
+        encoded = base64.b64encode(data).decode("ascii")
+        result = await self.exec_command(
+            f"mkdir -p {shlex.quote(directory)} && "
+            f"printf '%s' '{encoded}' | base64 -d > {shlex.quote(path)}"
+        )
+        result.raise_for_status()
 
     # ============================================================
     # Code Execution API
@@ -747,6 +1779,7 @@ class SandboxClient:
         code: str,
         language: str = "python",
         timeout: float | None = None,
+        deadline: float | None = None,
     ) -> CodeResult:
         """
         Execute code directly without creating a file.
@@ -757,22 +1790,20 @@ class SandboxClient:
             code: Code to execute
             language: "python" or "javascript"/"nodejs"
             timeout: Optional timeout
+            deadline: Optional absolute time.monotonic() deadline
 
         Returns:
             CodeResult with output
         """
-        client = self._ensure_client()
         payload = {
             "code": code,
             "language": language,
         }
-        response = await client.post(
-            "/v1/code/execute",
-            json=payload,
-            timeout=timeout or self.timeout,
+        data = await self._post_json(
+            self._url("/v1/code/execute"),
+            payload,
+            timeout=self._call_timeout(timeout, deadline),
         )
-        response.raise_for_status()
-        data = response.json()
 
         result_data = data.get("data", {})
         return CodeResult(
@@ -780,20 +1811,31 @@ class SandboxClient:
             status=result_data.get("status", "ok" if data.get("success") else "error"),
             stdout=result_data.get("stdout"),
             stderr=result_data.get("stderr"),
-            outputs=result_data.get("outputs", []),
+            outputs=tuple(result_data.get("outputs", ())),
         )
 
     async def get_code_info(self) -> dict:
         """
         Get code execution runtime information.
 
+        Cached like get_info; treat the returned dict as read-only.
+
         Returns:
             Dict with available languages and versions
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/code/info")
-        response.raise_for_status()
-        return response.json().get("data", {})
+        cached = self._code_info_cache
+        if cached is not None and time.monotonic() - cached[1] < self.INFO_CACHE_TTL:
+            return cached[0]
+
+        data = await self._get_json("/v1/code/info")
+        info = data.get("data", {})
+        self._code_info_cache = (info, time.monotonic())
+        return info
+
+    def invalidate_info(self) -> None:
+        """Drop cached get_info / get_code_info answers."""
+        self._info_cache = None
+        self._code_info_cache = None
 
     # ============================================================
     # Package Management API
@@ -803,6 +1845,7 @@ class SandboxClient:
         self,
         packages: list[str],
         upgrade: bool = False,
+        deadline: float | None = None,
     ) -> CommandResult:
         """
         Install Python packages using pip.
@@ -810,20 +1853,64 @@ class SandboxClient:
         Args:
             packages: List of package names (e.g., ["numpy", "pandas>=2.0"])
             upgrade: Whether to upgrade existing packages
+            deadline: Optional absolute time.monotonic() deadline
 
         Returns:
             CommandResult from pip install
         """
-        # 使用 pip install 命令安装
-        upgrade_flag = "--upgrade" if upgrade else ""
-        packages_str = " ".join(f'"{p}"' for p in packages)
-        cmd = f"pip install {upgrade_flag} {packages_str}".strip()
-        return await self.exec_command(cmd, timeout=300)
+        # 使用 pip install 命令安装 (uv 可用时使用 uv pip install)
+        cmd = [*await self._python_installer()]
+        if upgrade:
+            cmd.append("-U")
+        cmd.extend(packages)
+        return await self.exec_command(shlex.join(cmd), timeout=300, deadline=deadline)
+
+    async def install_python_packages_many(
+        self,
+        groups: list[list[str]],
+        upgrade: bool = False,
+        deadline: float | None = None,
+    ) -> CommandResult:
+        """
+        Install several package groups with a single installer run.
+
+        Args:
+            groups: Lists of package specs; duplicates are installed once
+            upgrade: Whether to upgrade existing packages
+            deadline: Optional absolute time.monotonic() deadline
+
+        Returns:
+            CommandResult from the combined install
+        """
+        packages = list(dict.fromkeys(p for group in groups for p in group))
+        return await self.install_python_packages(packages, upgrade=upgrade, deadline=deadline)
+
+    async def _python_installer(self) -> list[str]:
+        """
+        Get the argv prefix for installing Python packages.
+
+        Probes the sandbox once: ``uv pip install`` resolves much faster
+        than pip and is used when uv is listed among the available tools.
+        Falls back to non-interactive pip if the probe fails.
+        """
+        if self._pip_install is None:
+            try:
+                tools = (await self.get_info()).available_tools
+            except Exception:
+                tools = ()
+            if "uv" in tools:
+                self._pip_install = ["uv", "pip", "install", "--system", "--quiet"]
+            else:
+                self._pip_install = [
+                    "pip", "install", "--no-input", "--disable-pip-version-check", "--quiet",
+                ]
+        return self._pip_install
 
     async def install_nodejs_packages(
         self,
         packages: list[str],
         global_install: bool = False,
+        deadline: float | None = None,
     ) -> CommandResult:
         """
         Install Node.js packages using npm.
@@ -831,15 +1918,17 @@ class SandboxClient:
         Args:
             packages: List of package names
             global_install: Whether to install globally
+            deadline: Optional absolute time.monotonic() deadline
 
         Returns:
             CommandResult from npm install
         """
         # 使用 npm install 命令安装
-        global_flag = "-g" if global_install else ""
-        packages_str = " ".join(packages)
-        cmd = f"npm install {global_flag} {packages_str}".strip()
-        return await self.exec_command(cmd, timeout=300)
+        cmd = ["npm", "install", "--no-audit", "--no-fund"]
+        if global_install:
+            cmd.append("-g")
+        cmd.extend(packages)
+        return await self.exec_command(shlex.join(cmd), timeout=300, deadline=deadline)
 
     # ============================================================
     # Browser API
@@ -855,7 +1944,7 @@ class SandboxClient:
         Returns:
             Screenshot as PNG bytes
         """
-        client = self._ensure_client()
+        client = await self._connected()
         params = {}
         if url:
             params["url"] = url
@@ -880,14 +1969,12 @@ class SandboxClient:
         Returns:
             Action result
         """
-        client = self._ensure_client()
         payload = {
             "action": action,
             "params": params or {},
         }
-        response = await client.post("/v1/browser/actions", json=payload)
-        response.raise_for_status()
-        return response.json().get("data", {})
+        data = await self._post_json("/v1/browser/actions", payload)
+        return data.get("data", {})
 
     async def browser_info(self) -> dict:
         """
@@ -896,10 +1983,8 @@ class SandboxClient:
         Returns:
             Browser state and configuration
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/browser/info")
-        response.raise_for_status()
-        return response.json().get("data", {})
+        data = await self._get_json("/v1/browser/info")
+        return data.get("data", {})
 
     # ============================================================
     # Jupyter API
@@ -920,14 +2005,13 @@ class SandboxClient:
         Returns:
             Execution result with outputs
         """
-        client = self._ensure_client()
         payload = {"code": code}
         if session_id:
             payload["session_id"] = session_id
 
-        response = await client.post("/v1/jupyter/execute", json=payload)
-        response.raise_for_status()
-        return response.json().get("data", {})
+        data = await self._post_json("/v1/jupyter/execute", payload)
+
+        return data.get("data", {})
 
     async def jupyter_sessions(self) -> list[dict]:
         """
@@ -936,10 +2020,8 @@ class SandboxClient:
         Returns:
             List of session information
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/jupyter/sessions")
-        response.raise_for_status()
-        return response.json().get("data", {}).get("sessions", [])
+        data = await self._get_json("/v1/jupyter/sessions")
+        return data.get("data", {}).get("sessions", [])
 
     async def jupyter_info(self) -> dict:
         """
@@ -948,10 +2030,8 @@ class SandboxClient:
         Returns:
             Jupyter configuration and status
         """
-        client = self._ensure_client()
-        response = await client.get("/v1/jupyter/info")
-        response.raise_for_status()
-        return response.json().get("data", {})
+        data = await self._get_json("/v1/jupyter/info")
+        return data.get("data", {})
 
     # ============================================================
     # Utility API
@@ -965,6 +2045,9 @@ class SandboxClient:
         """
         Convert content to Markdown.
 
+        Bytes that are valid UTF-8 are sent as text; anything else (e.g. a
+        PDF) is sent base64 encoded instead of being lossily decoded.
+
         Args:
             content: Content to convert
             source_type: Source format (html, pdf, etc.)
@@ -972,14 +2055,14 @@ class SandboxClient:
         Returns:
             Markdown text
         """
-        client = self._ensure_client()
+        payload = {"source_type": source_type}
         if isinstance(content, bytes):
-            content = content.decode("utf-8", errors="replace")
-
-        payload = {
-            "content": content,
-            "source_type": source_type,
-        }
-        response = await client.post("/v1/util/convert_to_markdown", json=payload)
-        response.raise_for_status()
-        return response.json().get("data", {}).get("markdown", "")
+            try:
+                payload["content"] = content.decode("utf-8")
+            except UnicodeDecodeError:
+                payload["content"] = base64.b64encode(content).decode("ascii")
+                payload["encoding"] = "base64"
+        else:
+            payload["content"] = content
+        data = await self._post_json("/v1/util/convert_to_markdown", payload)
+        return data.get("data", {}).get("markdown", "")
@@ -5,18 +5,29 @@ Provides the same interface as ScriptExecutor but runs scripts
 in an isolated sandbox environment.
 """
 
+import asyncio
+import base64
 import hashlib
-import json
-from pathlib import Path
-from typing import Self
+import os
+import re
+import secrets
+import shlex
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, AsyncIterator, Iterator, Self
 
 from openskills.models.dependency import SkillDependency
 from openskills.sandbox.client import (
+    DEFAULT_CONCURRENCY,
     SandboxClient,
     CommandResult,
     SandboxExecutionError,
+    _gather_bounded,
 )
 from openskills.sandbox.logger import SandboxLogger, get_logger
+from openskills.utils import jsonlib
+
+if TYPE_CHECKING:
+    import httpx
 
 
 class SandboxExecutor:
@@ -38,6 +49,27 @@ class SandboxExecutor:
     WORKSPACE_DIR = "/home/gem"
     SCRIPTS_DIR = "/home/gem/scripts"
 
+    # pip cache under the workspace volume, so wheels downloaded by one
+    # setup_environment() are reused by later ones on the same sandbox
+    PIP_CACHE_DIR = "/home/gem/.cache/pip"
+    PIP_CONF_PATH = "/home/gem/.config/pip/pip.conf"
+    # Marker files of dependency sets installed in the sandbox, named by
+    # SkillDependency.cache_key(), so a long-lived sandbox skips reinstalls
+    DEPS_MARKER_DIR = "/home/gem/.cache/openskills/deps"
+    # Most system commands of a parallel dependency in flight at once
+    SETUP_CONCURRENCY = 4
+
+    # stdin larger than this is uploaded to a temp file instead of being
+    # inlined into the command
+    MAX_INLINE_STDIN = 64 * 1024
+
+    # Files larger than this are streamed from disk by upload_directory
+    # instead of being read into memory first
+    STREAM_UPLOAD_THRESHOLD = 1024 * 1024
+
+    # Scripts up to this size are kept in memory between executions
+    SCRIPT_CACHE_MAX_SIZE = 256 * 1024
+
     # Interpreter mapping by file extension
     INTERPRETERS = {
         ".py": "python3",
@@ -52,6 +84,7 @@ class SandboxExecutor:
         timeout: float = 120.0,
         logger: SandboxLogger | None = None,
         verbose: bool = True,
+        http_client: "httpx.AsyncClient | None" = None,
     ):
         """
         Initialize the sandbox executor.
@@ -61,14 +94,25 @@ class SandboxExecutor:
             timeout: Default timeout for operations
             logger: Custom logger instance
             verbose: Whether to print progress logs
+            http_client: Pooled HTTP client to run on (see SandboxClient);
+                left open on exit
         """
         self.base_url = base_url
         self.timeout = timeout
+        self.http_client = http_client
         self.logger = logger or get_logger(enabled=verbose)
         self.verbose = verbose
         self._client: SandboxClient | None = None
         self._environment_ready = False
         self._ready_logged = False
+        # Sandbox directories known to exist (with their ancestors)
+        self._mkdir_cache: set[str] = set()
+        # remote path -> digest of the content this executor uploaded there
+        self._uploaded: dict[str, str] = {}
+        # local script path -> ((st_mtime_ns, st_size), content) for small scripts
+        self._script_bytes_cache: dict[Path, tuple[tuple[int, int], bytes]] = {}
+        # Background interpreter warmup started by __aenter__
+        self._warmup_task: asyncio.Task | None = None
 
     async def __aenter__(self) -> Self:
         """Enter async context and initialize sandbox client."""
@@ -77,11 +121,12 @@ class SandboxExecutor:
         self._client = SandboxClient(
             base_url=self.base_url,
             timeout=self.timeout,
+            http_client=self.http_client,
         )
         await self._client.__aenter__()
 
         # Generate session token for display
-        session_id = hashlib.md5(f"{self.base_url}:{id(self)}".encode()).hexdigest()[:16]
+        session_id = format(hash((self.base_url, id(self))) & 0xFFFFFFFFFFFFFFFF, "016x")
         self.logger.authenticating(session_id)
 
         self.logger.allocating_resources(vcpu=1, memory_mb=2048)
@@ -89,8 +134,12 @@ class SandboxExecutor:
         self.logger.pulling_environment("python:3.11-slim")
         self.logger.mounting_workspace(self.WORKSPACE_DIR)
 
-        # Initialize workspace
-        await self._client.mkdir(self.SCRIPTS_DIR)
+        # Initialize workspace and point pip at the persistent cache
+        await asyncio.gather(self._ensure_dir(self.SCRIPTS_DIR), self._configure_pip())
+
+        # Start the interpreter now so its cold start overlaps with
+        # setup_environment() and the script upload
+        self._warmup_task = asyncio.create_task(self._warmup())
 
         self.logger.starting_agent()
         # Note: ready() is called after setup_environment() completes
@@ -100,10 +149,15 @@ class SandboxExecutor:
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
         """Exit async context and cleanup."""
         self.logger.cleanup()
+        if self._warmup_task:
+            self._warmup_task.cancel()
+            self._warmup_task = None
         if self._client:
             await self._client.__aexit__(exc_type, exc_val, exc_tb)
             self._client = None
         self._environment_ready = False
+        self._mkdir_cache.clear()
+        self._uploaded.clear()
         self.logger.disconnected()
 
     def _ensure_client(self) -> SandboxClient:
@@ -115,6 +169,79 @@ class SandboxExecutor:
             )
         return self._client
 
+    def _remember_dir(self, path: str) -> None:
+        """Record a created directory and all of its ancestors."""
+        while path and path != "/" and path not in self._mkdir_cache:
+            self._mkdir_cache.add(path)
+            path = str(PurePosixPath(path).parent)
+
+    async def _ensure_dir(self, path: str) -> None:
+        """Create a sandbox directory unless this executor already did."""
+        if path in self._mkdir_cache:
+            return
+        result = await self._ensure_client().mkdir(path)
+        if result.success:
+            self._remember_dir(path)
+
+    async def _configure_pip(self) -> None:
+        """Write a pip.conf enabling the workspace pip cache (best effort)."""
+        conf_dir = str(PurePosixPath(self.PIP_CONF_PATH).parent)
+        try:
+            await self._ensure_client().prepare_and_write(
+                conf_dir,
+                self.PIP_CONF_PATH,
+                f"[global]\ncache-dir = {self.PIP_CACHE_DIR}\n",
+            )
+        except SandboxExecutionError:
+            return
+        self._remember_dir(conf_dir)
+
+    async def _warmup(self) -> None:
+        """Run the Python interpreter once to prime the sandbox (best effort)."""
+        try:
+            await self._ensure_client().exec_command(
+                "python3 -c 'import sys, json, subprocess'", timeout=30
+            )
+        except Exception:
+            pass
+
+    @staticmethod
+    def _digest(content: bytes) -> str:
+        """Cache key for uploaded content (blake2b: fast, not for security)."""
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    @staticmethod
+    def _file_digest(path: str | Path) -> str:
+        """Digest of a file, read in chunks."""
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).hexdigest()
+
+    @staticmethod
+    def _read_bytes(path: str) -> bytes:
+        """Read a whole local file."""
+        with open(path, "rb") as f:
+            return f.read()
+
+    @staticmethod
+    def _scan_files(root: str, prefix: str = "") -> Iterator[tuple[str, str, int]]:
+        """
+        Walk a local tree with os.scandir.
+
+        Directory entries are classified from the dirent type, so only
+        regular files cost a stat() (for their size). Symlinked
+        directories are not followed.
+
+        Yields:
+            (relative POSIX path, local path, size in bytes) for each file
+        """
+        with os.scandir(root) as entries:
+            for entry in entries:
+                rel = prefix + entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    yield from SandboxExecutor._scan_files(entry.path, rel + "/")
+                elif entry.is_file():
+                    yield rel, entry.path, entry.stat().st_size
+
     async def health_check(self) -> bool:
         """Check if sandbox is healthy."""
         client = self._ensure_client()
@@ -122,17 +249,29 @@ class SandboxExecutor:
 
     async def setup_environment(
         self,
-        dependency: SkillDependency,
+        dependency: SkillDependency | None,
         upgrade_pip: bool = False,
+        batch: bool = True,
     ) -> list[CommandResult]:
         """
         Setup the sandbox environment with required dependencies.
 
-        Installs Python packages and executes system commands.
+        Installs Python packages and executes system commands. When the
+        dependency is marked ``parallel`` the system commands run
+        concurrently (at most SETUP_CONCURRENCY at a time) with each other
+        and with the Python install;
+        otherwise all steps run in order as one batched shell script, a
+        single round trip, and still get one result each. A batched setup
+        leaves a marker file in DEPS_MARKER_DIR; when the same dependency
+        set was already installed in this sandbox the script stops at that
+        check and no setup results are returned.
 
         Args:
-            dependency: SkillDependency with packages and commands
+            dependency: SkillDependency with packages and commands (None
+                or an empty one only marks the environment ready)
             upgrade_pip: Whether to upgrade pip first
+            batch: Whether sequential steps are sent as one script (False
+                sends one request per step)
 
         Returns:
             List of CommandResults from setup commands
@@ -149,27 +288,138 @@ class SandboxExecutor:
             result = await client.exec_command("pip install --upgrade pip")
             results.append(result)
 
-        # Install Python packages
-        if dependency.python:
+        if dependency is None or not dependency.has_dependencies():
+            self.mark_ready()
+            return results
+
+        # Built once; None when there are no Python packages
+        pip_command = dependency.get_pip_install_command()
+
+        async def install_python() -> CommandResult:
             self.logger.installing_dependencies(dependency.python)
-            pip_cmd = dependency.get_pip_install_command()
-            if pip_cmd:
-                result = await client.exec_command(pip_cmd)
-                result.raise_for_status()
-                results.append(result)
+            result = await client.exec_command(pip_command)
+            result.raise_for_status()
             self.logger.dependency_installed(len(dependency.python))
+            return result
+
+        # Bounds concurrent system commands (the pip install is not counted)
+        semaphore = asyncio.Semaphore(self.SETUP_CONCURRENCY)
 
-        # Execute system commands
-        for cmd in dependency.get_system_commands():
-            self.logger.running_system_command(cmd)
-            result = await client.exec_command(cmd, workdir=self.WORKSPACE_DIR)
+        async def run_system(cmd: str) -> CommandResult:
+            async with semaphore:
+                self.logger.running_system_command(cmd)
+                result = await client.exec_command(cmd, workdir=self.WORKSPACE_DIR)
             result.raise_for_status()
-            results.append(result)
+            return result
+
+        if batch and not dependency.parallel:
+            steps = [(cmd, self.WORKSPACE_DIR) for cmd in dependency.system]
+            if pip_command:
+                steps.insert(0, (pip_command, None))
+            marker = f"{self.DEPS_MARKER_DIR}/{dependency.cache_key()}"
+            batch_results = await self._run_batched(steps, done_marker=marker)
+            # Empty when the marker showed the set was installed before
+            if batch_results:
+                if pip_command:
+                    self.logger.installing_dependencies(dependency.python)
+                for cmd in dependency.system:
+                    self.logger.running_system_command(cmd)
+                if pip_command:
+                    self.logger.dependency_installed(len(dependency.python))
+            results.extend(batch_results)
+            self._environment_ready = True
+            self._log_ready_once()
+            return results
+
+        groups = dependency.get_parallel_groups()
+        if pip_command:
+            if dependency.parallel and groups:
+                # Independent commands overlap with the pip install
+                results.extend(await asyncio.gather(
+                    install_python(), *(run_system(cmd) for cmd in groups[0])
+                ))
+                groups = groups[1:]
+            else:
+                results.append(await install_python())
+
+        for group in groups:
+            results.extend(await asyncio.gather(*(run_system(cmd) for cmd in group)))
 
         self._environment_ready = True
         self._log_ready_once()
         return results
 
+    async def _run_batched(
+        self,
+        steps: list[tuple[str, str | None]],
+        done_marker: str | None = None,
+    ) -> list[CommandResult]:
+        """
+        Run shell commands in order with a single exec call.
+
+        Each step runs in its own subshell (in its workdir, if given) after
+        a random marker carrying the step index is written to stdout; the
+        script stops at the first failing step. Splitting stdout on the
+        markers gives back one result per step that ran, also when the
+        sandbox returns stdout and stderr mixed in one output. stderr is
+        not split: it is reported whole on the last step that ran (the
+        failing one, on error).
+
+        Args:
+            steps: (command, workdir) pairs; workdir None keeps the default
+            done_marker: Sandbox file that is created once every step has
+                succeeded; if it already exists nothing runs
+
+        Returns:
+            Results of the steps, all successful ([] if done_marker existed)
+
+        Raises:
+            SandboxExecutionError: If a step fails (with that step's stderr)
+        """
+        if len(steps) == 1 and done_marker is None:
+            command, workdir = steps[0]
+            kwargs = {"workdir": workdir} if workdir else {}
+            result = await self._ensure_client().exec_command(command, **kwargs)
+            result.raise_for_status()
+            return [result]
+
+        marker = f"__openskills_step_{secrets.token_hex(8)}__"
+        lines = []
+        if done_marker:
+            quoted = shlex.quote(done_marker)
+            lines.append(f"if [ -f {quoted} ]; then echo {marker}done; exit 0; fi")
+        for index, (command, workdir) in enumerate(steps):
+            lines.append(f"echo {marker}_{index}__")
+            if workdir:
+                command = f"cd {shlex.quote(workdir)} && {command}"
+            lines.append(f"( {command}\n) || exit $?")
+        if done_marker:
+            directory = shlex.quote(done_marker.rsplit("/", 1)[0])
+            # Best effort: a missing marker only costs a reinstall
+            lines.append(f"mkdir -p {directory} && touch {quoted} || true")
+        result = await self._ensure_client().exec_command("\n".join(lines))
+        if result.success and result.stdout.startswith(f"{marker}done"):
+            return []
+
+        stdouts: list[str] = []
+        matches = list(re.finditer(rf"{marker}_(\d+)__\n?", result.stdout))
+        for match, following in zip(matches, matches[1:] + [None]):
+            index = int(match.group(1))
+            if index < len(steps):
+                end = following.start() if following else len(result.stdout)
+                stdouts += [""] * (index + 1 - len(stdouts))
+                stdouts[index] = result.stdout[match.end():end]
+        if result.success:
+            # Every step ran, even if the output came back truncated
+            stdouts += [""] * (len(steps) - len(stdouts))
+        elif not stdouts:
+            # Nothing ran (the script itself failed)
+            result.raise_for_status()
+        results = [CommandResult(exit_code=0, stdout=stdout, stderr="") for stdout in stdouts]
+        results[-1] = CommandResult(result.exit_code, stdouts[-1], result.stderr)
+        results[-1].raise_for_status()
+        return results
+
     def _log_ready_once(self) -> None:
         """Log ready message only once."""
         if not hasattr(self, '_ready_logged') or not self._ready_logged:
@@ -190,6 +440,10 @@ class SandboxExecutor:
         """
         Upload a script file to the sandbox.
 
+        Skipped when this executor already uploaded identical content to
+        the same path. Small scripts are also kept in memory and only read
+        from disk again when their modification time or size changes.
+
         Args:
             local_path: Local path to the script file
             remote_name: Optional remote filename (defaults to local name)
@@ -202,14 +456,26 @@ class SandboxExecutor:
         """
         client = self._ensure_client()
 
-        if not local_path.exists():
-            raise FileNotFoundError(f"Script not found: {local_path}")
+        try:
+            stat = local_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Script not found: {local_path}") from None
 
         remote_name = remote_name or local_path.name
         remote_path = f"{self.SCRIPTS_DIR}/{remote_name}"
 
-        content = local_path.read_text(encoding="utf-8")
-        await client.write_file(remote_path, content, mode="0755")
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._script_bytes_cache.get(local_path)
+        if cached and cached[0] == version:
+            content = cached[1]
+        else:
+            content = await asyncio.to_thread(local_path.read_bytes)
+            if len(content) <= self.SCRIPT_CACHE_MAX_SIZE:
+                self._script_bytes_cache[local_path] = (version, content)
+        digest = self._digest(content)
+        if self._uploaded.get(remote_path) != digest:
+            await client.write_file(remote_path, content, mode="0755")
+            self._uploaded[remote_path] = digest
 
         return remote_path
 
@@ -221,6 +487,9 @@ class SandboxExecutor:
         """
         Upload a directory of files to the sandbox.
 
+        Files whose content this executor already uploaded to the same path
+        are skipped.
+
         Args:
             local_dir: Local directory path
             remote_subdir: Optional subdirectory in workspace
@@ -234,23 +503,42 @@ class SandboxExecutor:
             raise FileNotFoundError(f"Directory not found: {local_dir}")
 
         remote_base = f"{self.WORKSPACE_DIR}/{remote_subdir}".rstrip("/")
-        await client.mkdir(remote_base)
 
-        uploaded = []
-        for item in local_dir.rglob("*"):
-            if item.is_file():
-                rel_path = item.relative_to(local_dir)
-                remote_path = f"{remote_base}/{rel_path}"
-
-                # Ensure parent directory exists
-                remote_parent = str(Path(remote_path).parent)
-                await client.mkdir(remote_parent)
-
-                content = item.read_bytes()
+        # remote path -> (local path, size)
+        files = {
+            f"{remote_base}/{rel}": (path, size)
+            for rel, path, size in self._scan_files(str(local_dir))
+        }
+
+        # Every directory of the tree not created yet, in one mkdir -p round-trip
+        dirs = {remote_base, *(path.rsplit("/", 1)[0] for path in files)}
+        dirs -= self._mkdir_cache
+        if dirs:
+            result = await client.exec_command(shlex.join(["mkdir", "-p", *sorted(dirs)]))
+            result.raise_for_status()
+            for directory in dirs:
+                self._remember_dir(directory)
+
+        async def upload(remote_path: str) -> None:
+            path, size = files[remote_path]
+            if size > self.STREAM_UPLOAD_THRESHOLD:
+                digest = await asyncio.to_thread(self._file_digest, path)
+                if self._uploaded.get(remote_path) == digest:
+                    return
+                # Streamed in chunks straight from disk
+                await client.upload_file(Path(path), remote_path)
+            else:
+                # Read off the event loop so disk I/O overlaps the uploads
+                content = await asyncio.to_thread(self._read_bytes, path)
+                digest = self._digest(content)
+                if self._uploaded.get(remote_path) == digest:
+                    return
                 await client.write_file(remote_path, content)
-                uploaded.append(remote_path)
+            self._uploaded[remote_path] = digest
 
-        return uploaded
+        # Independent files are uploaded concurrently over the pooled client
+        await _gather_bounded(upload, files, DEFAULT_CONCURRENCY)
+        return list(files)
 
     async def execute(
         self,
@@ -285,17 +573,21 @@ class SandboxExecutor:
         client = self._ensure_client()
         script_name = script_path.name
 
-        # Validate script extension
-        ext = script_path.suffix.lower()
-        if ext not in self.INTERPRETERS:
+        # Validate script extension; one lookup both validates and dispatches
+        ext = os.path.splitext(script_name)[1].lower()
+        interpreter = self.INTERPRETERS.get(ext)
+        if interpreter is None:
             raise ValueError(f"Unsupported script type: {ext}")
 
         # Upload script
         self.logger.progress(f"上传脚本: {script_name}")
         remote_script = await self.upload_script(script_path)
 
+        if self._warmup_task:
+            await self._warmup_task
+            self._warmup_task = None
+
         # Build command
-        interpreter = self.INTERPRETERS[ext]
         cmd_parts = [interpreter, remote_script]
 
         if args:
@@ -303,16 +595,24 @@ class SandboxExecutor:
 
         command = " ".join(cmd_parts)
 
-        # Handle input data
-        stdin_data = input_data
-        if kwargs and not stdin_data:
-            stdin_data = json.dumps(kwargs)
-
-        # If we have stdin data, use echo with pipe
-        if stdin_data:
-            # Escape single quotes in the data
-            escaped_data = stdin_data.replace("'", "'\"'\"'")
-            command = f"echo '{escaped_data}' | {command}"
+        # Handle input data, newline-terminated like a line typed into the
+        # script; kwargs are serialized straight to bytes (orjson when available)
+        data = b""
+        if input_data:
+            data = f"{input_data}\n".encode("utf-8")
+        elif kwargs:
+            data = jsonlib.dumps(kwargs) + b"\n"
+
+        if data:
+            if len(data) > self.MAX_INLINE_STDIN:
+                # Large input travels as a file upload, not as shell argv
+                stdin_path = f"/tmp/openskills-stdin-{secrets.token_hex(8)}"
+                await client.write_file(stdin_path, data)
+                command = f"{command} < {stdin_path}; rc=$?; rm -f {stdin_path}; exit $rc"
+            else:
+                # base64 needs no shell quoting and keeps the data byte-exact
+                encoded = base64.b64encode(data).decode("ascii")
+                command = f"printf '%s\\n' '{encoded}' | base64 -d | {command}"
 
         # Execute
         self.logger.executing_script(script_name)
@@ -352,3 +652,28 @@ class SandboxExecutor:
             timeout=timeout or self.timeout,
             workdir=workdir or self.WORKSPACE_DIR,
         )
+
+    async def execute_commands(
+        self,
+        commands: list[str],
+        timeout: float | None = None,
+        workdir: str | None = None,
+    ) -> AsyncIterator[CommandResult]:
+        """
+        Execute raw shell commands in order with a single request.
+
+        Args:
+            commands: Shell commands to execute
+            timeout: Timeout in seconds for the whole list
+            workdir: Working directory
+
+        Yields:
+            CommandResult of each command as soon as it finishes
+        """
+        client = self._ensure_client()
+        async for result in client.exec_many(
+            commands,
+            timeout=timeout or self.timeout,
+            workdir=workdir or self.WORKSPACE_DIR,
+        ):
+            yield result
@@ -4,13 +4,65 @@ Sandbox Logger - Formatted progress output for sandbox operations.
 Provides visual feedback during sandbox initialization and execution.
 """
 
-from datetime import datetime
-from typing import Callable
+import functools
+import sys
+import time
+import weakref
+from typing import Callable, Sequence, TextIO
 
 from rich.console import Console
 from rich.text import Text
 
 
+def _skip_if_disabled(method: Callable) -> Callable:
+    """Return before any message formatting when the logger is disabled."""
+    @functools.wraps(method)
+    def wrapper(self: "SandboxLogger", *args, **kwargs):
+        if self.enabled:
+            method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class _DeferredFlushStream:
+    """
+    Text stream that batches writes into few large ones.
+
+    Rich flushes its file after every line; here flush() is a no-op and
+    output reaches the underlying stream when 64 KiB accumulate or drain()
+    is called.
+    """
+
+    LIMIT = 64 * 1024
+
+    def __init__(self, stream: TextIO):
+        self._stream = stream
+        self._parts: list[str] = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.LIMIT:
+            self.drain()
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> None:
+        """Write out everything buffered and flush the underlying stream."""
+        if self._parts:
+            self._stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self._stream.flush()
+
+    def __getattr__(self, name: str):
+        # isatty, encoding, fileno, ... come from the wrapped stream
+        return getattr(self._stream, name)
+
+
 class SandboxLogger:
     """
     Logger for sandbox operations with formatted output.
@@ -33,11 +85,16 @@ class SandboxLogger:
     ICON_CHECK = "◉"
     ICON_LOCK = "🔒"
 
+    # Last formatted timestamp; the format has second resolution
+    _last_ts_sec = -1
+    _last_ts_str = ""
+
     def __init__(
         self,
         console: Console | None = None,
         enabled: bool = True,
         prefix: str = "",
+        buffered: bool = False,
     ):
         """
         Initialize the sandbox logger.
@@ -46,14 +103,34 @@ class SandboxLogger:
             console: Rich console instance
             enabled: Whether logging is enabled
             prefix: Prefix for all log messages
+            buffered: Batch output to stdout into large writes instead of
+                one write per line; lines appear on ready(), on
+                script_complete(), on flush() and at exit. Ignored when a
+                console is given
         """
+        self._stream: _DeferredFlushStream | None = None
+        if console is None and buffered:
+            self._stream = _DeferredFlushStream(sys.stdout)
+            console = Console(file=self._stream)
+            # Drains at exit, or earlier if this logger is collected; unlike
+            # atexit.register(self.flush) it does not keep the logger alive
+            weakref.finalize(self, self._stream.drain)
         self.console = console or Console()
         self.enabled = enabled
         self.prefix = prefix
 
+    def flush(self) -> None:
+        """Write out buffered log lines (no-op when not buffered)."""
+        if self._stream is not None:
+            self._stream.drain()
+
     def _timestamp(self) -> str:
-        """Get formatted timestamp."""
-        return datetime.now().strftime("[%H:%M:%S]")
+        """Get formatted timestamp (formatted at most once per second)."""
+        now = int(time.time())
+        if now != SandboxLogger._last_ts_sec:
+            SandboxLogger._last_ts_str = time.strftime("[%H:%M:%S]", time.localtime(now))
+            SandboxLogger._last_ts_sec = now
+        return SandboxLogger._last_ts_str
 
     def _print(self, icon: str, message: str, style: str = ""):
         """Print a formatted log line."""
@@ -66,26 +143,32 @@ class SandboxLogger:
 
         self.console.print(timestamp, icon_text, msg_text, sep="")
 
+    @_skip_if_disabled
     def info(self, message: str):
         """Print info message."""
         self._print(self.ICON_INFO, message, "blue")
 
+    @_skip_if_disabled
     def success(self, message: str):
         """Print success message."""
         self._print(self.ICON_SUCCESS, message, "green")
 
+    @_skip_if_disabled
     def error(self, message: str):
         """Print error message."""
         self._print(self.ICON_ERROR, message, "red")
 
+    @_skip_if_disabled
     def progress(self, message: str):
         """Print progress message."""
         self._print(self.ICON_ARROW, message, "cyan")
 
+    @_skip_if_disabled
     def initializing(self):
         """Log sandbox initialization start."""
         self._print(self.ICON_GEAR, "正在初始化沙箱环境...", "yellow")
 
+    @_skip_if_disabled
     def authenticating(self, token_preview: str = ""):
         """Log authentication."""
         if token_preview:
@@ -94,6 +177,7 @@ class SandboxLogger:
         else:
             self._print(self.ICON_LOCK, "正在验证连接...", "yellow")
 
+    @_skip_if_disabled
     def allocating_resources(self, vcpu: int = 1, memory_mb: int = 2048, gpu: str = "N/A"):
         """Log resource allocation."""
         self._print(self.ICON_ARROW, "正在分配虚拟资源...", "cyan")
@@ -103,14 +187,17 @@ class SandboxLogger:
             "dim"
         )
 
+    @_skip_if_disabled
     def configuring_network(self):
         """Log network configuration."""
         self._print(self.ICON_NETWORK, "正在配置安全网络策略...", "cyan")
 
+    @_skip_if_disabled
     def pulling_environment(self, image: str = "python:3.11-slim"):
         """Log environment pull."""
         self._print(self.ICON_DOWNLOAD, f"正在拉取运行环境: {image}", "cyan")
 
+    @_skip_if_disabled
     def download_progress(self, percent: int = 100):
         """Log download progress."""
         bar_width = 20
@@ -118,19 +205,24 @@ class SandboxLogger:
         bar = "█" * filled + "░" * (bar_width - filled)
         self._print(self.ICON_DOWNLOAD, f"下载中: [{bar}] {percent}%", "dim")
 
+    @_skip_if_disabled
     def mounting_workspace(self, path: str = "/workspace"):
         """Log workspace mounting."""
         self._print(self.ICON_FOLDER, f"正在挂载工作区卷 {path}...", "cyan")
 
+    @_skip_if_disabled
     def starting_agent(self):
         """Log sandbox agent start."""
         self._print(self.ICON_ROCKET, "正在启动沙箱代理...", "cyan")
 
+    @_skip_if_disabled
     def ready(self):
         """Log sandbox ready."""
         self._print(self.ICON_CHECK, "沙箱环境准备就绪。", "green bold")
+        self.flush()
 
-    def installing_dependencies(self, packages: list[str]):
+    @_skip_if_disabled
+    def installing_dependencies(self, packages: Sequence[str]):
         """Log dependency installation."""
         if packages:
             pkg_list = ", ".join(packages[:3])
@@ -138,21 +230,26 @@ class SandboxLogger:
                 pkg_list += f" 等 {len(packages)} 个包"
             self._print(self.ICON_DOWNLOAD, f"正在安装依赖: {pkg_list}...", "cyan")
 
+    @_skip_if_disabled
     def dependency_installed(self, count: int):
         """Log dependency installation complete."""
         self._print(self.ICON_SUCCESS, f"已安装 {count} 个依赖包。", "green")
 
+    @_skip_if_disabled
     def executing_script(self, script_name: str):
         """Log script execution."""
         self._print(self.ICON_GEAR, f"正在执行脚本: {script_name}...", "yellow")
 
+    @_skip_if_disabled
     def script_complete(self, script_name: str, success: bool = True):
         """Log script execution complete."""
         if success:
             self._print(self.ICON_SUCCESS, f"脚本 {script_name} 执行完成。", "green")
         else:
             self._print(self.ICON_ERROR, f"脚本 {script_name} 执行失败。", "red")
+        self.flush()
 
+    @_skip_if_disabled
     def running_system_command(self, command: str):
         """Log system command execution."""
         # Truncate long commands
@@ -160,10 +257,12 @@ class SandboxLogger:
             command = command[:47] + "..."
         self._print(self.ICON_ARROW, f"执行系统命令: {command}", "dim")
 
+    @_skip_if_disabled
     def cleanup(self):
         """Log cleanup."""
         self._print(self.ICON_INFO, "正在清理沙箱环境...", "dim")
 
+    @_skip_if_disabled
     def disconnected(self):
         """Log disconnection."""
         self._print(self.ICON_INFO, "已断开沙箱连接。", "dim")
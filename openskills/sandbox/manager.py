@@ -6,13 +6,24 @@ for reuse and cleanup.
 """
 
 import asyncio
+import json
 from collections import OrderedDict
 from enum import Enum
-from typing import Self
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Self
 
 from openskills.models.dependency import SkillDependency
+from openskills.sandbox.client import (
+    DEFAULT_CONCURRENCY,
+    SandboxClient,
+    _gather_bounded,
+    create_http_client,
+)
 from openskills.sandbox.executor import SandboxExecutor
 
+if TYPE_CHECKING:
+    import httpx
+
 
 class SandboxStrategy(str, Enum):
     """Strategy for sandbox instance management."""
@@ -52,6 +63,7 @@ class SandboxManager:
         cache_size: int = DEFAULT_CACHE_SIZE,
         timeout: float = 120.0,
         verbose: bool = True,
+        dep_cache_path: Path | None = None,
     ):
         """
         Initialize the sandbox manager.
@@ -62,6 +74,11 @@ class SandboxManager:
             cache_size: Maximum cached executors (for PER_SKILL)
             timeout: Default timeout for operations
             verbose: Whether to print progress logs
+            dep_cache_path: Optional JSON file remembering which dependency
+                sets were installed per base URL, so a restarted manager
+                talking to a long-lived PERSISTENT sandbox skips reinstalls
+                (e.g. ``~/.cache/openskills/installed_deps.json``). Only
+                use it when the sandbox outlives the manager.
         """
         self.base_url = base_url
         self.strategy = strategy
@@ -72,19 +89,38 @@ class SandboxManager:
         # LRU cache for skill executors
         self._cache: OrderedDict[str, SandboxExecutor] = OrderedDict()
         self._persistent_executor: SandboxExecutor | None = None
-        self._installed_deps: set[str] = set()  # Track installed dependencies
-        self._lock = asyncio.Lock()
+        # cache_key()s of dependency sets installed in the persistent sandbox
+        self._installed_dep_hashes: set[str] = set()
+        self.dep_cache_path = dep_cache_path
+        # One lock per skill (PER_SKILL) so only same-skill callers wait on a
+        # slow setup (looked up without awaiting, so the dict needs no lock);
+        # _meta_lock serializes cleanup, _persistent_lock guards PERSISTENT
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._meta_lock = asyncio.Lock()
+        self._persistent_lock = asyncio.Lock()
         self._active = False
+        # Kept open across health checks so each probe reuses the connection
+        self._probe_client: SandboxClient | None = None
+        # Connection pool shared by every executor and probe of this manager,
+        # open while the manager is active
+        self._http: "httpx.AsyncClient | None" = None
 
     async def __aenter__(self) -> Self:
-        """Enter async context."""
+        """Enter async context and open the manager's connection pool."""
+        self._http = create_http_client(self.base_url, self.timeout)
         self._active = True
+        self._installed_dep_hashes.update(self._load_dep_cache().get(self.base_url, ()))
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
-        """Exit async context and cleanup all executors."""
-        await self.cleanup()
-        self._active = False
+        """Exit async context, cleanup all executors and close the pool."""
+        try:
+            await self.cleanup()
+        finally:
+            self._active = False
+            if self._http is not None:
+                await self._http.aclose()
+                self._http = None
 
     async def get_executor(
         self,
@@ -112,39 +148,57 @@ class SandboxManager:
                 "async with SandboxManager() as manager: ..."
             )
 
-        async with self._lock:
-            if self.strategy == SandboxStrategy.PER_EXECUTION:
-                return await self._create_executor(dependency)
+        if self.strategy == SandboxStrategy.PER_EXECUTION:
+            return await self._create_executor(dependency)
+
+        if self.strategy == SandboxStrategy.PERSISTENT:
+            async with self._persistent_lock:
+                # Skills with identical dependency sets share one install
+                key = None
+                if dependency and dependency.has_dependencies():
+                    key = dependency.cache_key()
+                    if key in self._installed_dep_hashes:
+                        dependency = None
 
-            elif self.strategy == SandboxStrategy.PERSISTENT:
                 if not self._persistent_executor:
                     self._persistent_executor = await self._create_executor(dependency)
-                    # Track installed deps
-                    if dependency and dependency.has_dependencies():
-                        self._installed_deps.add(skill_name)
-                elif dependency and dependency.has_dependencies():
-                    # Install new dependencies if not already installed for this skill
-                    if skill_name not in self._installed_deps:
-                        await self._persistent_executor.setup_environment(dependency)
-                        self._installed_deps.add(skill_name)
+                elif dependency:
+                    await self._persistent_executor.setup_environment(dependency)
+
+                if key is not None and key not in self._installed_dep_hashes:
+                    self._installed_dep_hashes.add(key)
+                    self._save_dep_cache()
                 return self._persistent_executor
 
-            else:  # PER_SKILL
-                if skill_name in self._cache:
-                    # Move to end (LRU)
-                    self._cache.move_to_end(skill_name)
-                    return self._cache[skill_name]
+        # PER_SKILL: a cache hit needs no lock, as nothing is awaited
+        # between the lookup and the return
+        executor = self._cache.get(skill_name)
+        if executor is not None:
+            # Move to end (LRU)
+            self._cache.move_to_end(skill_name)
+            return executor
+
+        lock = self._locks.get(skill_name)
+        if lock is None:
+            lock = self._locks[skill_name] = asyncio.Lock()
+
+        async with lock:
+            executor = self._cache.get(skill_name)
+            if executor is not None:
+                # Created while this caller waited for the lock
+                self._cache.move_to_end(skill_name)
+                return executor
 
-                # Create new executor
-                executor = await self._create_executor(dependency)
-                self._cache[skill_name] = executor
+            # Create new executor
+            executor = await self._create_executor(dependency)
+            self._cache[skill_name] = executor
 
-                # Evict oldest if cache is full
-                while len(self._cache) > self.cache_size:
-                    oldest_name, oldest_executor = self._cache.popitem(last=False)
-                    await self._cleanup_executor(oldest_executor)
+            # Evict oldest if cache is full
+            while len(self._cache) > self.cache_size:
+                oldest_name, oldest_executor = self._cache.popitem(last=False)
+                await self._cleanup_executor(oldest_executor)
 
-                return executor
+            return executor
 
     async def _create_executor(
         self,
@@ -155,6 +209,7 @@ class SandboxManager:
             base_url=self.base_url,
             timeout=self.timeout,
             verbose=self.verbose,
+            http_client=self._http,
         )
         await executor.__aenter__()
 
@@ -167,6 +222,28 @@ class SandboxManager:
 
         return executor
 
+    def _load_dep_cache(self) -> dict[str, list[str]]:
+        """Read the on-disk installed-dependency cache ({} if unset or unreadable)."""
+        if self.dep_cache_path is None:
+            return {}
+        try:
+            data = json.loads(self.dep_cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_dep_cache(self) -> None:
+        """Record this manager's installed dependency keys on disk (best effort)."""
+        if self.dep_cache_path is None:
+            return
+        data = self._load_dep_cache()
+        data[self.base_url] = sorted(self._installed_dep_hashes)
+        try:
+            self.dep_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            self.dep_cache_path.write_text(json.dumps(data), encoding="utf-8")
+        except OSError:
+            pass
+
     async def _cleanup_executor(self, executor: SandboxExecutor) -> None:
         """Cleanup a single executor."""
         try:
@@ -176,19 +253,26 @@ class SandboxManager:
 
     async def cleanup(self) -> None:
         """Cleanup all cached executors."""
-        async with self._lock:
+        async with self._meta_lock:
             # Cleanup cached executors
-            for executor in self._cache.values():
-                await self._cleanup_executor(executor)
+            executors = list(self._cache.values())
             self._cache.clear()
+            self._locks.clear()
+            for executor in executors:
+                await self._cleanup_executor(executor)
 
+        async with self._persistent_lock:
             # Cleanup persistent executor
             if self._persistent_executor:
                 await self._cleanup_executor(self._persistent_executor)
                 self._persistent_executor = None
 
             # Reset installed deps tracking
-            self._installed_deps.clear()
+            self._installed_dep_hashes.clear()
+
+            if self._probe_client:
+                await self._probe_client.__aexit__(None, None, None)
+                self._probe_client = None
 
     async def warmup(self, skill_name: str = "_default") -> SandboxExecutor:
         """
@@ -205,23 +289,50 @@ class SandboxManager:
         """
         return await self.get_executor(skill_name, dependency=None)
 
+    async def prewarm(
+        self,
+        skill_names: Iterable[str],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> list[SandboxExecutor]:
+        """
+        Warmup executors for several skills concurrently.
+
+        Their connection setup and sandbox initialization overlap, so N
+        skills take about as long as the slowest one rather than the sum.
+        Every name goes through get_executor(), so cached or repeated
+        names are created only once. With PERSISTENT this creates the one
+        shared executor; PER_EXECUTION keeps nothing, so nothing is created.
+
+        Args:
+            skill_names: Names to cache executors under (at most
+                cache_size of them stay cached)
+            concurrency: Maximum executors being set up at once
+
+        Returns:
+            The executors, in the order of skill_names
+        """
+        if self.strategy == SandboxStrategy.PER_EXECUTION:
+            return []
+        return await _gather_bounded(self.get_executor, skill_names, concurrency)
+
     async def health_check(self) -> bool:
         """
         Check if the sandbox server is healthy.
 
-        Creates a temporary executor for the check.
+        Uses a lightweight client kept open until cleanup(), so repeated
+        checks reuse one keep-alive connection instead of setting up an
+        executor (and a connection) each time.
 
         Returns:
             True if sandbox is healthy
         """
-        executor = SandboxExecutor(
-            base_url=self.base_url,
-            timeout=5.0,
-            verbose=False,  # Silent health check
-        )
         try:
-            async with executor:
-                return await executor.health_check()
+            if self._probe_client is None:
+                client = SandboxClient(
+                    base_url=self.base_url, timeout=5.0, http_client=self._http
+                )
+                self._probe_client = await client.__aenter__()
+            return await self._probe_client.health_check()
         except Exception:
             return False
 
@@ -0,0 +1,115 @@
+"""
+Aho-Corasick keyword automaton.
+
+Finds every occurrence of a set of keywords in a text with a single
+left-to-right scan, independent of how many keywords are registered.
+"""
+
+from collections import deque
+from typing import Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+
+
+class KeywordAutomaton(Generic[T]):
+    """
+    Multi-keyword substring matcher.
+
+    Keywords are added with an associated value; after ``build()`` a call to
+    ``iter(text)`` yields ``(end_index, value)`` for every keyword occurrence.
+    Adding keywords after building marks the automaton dirty and it is
+    rebuilt automatically on the next scan.
+
+    Example:
+        automaton = KeywordAutomaton()
+        automaton.add("meeting", "meeting-summary")
+        automaton.add("review", "code-review")
+        values = {value for _, value in automaton.iter("review the meeting")}
+    """
+
+    def __init__(self):
+        # State 0 is the root. Each state has goto transitions, a failure
+        # link, the values of keywords ending exactly in it (_values) and,
+        # once built, those of all keywords ending in it (_out).
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._values: list[list[T]] = [[]]
+        self._out: list[list[T]] = [[]]
+        self._built = True
+
+    def __len__(self) -> int:
+        """Number of states in the automaton."""
+        return len(self._goto)
+
+    def add(self, keyword: str, value: T) -> None:
+        """
+        Register a keyword.
+
+        Args:
+            keyword: Text to search for (matched case-sensitively)
+            value: Value reported when the keyword is found
+        """
+        if not keyword:
+            return
+
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._values.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+
+        self._values[state].append(value)
+        self._built = False
+
+    def build(self) -> None:
+        """Compute failure links (breadth-first over the keyword trie)."""
+        goto, fail = self._goto, self._fail
+        out = [list(values) for values in self._values]
+        queue = deque()
+
+        for state in goto[0].values():
+            fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in goto[state].items():
+                queue.append(next_state)
+                link = fail[state]
+                while link and char not in goto[link]:
+                    link = fail[link]
+                fail[next_state] = goto[link].get(char, 0)
+                if fail[next_state] == next_state:
+                    fail[next_state] = 0
+                # Inherit matches of the longest proper suffix
+                out[next_state].extend(out[fail[next_state]])
+
+        self._out = out
+        self._built = True
+
+    def iter(self, text: str) -> Iterator[tuple[int, T]]:
+        """
+        Scan text for all registered keywords.
+
+        Args:
+            text: Text to scan
+
+        Yields:
+            (end_index, value) for every keyword occurrence
+        """
+        if not self._built:
+            self.build()
+
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for value in out[state]:
+                yield index, value
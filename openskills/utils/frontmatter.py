@@ -9,17 +9,28 @@ from typing import Any
 
 import yaml
 
+# libyaml's C loader when PyYAML was built with it (several times faster)
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # pragma: no cover - depends on the PyYAML build
+    from yaml import SafeLoader as _Loader
 
-FRONTMATTER_PATTERN = re.compile(
-    r"^---\s*\n(.*?)\n---\s*\n(.*)$",
-    re.DOTALL
-)
+# Top-level "key: value" / "key:" lines and "- item" list lines
+_KEY_LINE_RE = re.compile(r"([A-Za-z_][\w-]*):(?: +(.*))?")
+_ITEM_LINE_RE = re.compile(r"( *)- +(.*)")
+
+# Characters that give a plain YAML scalar special meaning when leading it
+_INDICATORS = frozenset("-?:,[]{}#&*!|>'\"%@`")
 
 
 def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     """
     Parse YAML frontmatter from markdown content.
 
+    Not memoized here: SkillParser caches parsed headers by content digest,
+    so unchanged files are not re-parsed on reload. Each call returns a
+    fresh dict the caller may mutate freely.
+
     Args:
         content: The full markdown content including frontmatter
 
@@ -45,16 +56,21 @@ def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     """
     content = content.strip()
 
-    match = FRONTMATTER_PATTERN.match(content)
-    if not match:
+    split = _split_frontmatter(content)
+    if split is None:
         # No frontmatter found
         return {}, content
+    frontmatter_str, body = split
+    if not frontmatter_str.strip():
+        # Empty block: nothing for the YAML loader to do
+        return {}, body.strip()
 
-    frontmatter_str = match.group(1)
-    body = match.group(2)
+    frontmatter = _fast_parse(frontmatter_str)
+    if frontmatter is not None:
+        return frontmatter, body.strip()
 
     try:
-        frontmatter = yaml.safe_load(frontmatter_str)
+        frontmatter = yaml.load(frontmatter_str, Loader=_Loader)
         if frontmatter is None:
             frontmatter = {}
         if not isinstance(frontmatter, dict):
@@ -65,6 +81,117 @@ def parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     return frontmatter, body.strip()
 
 
+def _fast_parse(block: str) -> dict[str, Any] | None:
+    """
+    Parse the common frontmatter shape without the YAML loader.
+
+    Handles top-level ``key: value`` lines whose values are plain or simply
+    quoted strings, and ``key:`` followed by ``- item`` string lists, which
+    covers typical SKILL.md headers. Anything else (nested mappings,
+    comments, block or flow collections, anchors, escapes, or scalars that
+    YAML would load as numbers, booleans, dates or null) returns None so
+    the caller falls back to YAML, which keeps results identical.
+
+    Returns:
+        The frontmatter dict, or None if the block needs the YAML loader
+    """
+    result: dict[str, Any] = {}
+    items: list[str] | None = None  # List being filled by "- item" lines
+    item_indent = -1
+
+    for line in block.split("\n"):
+        line = line.rstrip()
+        if not line:
+            continue
+        # Rejects tabs and control characters too
+        if not line.isprintable():
+            return None
+
+        if items is not None:
+            match = _ITEM_LINE_RE.fullmatch(line)
+            if match:
+                indent = len(match.group(1))
+                if item_indent == -1:
+                    item_indent = indent
+                value = _plain_string(match.group(2))
+                if indent != item_indent or value is None:
+                    return None
+                items.append(value)
+                continue
+            if not items:
+                # "key:" without items is null (or something more complex)
+                return None
+            items = None
+
+        match = _KEY_LINE_RE.fullmatch(line)
+        if not match or _plain_string(match.group(1)) is None:
+            return None
+        key, raw = match.groups()
+        if raw is None:
+            items = result[key] = []
+            item_indent = -1
+            continue
+        value = _plain_string(raw)
+        if value is None:
+            return None
+        result[key] = value
+
+    if items is not None and not items:
+        return None
+    return result
+
+
+def _plain_string(value: str) -> str | None:
+    """
+    Return the string YAML would load from a one-line scalar, or None.
+
+    Only unescaped quoted strings and plain scalars that YAML resolves to
+    ``str`` are accepted.
+    """
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+        inner = value[1:-1]
+        if value[0] in inner or "\\" in inner:
+            return None
+        return inner
+    if value[0] in _INDICATORS or ": " in value or " #" in value or value[-1] == ":":
+        return None
+    # Same implicit resolvers the loader applies (int, float, bool, null, ...)
+    for _tag, regexp in _Loader.yaml_implicit_resolvers.get(value[0], ()):
+        if regexp.match(value):
+            return None
+    return value
+
+
+def _split_frontmatter(content: str) -> tuple[str, str] | None:
+    """
+    Split stripped content into (frontmatter, body) with plain string scans.
+
+    The frontmatter is delimited by lines consisting of ``---`` (trailing
+    whitespace allowed). Each ``str.find`` is a linear C scan, unlike a
+    DOTALL lazy regex that retries the delimiter at every character.
+
+    Returns:
+        The raw frontmatter and body, or None if there is no frontmatter
+    """
+    if not content.startswith("---"):
+        return None
+    first_nl = content.find("\n")
+    if first_nl == -1 or content[3:first_nl].strip():
+        return None
+
+    search = first_nl
+    while True:
+        end = content.find("\n---", search)
+        if end == -1:
+            return None
+        line_end = content.find("\n", end + 4)
+        if line_end == -1:
+            line_end = len(content)
+        if not content[end + 4:line_end].strip():
+            return content[first_nl + 1:end], content[line_end + 1:]
+        search = end + 1
+
+
 def create_frontmatter(metadata: dict[str, Any], body: str) -> str:
     """
     Create markdown content with YAML frontmatter.
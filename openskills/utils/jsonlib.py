@@ -0,0 +1,40 @@
+"""
+JSON helpers with an optional fast backend.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both backends accept ``bytes`` input and ``dumps`` always
+returns UTF-8 encoded ``bytes``, ready to be sent as a request body.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can
+# always catch this one
+JSONDecodeError = json.JSONDecodeError
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """
+    Serialize an object to compact UTF-8 encoded JSON.
+
+    Non-str dict keys (e.g. the token ids of ``logit_bias``) are turned
+    into strings, as the standard library does.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
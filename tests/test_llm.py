@@ -1,6 +1,8 @@
 """Tests for the LLM module."""
 
 import base64
+import json
+import os
 import pytest
 from pathlib import Path
 
@@ -13,6 +15,7 @@ from openskills.llm import (
     image_file,
     image_base64,
     text,
+    ToolCall,
 )
 
 
@@ -69,6 +72,20 @@ class TestImageContent:
         assert result["image_url"]["url"] == "https://example.com/img.jpg"
         assert result["image_url"]["detail"] == "auto"
 
+    def test_data_url_built_once_per_payload(self):
+        img = ImageContent(base64_data="aGVsbG8=", media_type="image/png")
+        url = img.get_url()
+
+        assert url == "data:image/png;base64,aGVsbG8="
+        assert img.get_url() is url
+        assert img.to_dict()["image_url"]["url"] is url
+
+        # Changing the payload or media type rebuilds it
+        img.media_type = "image/gif"
+        assert img.get_url() == "data:image/gif;base64,aGVsbG8="
+        img.base64_data = "d29ybGQ="
+        assert img.get_url() == "data:image/gif;base64,d29ybGQ="
+
     def test_image_no_data_raises(self):
         img = ImageContent()  # No url, base64, or file_path
         with pytest.raises(ValueError):
@@ -160,6 +177,27 @@ class TestMessage:
         assert result["role"] == "user"
         assert isinstance(result["content"], list)
 
+    def test_message_to_json_bytes(self):
+        msg = Message.user(
+            "Describe 这个",
+            images=[ImageContent(url="https://example.com/a.png", detail=ImageDetail.LOW)],
+        )
+        data = msg.to_json_bytes()
+
+        assert isinstance(data, bytes)
+        assert json.loads(data) == json.loads(json.dumps(msg.to_dict()))
+
+    def test_jsonlib_dumps_non_str_keys(self):
+        from openskills.utils import jsonlib
+
+        payload = {"logit_bias": {50256: -100}, "n": 1}
+        assert json.loads(jsonlib.dumps(payload)) == json.loads(json.dumps(payload))
+
+    def test_message_types_use_slots(self):
+        msg = Message.user("Hi", images=[ImageContent(url="https://example.com/a.png")])
+        for obj in (msg, msg.images[0], TextContent(text="Hi")):
+            assert not hasattr(obj, "__dict__")
+
     def test_message_with_name(self):
         msg = Message(role="user", content="Hello", name="Alice")
         result = msg.to_dict()
@@ -214,6 +252,51 @@ class TestImageFromFile:
         assert img.base64_data is not None
         assert "jpeg" in img.media_type
 
+    def test_image_type_from_content(self, tmp_path):
+        import base64
+
+        # Signature wins over a misleading extension
+        data = b"GIF89a" + bytes(range(256))
+        img_path = tmp_path / "photo.jpg"
+        img_path.write_bytes(data)
+        img = ImageContent(file_path=img_path)
+        assert img.media_type == "image/gif"
+        assert base64.b64decode(img.base64_data) == data
+
+        # Unknown content falls back to the extension; empty files work
+        empty = tmp_path / "blank.png"
+        empty.write_bytes(b"")
+        img = ImageContent(file_path=empty)
+        assert img.media_type == "image/png"
+        assert img.base64_data == ""
+
+    @pytest.mark.parametrize("head,media_type", [
+        (b"\x89PNG\r\n\x1a\n", "image/png"),
+        (b"\xff\xd8\xff\xe0", "image/jpeg"),
+        (b"GIF87a", "image/gif"),
+        (b"RIFF\x00\x00\x00\x00WEBP", "image/webp"),
+    ])
+    def test_image_signatures(self, tmp_path, head, media_type):
+        img_path = tmp_path / "image.bin"
+        img_path.write_bytes(head + b"\x00" * 16)
+
+        assert ImageContent(file_path=img_path).media_type == media_type
+
+    def test_same_file_shares_encoded_data(self, tmp_path):
+        img_path = tmp_path / "shared.png"
+        img_path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x01" * 64)
+
+        first = ImageContent(file_path=img_path)
+        second = image_file(img_path)
+        assert second.base64_data is first.base64_data
+
+        # A modified file is encoded again
+        img_path.write_bytes(b"GIF89a" + b"\x02" * 64)
+        os.utime(img_path, ns=(0, 0))
+        third = ImageContent(file_path=img_path)
+        assert third.media_type == "image/gif"
+        assert base64.b64decode(third.base64_data).startswith(b"GIF89a")
+
     def test_image_file_not_found(self):
         with pytest.raises(FileNotFoundError):
             ImageContent(file_path=Path("/nonexistent/image.jpg"))
@@ -232,3 +315,206 @@ class TestImageDetail:
         result = img.to_dict()
 
         assert result["image_url"]["detail"] == "high"
+
+    def test_image_detail_serializes_without_conversion(self):
+        img = ImageContent(url="https://example.com/img.jpg", detail=ImageDetail.LOW)
+        assert img.to_dict()["image_url"]["detail"] is ImageDetail.LOW
+        assert json.loads(json.dumps(img.to_dict()))["image_url"]["detail"] == "low"
+
+        # A plain string detail passes through as well
+        img = ImageContent(url="https://example.com/img.jpg", detail="high")
+        assert img.to_dict()["image_url"]["detail"] == "high"
+
+
+class TestChatStream:
+    """Tests for SSE streaming in OpenAICompatClient."""
+
+    @staticmethod
+    def _client(body: bytes, chunk_size: int = 7):
+        import httpx
+
+        from openskills.llm import OpenAICompatClient
+
+        def handler(request):
+            chunks = [body[i:i + chunk_size] for i in range(0, len(body), chunk_size)]
+            return httpx.Response(200, stream=httpx.ByteStream(b"".join(chunks)))
+
+        client = OpenAICompatClient(api_key="test", base_url="http://llm.test/v1")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return client
+
+    @pytest.mark.asyncio
+    async def test_stream_content(self):
+        body = (
+            b'data: {"choices":[{"delta":{"content":"Hel"}}]}\n\n'
+            b'data: {"choices":[{"delta":{"content":"lo \xe4\xbd\xa0"}}]}\r\n\r\n'
+            b'data: {"choices":[{"delta":{},"finish_reason":"stop"}]}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        async with self._client(body) as client:
+            chunks = [c async for c in client.chat_stream([Message.user("hi")])]
+
+        assert "".join(c.content for c in chunks) == "Hello 你"
+        assert chunks[-1].finish_reason == "stop"
+
+    @pytest.mark.asyncio
+    async def test_stream_tool_calls(self):
+        body = (
+            b'data: {"choices":[{"delta":{"tool_calls":[{"index":0,"id":"call_1",'
+            b'"function":{"name":"run","arguments":"{\\"a\\":"}}]}}]}\n\n'
+            b'data: {"choices":[{"delta":{"tool_calls":[{"index":0,'
+            b'"function":{"arguments":"1}"}}]}}]}\n\n'
+            b'data: {"choices":[{"delta":{},"finish_reason":"tool_calls"}]}\n\n'
+            b"data: [DONE]\n\n"
+        )
+        async with self._client(body) as client:
+            chunks = [c async for c in client.chat_stream([Message.user("hi")])]
+
+        tool_calls = chunks[-1].tool_calls
+        assert len(tool_calls) == 1
+        assert tool_calls[0].id == "call_1"
+        assert tool_calls[0].name == "run"
+        assert tool_calls[0]._arguments is None  # not decoded until asked for
+        assert tool_calls[0].arguments_bytes == b'{"a":1}'
+        assert tool_calls[0].arguments == '{"a":1}'
+        assert tool_calls[0] == ToolCall("call_1", "run", arguments='{"a":1}')
+
+
+class TestChatRetry:
+    """Tests for request retries in OpenAICompatClient."""
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        from openskills.llm import OpenAICompatClient
+
+        statuses = iter([503, 429, 200])
+
+        def handler(request):
+            status = next(statuses)
+            if status != 200:
+                return httpx.Response(status)
+            return httpx.Response(200, json={
+                "model": "gpt-4",
+                "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+            })
+
+        async def no_sleep(delay):
+            return None
+
+        monkeypatch.setattr(asyncio, "sleep", no_sleep)
+        client = OpenAICompatClient(api_key="test", base_url="http://llm.test/v1")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async with client:
+            response = await client.chat([Message.user("hi")])
+
+        assert response.content == "ok"
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        import httpx
+
+        from openskills.llm import OpenAICompatClient
+
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400)
+
+        client = OpenAICompatClient(api_key="test", base_url="http://llm.test/v1")
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async with client:
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.chat([Message.user("hi")])
+
+        assert len(calls) == 1
+
+
+class TestAzureClient:
+    """Tests for AzureOpenAIClient request shaping."""
+
+    @pytest.mark.asyncio
+    async def test_azure_request_omits_model(self):
+        import json
+
+        import httpx
+
+        from openskills.llm import AzureOpenAIClient
+
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json={
+                "choices": [{"message": {"content": "ok"}, "finish_reason": "stop"}],
+            })
+
+        client = AzureOpenAIClient(
+            api_key="secret",
+            endpoint="https://example.openai.azure.com",
+            deployment="gpt4",
+            api_version="2024-02-15-preview",
+        )
+        client._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+        async with client:
+            await client.chat([Message.user("hi")])
+
+        request = requests[0]
+        assert request.url.path == "/openai/deployments/gpt4/chat/completions"
+        assert request.headers["api-key"] == "secret"
+        assert "model" not in json.loads(request.content)
+
+
+class TestChatStreamBackpressure:
+    """Tests for the bounded stream buffer."""
+
+    @pytest.mark.asyncio
+    async def test_stream_errors_propagate(self):
+        import httpx
+
+        from openskills.llm import OpenAICompatClient
+
+        client = OpenAICompatClient(api_key="test", base_url="http://llm.test/v1")
+        client._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(500))
+        )
+
+        async with client:
+            with pytest.raises(httpx.HTTPStatusError):
+                async for _ in client.chat_stream([Message.user("hi")]):
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_early_exit_stops_producer(self, monkeypatch):
+        import asyncio
+
+        import httpx
+
+        from openskills.llm import OpenAICompatClient
+
+        monkeypatch.setenv("OPENSKILLS_STREAM_BUFFER", "1")
+        body = b"".join(
+            b'data: {"choices":[{"delta":{"content":"x"}}]}\n\n' for _ in range(50)
+        )
+        client = OpenAICompatClient(api_key="test", base_url="http://llm.test/v1")
+        client._client = httpx.AsyncClient(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+        )
+
+        async with client:
+            stream = client.chat_stream([Message.user("hi")])
+            first = await stream.__anext__()
+            await stream.aclose()
+
+        assert first.content == "x"
+        pending = [
+            t for t in asyncio.all_tasks() if "_pump_stream" in repr(t.get_coro())
+        ]
+        assert pending == []
@@ -0,0 +1,127 @@
+"""Tests for the FileLoader."""
+
+import pytest
+
+from openskills.loaders import FileLoader
+from openskills.models import SkillInstruction
+
+
+def _write_skill(directory, name, description="A test skill"):
+    directory.mkdir(parents=True, exist_ok=True)
+    skill_file = directory / "SKILL.md"
+    skill_file.write_text(f"""---
+name: {name}
+description: {description}
+---
+
+# {name}
+""")
+    return skill_file
+
+
+class TestFileLoader:
+    """Tests for FileLoader."""
+
+    @pytest.mark.asyncio
+    async def test_load_from_directory(self, tmp_path):
+        _write_skill(tmp_path / "alpha", "alpha")
+        _write_skill(tmp_path / "beta", "beta")
+        (tmp_path / "empty").mkdir()
+
+        loader = FileLoader()
+        skills = [skill async for skill in loader.load_from_directory(tmp_path)]
+
+        assert sorted(skill.name for skill in skills) == ["alpha", "beta"]
+
+    @pytest.mark.asyncio
+    async def test_load_from_directory_skips_invalid(self, tmp_path, capsys):
+        _write_skill(tmp_path / "good", "good")
+        bad = tmp_path / "bad"
+        bad.mkdir()
+        (bad / "SKILL.md").write_text("---\nname: bad\n---\n\nBody.\n")
+
+        loader = FileLoader()
+        skills = [skill async for skill in loader.load_from_directory(tmp_path)]
+
+        assert [skill.name for skill in skills] == ["good"]
+        assert "Failed to load skill" in capsys.readouterr().out
+
+    @pytest.mark.asyncio
+    async def test_load_from_missing_directory(self, tmp_path):
+        loader = FileLoader()
+        skills = [skill async for skill in loader.load_from_directory(tmp_path / "nope")]
+
+        assert skills == []
+
+    def test_find_skills_prunes_skipped_directories(self, tmp_path):
+        _write_skill(tmp_path / "alpha", "alpha")
+        _write_skill(tmp_path / "group" / "beta", "beta")
+        _write_skill(tmp_path / "node_modules" / "pkg", "vendored")
+        _write_skill(tmp_path / ".git" / "hidden", "hidden")
+
+        found = FileLoader().find_skills(tmp_path)
+
+        assert sorted(p.parent.name for p in found) == ["alpha", "beta"]
+
+    @pytest.mark.asyncio
+    async def test_load_skill_uses_cache_until_file_changes(self, tmp_path):
+        skill_file = _write_skill(tmp_path / "alpha", "alpha")
+        loader = FileLoader()
+
+        calls = []
+        parse_file = loader.parser.parse_file
+
+        def counting_parse_file(*args, **kwargs):
+            calls.append(args)
+            return parse_file(*args, **kwargs)
+
+        loader.parser.parse_file = counting_parse_file
+
+        first = await loader.load_skill(skill_file)
+        second = await loader.load_skill(skill_file)
+        assert len(calls) == 1
+        assert second == first
+
+        _write_skill(tmp_path / "alpha", "alpha", description="A changed description")
+        third = await loader.load_skill(skill_file)
+        assert third is not first
+        assert third.description == "A changed description"
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_load_skill_returns_independent_copies(self, tmp_path):
+        skill_dir = tmp_path / "alpha"
+        skill_dir.mkdir()
+        skill_file = skill_dir / "SKILL.md"
+        skill_file.write_text("""---
+name: alpha
+description: A test skill
+references:
+  - path: references/doc.md
+    condition: When needed
+---
+
+Body.
+""")
+        loader = FileLoader()
+
+        # Mutate the loaded skill the way SkillManager does
+        first = await loader.load_skill(skill_file)
+        first.resources.references[0].content = "stale"
+        first.instruction = SkillInstruction(content="mutated")
+
+        second = await loader.load_skill(skill_file)
+        assert second is not first
+        assert not second.resources.references[0].is_loaded()
+        assert second.instruction.content == "Body."
+
+    @pytest.mark.asyncio
+    async def test_load_skill_with_and_without_mmap(self, tmp_path):
+        skill_file = _write_skill(tmp_path / "alpha", "alpha", description="Ünïcödé skill")
+
+        mapped = await FileLoader().load_skill(skill_file, use_mmap=True)
+        read = await FileLoader().load_skill(skill_file, use_mmap=False)
+
+        assert mapped.description == read.description == "Ünïcödé skill"
+        assert mapped.source_path == skill_file
+        assert mapped.instruction.content == read.instruction.content
@@ -1,5 +1,7 @@
 """Tests for the SkillManager."""
 
+import shutil
+
 import pytest
 from pathlib import Path
 
@@ -9,11 +11,10 @@ from openskills.core.manager import SkillManager
 class TestSkillManager:
     """Tests for SkillManager."""
 
-    @pytest.fixture
-    def skill_dir(self, tmp_path):
-        """Create a temporary skill directory."""
-        skills_path = tmp_path / "infographic-skills"
-        skills_path.mkdir()
+    @pytest.fixture(scope="session")
+    def skill_dir(self, tmp_path_factory):
+        """Create a temporary skill directory, shared by tests that only read it."""
+        skills_path = tmp_path_factory.mktemp("infographic-skills")
 
         # Create test skill 1
         skill1_dir = skills_path / "meeting-summary"
@@ -45,6 +46,11 @@ triggers:
 
         return skills_path
 
+    @pytest.fixture
+    def mutable_skill_dir(self, skill_dir, tmp_path):
+        """Copy of the shared skill directory for tests that modify it."""
+        return Path(shutil.copytree(skill_dir, tmp_path / "infographic-skills"))
+
     @pytest.mark.asyncio
     async def test_discover_skills(self, skill_dir):
         manager = SkillManager([skill_dir])
@@ -107,6 +113,22 @@ triggers:
 
         assert len(metadata_list) == 0
 
+    @pytest.mark.asyncio
+    async def test_discover_skips_invalid_skills(self, mutable_skill_dir, capsys):
+        skill_dir = mutable_skill_dir
+        broken = skill_dir / "broken"
+        broken.mkdir()
+        (broken / "SKILL.md").write_text("---\nname: broken\n---\n")
+        (skill_dir / "SKILL.md").write_text("---\nname: root-skill\ndescription: Root\n---\n")
+
+        manager = SkillManager([skill_dir])
+        metadata_list = await manager.discover()
+
+        names = [m.name for m in metadata_list]
+        assert sorted(names[:-1]) == ["code-review", "meeting-summary"]
+        assert names[-1] == "root-skill"
+        assert "Failed to parse" in capsys.readouterr().out
+
     @pytest.mark.asyncio
     async def test_discover_nonexistent_directory(self, tmp_path):
         nonexistent = tmp_path / "nonexistent"
@@ -126,15 +148,20 @@ triggers:
         assert len(all_metadata) == 2
         assert all("name" in m for m in all_metadata)
         assert all("description" in m for m in all_metadata)
+        assert all(m["tags"] == [] for m in all_metadata)
+
+        # Callers get copies, not the metadata's own lists
+        all_metadata[0]["triggers"].append("changed")
+        assert "changed" not in manager.get_all_metadata()[0]["triggers"]
 
 
 class TestSkillManagerWithReferences:
     """Tests for reference loading."""
 
-    @pytest.fixture
-    def skill_with_ref(self, tmp_path):
+    @pytest.fixture(scope="session")
+    def skill_with_ref(self, tmp_path_factory):
         """Create a skill with references using standard directory structure."""
-        skills_path = tmp_path / "infographic-skills"
+        skills_path = tmp_path_factory.mktemp("infographic-skills")
         skill_dir = skills_path / "test-skill"
         references_dir = skill_dir / "references"
         references_dir.mkdir(parents=True)
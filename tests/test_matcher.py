@@ -3,7 +3,7 @@
 import pytest
 
 from openskills.core.matcher import SkillMatcher
-from openskills.models.metadata import SkillMetadata
+from openskills.models.metadata import SkillIndex, SkillMetadata
 
 
 class TestSkillMatcher:
@@ -96,3 +96,90 @@ class TestSkillMatcher:
         for result in results:
             # Verify any result has high relevance
             assert "meeting" in result.name or any("meeting" in t for t in result.triggers)
+
+    def test_metadata_precomputes_lowercased_keys(self):
+        a = SkillMetadata(name="a", description="A", triggers=["Write Email"], tags=["Email"])
+        b = SkillMetadata(name="b", description="B", triggers=["write EMAIL"], tags=["EMAIL"])
+
+        assert a._triggers_lc == ("write email",)
+        assert a._tags_lc == ("email",)
+        # Interned, so equal keys of different skills share one string
+        assert a._triggers_lc[0] is b._triggers_lc[0]
+        assert a._tags_lc[0] is b._tags_lc[0]
+
+    def test_index_follows_metadata_list(self, metadata_list):
+        matcher = SkillMatcher()
+        assert matcher.match("draft email now", metadata_list)[0].name == "email-draft"
+        automaton = matcher._automaton
+
+        # Same skills: the index is reused
+        matcher.match("code review", list(metadata_list))
+        assert matcher._automaton is automaton
+
+        # Changed skills: the index is rebuilt
+        extra = SkillMetadata(name="translator", description="Translate", triggers=["translate"])
+        results = matcher.match("translate this", [*metadata_list, extra])
+        assert matcher._automaton is not automaton
+        assert results[0].name == "translator"
+
+
+class TestSkillIndex:
+    """Tests for the SkillIndex keyword automaton."""
+
+    @pytest.fixture
+    def metadata_list(self):
+        return [
+            SkillMetadata(
+                name="meeting-summary",
+                description="Summarize meetings and create notes",
+                triggers=["summarize meeting", "会议总结"],
+            ),
+            SkillMetadata(
+                name="code-review",
+                description="Review code changes",
+                triggers=["review code", "PR review"],
+            ),
+        ]
+
+    def test_query_matches_triggers(self, metadata_list):
+        index = SkillIndex(metadata_list)
+
+        assert [m.name for m in index.query("Please REVIEW CODE")] == ["code-review"]
+        assert [m.name for m in index.query("帮我做一个会议总结")] == ["meeting-summary"]
+
+    def test_query_matches_multiple_skills(self, metadata_list):
+        index = SkillIndex(metadata_list)
+
+        names = [m.name for m in index.query("summarize meeting, then PR review")]
+        assert names == ["meeting-summary", "code-review"]
+
+    def test_query_agrees_with_matches_query(self, metadata_list):
+        index = SkillIndex(metadata_list)
+        queries = ["meeting-summary", "notes about changes", "xyz", "code", "summarize"]
+
+        for query in queries:
+            expected = [m for m in metadata_list if m.matches_query(query)]
+            assert index.query(query) == expected
+
+    def test_add_after_query(self, metadata_list):
+        index = SkillIndex(metadata_list[:1])
+        assert index.query("review code") == []
+
+        index.add(metadata_list[1])
+        assert [m.name for m in index.query("review code")] == ["code-review"]
+        assert len(index) == 2
+
+
+class TestMatchesQuery:
+    """Tests for SkillMetadata.matches_query."""
+
+    def test_description_matches_whole_words(self):
+        meta = SkillMetadata(name="pets", description="Answers questions about cats")
+
+        assert meta.matches_query("tell me about CATS")
+        assert not meta.matches_query("pick a category")
+
+    def test_trigger_matches_substring(self):
+        meta = SkillMetadata(name="x", description="d", triggers=["会议总结"])
+
+        assert meta.matches_query("帮我做一个会议总结")
@@ -2,6 +2,9 @@
 
 import pytest
 from pathlib import Path
+from unittest.mock import patch
+
+import yaml
 
 from openskills.core.parser import SkillParser
 from openskills.utils.frontmatter import parse_frontmatter
@@ -44,7 +47,55 @@ Body content.
         metadata, body = parse_frontmatter(content)
 
         assert metadata == {}
-        assert "Body content" in body
+        assert body == "Body content."
+
+    def test_parse_delimiter_edge_cases(self):
+        # Closing delimiter at end of file, body containing a horizontal rule
+        assert parse_frontmatter("---\nname: x\n---") == ({"name": "x"}, "")
+        metadata, body = parse_frontmatter("---  \nname: x\n---  \n\n# Body\n---\nmore")
+        assert metadata == {"name": "x"}
+        assert body == "# Body\n---\nmore"
+        # Opening line must be exactly the delimiter
+        assert parse_frontmatter("---x\nname: x\n---\nb")[0] == {}
+        # A blank block never reaches the YAML loader
+        with patch("openskills.utils.frontmatter.yaml.load") as load:
+            assert parse_frontmatter("---\n  \n---\nblank block") == ({}, "blank block")
+        load.assert_not_called()
+
+    def test_simple_frontmatter_skips_yaml(self):
+        content = """---
+name: quick
+description: "Quoted: value"
+triggers:
+  - write email
+  - 会议总结
+url: https://example.com/a#b
+---
+Body
+"""
+        with patch("openskills.utils.frontmatter.yaml.load") as load:
+            metadata, body = parse_frontmatter(content)
+        load.assert_not_called()
+        assert metadata == {
+            "name": "quick",
+            "description": "Quoted: value",
+            "triggers": ["write email", "会议总结"],
+            "url": "https://example.com/a#b",
+        }
+        assert body == "Body"
+
+    @pytest.mark.parametrize("block", [
+        "version: 1.0",  # float
+        "enabled: yes",  # bool
+        "owner:",  # null
+        "name: x  # comment",
+        "references:\n  - path: a.md\n    condition: c",
+        "tags: [a, b]",
+        "description: >\n  folded text",
+    ])
+    def test_other_frontmatter_falls_back_to_yaml(self, block):
+        metadata, _ = parse_frontmatter(f"---\n{block}\n---\nBody")
+        assert metadata == yaml.safe_load(block)
 
     def test_parse_with_triggers(self):
         content = """---
@@ -64,6 +115,23 @@ triggers:
         assert "summarize meeting" in metadata["triggers"]
 
 
+    def test_parse_result_is_not_shared(self):
+        content = """---
+name: cached
+triggers:
+  - one
+---
+
+Body.
+"""
+        metadata, _ = parse_frontmatter(content)
+        metadata["triggers"].append("two")
+        metadata["name"] = "changed"
+
+        again, body = parse_frontmatter(content)
+        assert again == {"name": "cached", "triggers": ["one"]}
+        assert body == "Body."
+
 class TestSkillParser:
     """Tests for the skill parser."""
 
@@ -98,6 +166,25 @@ Long instructions...
         assert skill.name == "test"
         assert skill.instruction is None  # Not loaded
 
+    def test_parse_content_reuses_parsed_header(self):
+        content = "---\nname: cached\ndescription: Cached skill\n---\n\nBody."
+        parser = SkillParser()
+
+        first = parser.parse_content(content)
+        with patch("openskills.core.parser.parse_frontmatter") as parse:
+            second = parser.parse_content(content)
+        parse.assert_not_called()
+
+        # Immutable metadata is shared, the mutable Skill is not
+        assert second.metadata is first.metadata
+        assert second is not first
+        assert second.instruction.content == "Body."
+
+        # Invalid content is never cached
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Missing required fields"):
+                parser.parse_content("---\nname: x\n---\n")
+
     def test_parse_with_references(self):
         content = """---
 name: test
@@ -116,6 +203,41 @@ Body.
         assert skill.references[0].path == "references/doc.md"
         assert skill.references[0].condition == "When needed"
 
+    def test_parse_reference_forms(self):
+        content = """---
+name: test
+description: Test
+references:
+  - references/plain.md
+  - path: references/odd.md
+    mode: unknown
+---
+
+Body.
+"""
+        parser = SkillParser()
+        skill = parser.parse_content(content)
+
+        assert [r.path for r in skill.references] == ["references/plain.md", "references/odd.md"]
+        assert all(r.mode == "implicit" for r in skill.references)
+
+    def test_parse_script_timeout_validated(self):
+        content = """---
+name: test
+description: Test
+scripts:
+  - name: slow
+    path: scripts/slow.py
+    description: Slow
+    timeout: 1000
+---
+
+Body.
+"""
+        parser = SkillParser()
+        with pytest.raises(Exception):
+            parser.parse_content(content)
+
     def test_parse_with_scripts(self):
         content = """---
 name: test
@@ -177,30 +299,30 @@ Body.
         skill = parser.parse_content(content)
 
         assert not skill.resources.dependency.has_dependencies()
-        assert skill.resources.dependency.python == []
-        assert skill.resources.dependency.system == []
-
-    def test_parse_missing_required_fields(self):
-        content = """---
-name: test
----
-
-Body.
-"""
+        assert list(skill.resources.dependency.python) == []
+        assert list(skill.resources.dependency.system) == []
+
+    @pytest.mark.parametrize("content,missing", [
+        ("---\nname: test\n---\n\nBody.\n", "description"),
+        ("---\ndescription: Test\n---\n\nBody.\n", "name"),
+        ("---\n---\n\nBody.\n", "name"),
+    ])
+    def test_parse_missing_required_fields(self, content, missing):
         parser = SkillParser()
 
         with pytest.raises(ValueError) as exc_info:
             parser.parse_content(content)
 
-        assert "description" in str(exc_info.value)
+        assert missing in str(exc_info.value)
 
 
 class TestSkillFromFile:
     """Tests for parsing infographic-skills from files."""
 
-    def test_parse_example_skill(self, tmp_path):
-        skill_dir = tmp_path / "test-skill"
-        skill_dir.mkdir()
+    @pytest.fixture(scope="session")
+    def skill_file(self, tmp_path_factory):
+        """Write the example SKILL.md once per session."""
+        skill_dir = tmp_path_factory.mktemp("test-skill")
 
         skill_file = skill_dir / "SKILL.md"
         skill_file.write_text("""---
@@ -216,7 +338,9 @@ triggers:
 
 This is a test skill.
 """)
+        return skill_file
 
+    def test_parse_example_skill(self, skill_file):
         parser = SkillParser()
         skill = parser.parse_file(skill_file)
 
@@ -224,3 +348,9 @@ This is a test skill.
         assert skill.metadata.version == "2.0.0"
         assert len(skill.metadata.triggers) == 2
         assert skill.source_path == skill_file
+
+    def test_parse_missing_file(self, tmp_path):
+        parser = SkillParser()
+
+        with pytest.raises(FileNotFoundError, match="Skill file not found"):
+            parser.parse_file(tmp_path / "SKILL.md")
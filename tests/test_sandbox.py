@@ -2,6 +2,13 @@
 Tests for sandbox integration.
 """
 
+import asyncio
+import contextlib
+import io
+import json
+import os
+
+import httpx
 import pytest
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
@@ -12,27 +19,63 @@ from openskills.sandbox.client import (
     CommandResult,
     SandboxExecutionError,
     SandboxConnectionError,
+    create_http_client,
 )
 from openskills.sandbox.executor import SandboxExecutor
 from openskills.sandbox.manager import SandboxManager, SandboxStrategy
 
 
+def _path(url) -> str:
+    """Endpoint path of a request URL (hot paths are passed as absolute URLs)."""
+    return httpx.URL(url).path
+
+
+class _StubExecutor:
+    """Minimal stand-in for SandboxExecutor in manager tests (cheaper than AsyncMock)."""
+
+    __slots__ = ("_id",)
+
+    def __init__(self, _id: int):
+        self._id = _id
+
+    async def __aenter__(self) -> "_StubExecutor":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        return False
+
+    async def setup_environment(self, dependency) -> None:
+        pass
+
+    def mark_ready(self) -> None:
+        pass
+
+
+@contextlib.asynccontextmanager
+async def _mock_sandbox(handler):
+    """SandboxClient on a real httpx.AsyncClient whose requests are answered by handler."""
+    transport = httpx.MockTransport(handler)
+    async with httpx.AsyncClient(base_url="http://sandbox.test", transport=transport) as http:
+        async with SandboxClient("http://sandbox.test", http_client=http) as client:
+            yield client
+
+
 class TestSkillDependency:
     """Test SkillDependency model."""
 
     def test_empty_dependency(self):
         """Test creating empty dependency."""
         dep = SkillDependency()
-        assert dep.python == []
-        assert dep.system == []
+        assert list(dep.python) == []
+        assert list(dep.system) == []
         assert not dep.has_dependencies()
         assert dep.get_pip_install_command() is None
 
     def test_from_dict_none(self):
         """Test from_dict with None."""
         dep = SkillDependency.from_dict(None)
-        assert dep.python == []
-        assert dep.system == []
+        assert list(dep.python) == []
+        assert list(dep.system) == []
 
     def test_from_dict_with_python(self):
         """Test from_dict with python dependencies."""
@@ -40,8 +83,8 @@ class TestSkillDependency:
             "python": ["numpy>=1.20", "pandas==2.0.0"],
         }
         dep = SkillDependency.from_dict(data)
-        assert dep.python == ["numpy>=1.20", "pandas==2.0.0"]
-        assert dep.system == []
+        assert list(dep.python) == ["numpy>=1.20", "pandas==2.0.0"]
+        assert list(dep.system) == []
         assert dep.has_dependencies()
 
     def test_from_dict_with_system(self):
@@ -50,8 +93,8 @@ class TestSkillDependency:
             "system": ["mkdir -p output", "chmod +x scripts/*.sh"],
         }
         dep = SkillDependency.from_dict(data)
-        assert dep.python == []
-        assert dep.system == ["mkdir -p output", "chmod +x scripts/*.sh"]
+        assert list(dep.python) == []
+        assert list(dep.system) == ["mkdir -p output", "chmod +x scripts/*.sh"]
         assert dep.has_dependencies()
 
     def test_from_dict_full(self):
@@ -61,17 +104,69 @@ class TestSkillDependency:
             "system": ["mkdir -p output/images"],
         }
         dep = SkillDependency.from_dict(data)
-        assert dep.python == ["PyMuPDF==1.23.8", "python-docx"]
-        assert dep.system == ["mkdir -p output/images"]
+        assert list(dep.python) == ["PyMuPDF==1.23.8", "python-docx"]
+        assert list(dep.system) == ["mkdir -p output/images"]
         assert dep.has_dependencies()
 
+    def test_from_dict_validate(self):
+        """Test from_dict with validation enabled."""
+        from pydantic import ValidationError
+
+        dep = SkillDependency.from_dict({"python": ["requests"]}, validate=True)
+        assert list(dep.python) == ["requests"]
+
+        with pytest.raises(ValidationError):
+            SkillDependency.from_dict({"python": [{"name": "requests"}]}, validate=True)
+
+    def test_from_dict_scalar_values(self):
+        """Test that a scalar is one item, never split into characters."""
+        from pydantic import ValidationError
+
+        dep = SkillDependency.from_dict({"python": "numpy", "system": "mkdir -p out"})
+        assert list(dep.python) == ["numpy"]
+        assert list(dep.system) == ["mkdir -p out"]
+
+        with pytest.raises(ValidationError):
+            SkillDependency.from_dict({"python": {"numpy": "1.0"}})
+
     def test_get_pip_install_command(self):
         """Test generating pip install command."""
         dep = SkillDependency(
             python=["numpy>=1.20", "pandas==2.0.0"]
         )
         cmd = dep.get_pip_install_command()
-        assert cmd == 'pip install "numpy>=1.20" "pandas==2.0.0"'
+        assert cmd == f"pip install {SkillDependency.PIP_FLAGS} 'numpy>=1.20' pandas==2.0.0"
+
+    def test_get_pip_install_command_quotes_specials(self):
+        """Test that extras and shell metacharacters are quoted."""
+        dep = SkillDependency(python=["uvicorn[standard]", "pkg$x"])
+        cmd = dep.get_pip_install_command()
+        assert cmd.endswith(" 'uvicorn[standard]' 'pkg$x'")
+
+    def test_dependency_is_hashable(self):
+        """Test that equal dependencies hash alike (usable as dict keys)."""
+        dep = SkillDependency(python=["numpy"], system=["mkdir -p out"])
+        same = SkillDependency.from_dict({"python": ["numpy"], "system": ["mkdir -p out"]})
+
+        assert dep == same
+        assert len({dep, same, SkillDependency()}) == 2
+
+    def test_pip_install_command_is_memoized(self):
+        """Test that equal package lists share one command, and copies update it."""
+        dep = SkillDependency(python=["numpy", "pandas"])
+        same = SkillDependency.from_dict({"python": ["numpy", "pandas"]})
+        assert dep.get_pip_install_command() is same.get_pip_install_command()
+
+        changed = dep.model_copy(update={"python": ["scipy"]})
+        assert changed.get_pip_install_command().endswith(" scipy")
+
+    def test_get_parallel_groups(self):
+        dep = SkillDependency.from_dict({"system": ["a", "b"]})
+        assert dep.get_parallel_groups() == [["a"], ["b"]]
+        dep = SkillDependency.from_dict({"system": ["a", "b"], "parallel": True})
+        assert dep.parallel
+        assert dep.get_parallel_groups() == [["a", "b"]]
+        assert SkillDependency().get_parallel_groups() == []
 
     def test_get_pip_packages(self):
         """Test getting pip packages list."""
@@ -80,7 +175,7 @@ class TestSkillDependency:
         assert packages == ["numpy", "pandas"]
         # Ensure it's a copy
         packages.append("scipy")
-        assert dep.python == ["numpy", "pandas"]
+        assert list(dep.python) == ["numpy", "pandas"]
 
     def test_get_system_commands(self):
         """Test getting system commands list."""
@@ -89,7 +184,7 @@ class TestSkillDependency:
         assert commands == ["mkdir -p output"]
         # Ensure it's a copy
         commands.append("rm -rf temp")
-        assert dep.system == ["mkdir -p output"]
+        assert list(dep.system) == ["mkdir -p output"]
 
 
 class TestCommandResult:
@@ -122,6 +217,75 @@ class TestSandboxClient:
             assert client._client is not None
         assert client._client is None
 
+    @pytest.mark.asyncio
+    async def test_shared_client_is_reused(self):
+        """Test that shared clients reuse one HTTP client and stay open."""
+        try:
+            async with SandboxClient("http://sandbox.test", shared=True) as first:
+                http_client = first._client
+            async with SandboxClient("http://sandbox.test", shared=True) as second:
+                assert second._client is http_client
+
+            assert first._client is None
+            assert not http_client.is_closed
+        finally:
+            await SandboxClient.aclose_shared()
+
+        assert http_client.is_closed
+
+    @pytest.mark.asyncio
+    async def test_injected_client_is_used_and_left_open(self):
+        """Test that an injected HTTP client is used as-is and not closed."""
+        http_client = httpx.AsyncClient(base_url="http://sandbox.test")
+        try:
+            async with SandboxClient(
+                "http://sandbox.test", shared=False, http_client=http_client
+            ) as client:
+                assert client._client is http_client
+            assert not http_client.is_closed
+        finally:
+            await http_client.aclose()
+
+    @pytest.mark.parametrize("available", [True, False])
+    def test_http_client_negotiates_http2_when_h2_installed(self, available):
+        """Test that the pooled transport asks for HTTP/2 only when h2 is importable."""
+        with patch("openskills.sandbox.client._HTTP2_AVAILABLE", available), \
+                patch("httpx.AsyncHTTPTransport") as transport:
+            create_http_client("http://sandbox.test", 5.0)
+        assert transport.call_args.kwargs["http2"] is available
+        # Connection retries happen in _retry_connect only
+        assert "retries" not in transport.call_args.kwargs
+
+    @pytest.mark.asyncio
+    async def test_prewarm_opens_connection_before_first_request(self):
+        """Test that prewarm probes in the background and the first call waits for it."""
+        requests = []
+        release = asyncio.Event()
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request.url.path)
+            if request.url.path == "/v1/sandbox":
+                await release.wait()
+                return httpx.Response(200, json={})
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "hi", "stderr": ""})
+
+        http_client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        try:
+            async with SandboxClient(
+                "http://sandbox.test", http_client=http_client, prewarm=True
+            ) as client:
+                command = asyncio.create_task(client.exec_command("echo hi"))
+                await asyncio.sleep(0.01)
+                # The probe is in flight and the command waits behind it
+                assert requests == ["/v1/sandbox"]
+                release.set()
+                assert (await command).stdout == "hi"
+            assert requests == ["/v1/sandbox", "/v1/shell/exec"]
+        finally:
+            await http_client.aclose()
+
     @pytest.mark.asyncio
     async def test_ensure_client_raises_without_context(self):
         """Test that methods fail without context manager."""
@@ -132,13 +296,141 @@ class TestSandboxClient:
     @pytest.mark.asyncio
     async def test_exec_command_success(self):
         """Test successful command execution."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.path == "/v1/shell/exec"
+            assert json.loads(request.content)["command"] == "echo hello"
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "hello", "stderr": ""})
+
+        async with _mock_sandbox(handler) as client:
+            result = await client.exec_command("echo hello")
+
+        assert result.success
+        assert result.stdout == "hello"
+
+    @pytest.mark.asyncio
+    async def test_exec_command_enveloped_response(self):
+        """Test parsing the AIO Sandbox {"data": ...} response envelope."""
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
-            "exit_code": 0,
-            "stdout": "hello",
-            "stderr": "",
-        }
+        mock_response.content = json.dumps({
+            "success": True,
+            "data": {"output": "hi", "exit_code": 2},
+        }).encode()
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                result = await client.exec_command("echo hi; exit 2")
+
+            assert result.exit_code == 2
+            assert result.stdout == "hi"
+
+    @pytest.mark.asyncio
+    async def test_exec_command_retries_connect_errors(self):
+        """Test that a refused connection is retried before giving up."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+        mock_response.content = b'{"exit_code": 0, "stdout": "ok", "stderr": ""}'
+
+        with patch("httpx.AsyncClient") as MockClient, \
+                patch("asyncio.sleep", AsyncMock()) as sleep:
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = [httpx.ConnectError("refused"), mock_response]
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                result = await client.exec_command("echo ok")
+                assert result.stdout == "ok"
+                sleep.assert_awaited_once()
+
+                mock_client.post.side_effect = httpx.ConnectError("refused")
+                with pytest.raises(SandboxConnectionError):
+                    await client.exec_command("echo ok")
+                assert mock_client.post.await_count == 5
+
+                # A dropped connection may have run the command: no retry
+                mock_client.post.side_effect = httpx.RemoteProtocolError("dropped")
+                with pytest.raises(httpx.RemoteProtocolError):
+                    await client.exec_command("echo ok")
+                assert mock_client.post.await_count == 6
+
+                # The server may be running it: a read timeout is never replayed
+                mock_client.post.side_effect = httpx.ReadTimeout("slow")
+                with pytest.raises(httpx.ReadTimeout):
+                    await client.exec_command("echo ok")
+                assert mock_client.post.await_count == 7
+
+    @pytest.mark.asyncio
+    async def test_get_sessions(self):
+        """Test session list parsing."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+        mock_response.content = json.dumps({"data": {"sessions": {
+            "s1": {"working_dir": "/tmp", "status": "active", "created_at": "t0"},
+        }}}).encode()
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                sessions = await client.get_sessions()
+
+        assert len(sessions) == 1
+        assert sessions[0].session_id == "s1"
+        assert sessions[0].working_dir == "/tmp"
+        assert sessions[0].last_used_at == ""
+
+    @pytest.mark.asyncio
+    async def test_stream_shell_websocket(self):
+        """Test that stream_shell yields pushed frames from the terminal socket."""
+        import sys
+        import types
+
+        connected = []
+
+        class FakeSocket:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def __aiter__(self):
+                yield "line 1\n"
+                yield b"line 2\n"
+
+        def connect(url):
+            connected.append(url)
+            return FakeSocket()
+
+        fake = types.ModuleType("websockets")
+        fake.connect = connect
+        with patch.dict(sys.modules, {"websockets": fake}):
+            client = SandboxClient("https://sandbox.test")
+            frames = [frame async for frame in client.stream_shell("s 1")]
+
+        assert connected == ["wss://sandbox.test/terminal?session_id=s%201"]
+        assert frames == ["line 1\n", "line 2\n"]
+
+    @pytest.mark.asyncio
+    async def test_with_deadline_caps_timeouts(self):
+        """Test that a deadline view caps call timeouts and fails once spent."""
+        import time
+
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+        mock_response.content = b'{"exit_code": 0, "stdout": "", "stderr": ""}'
 
         with patch("httpx.AsyncClient") as MockClient:
             mock_client = AsyncMock()
@@ -147,16 +439,37 @@ class TestSandboxClient:
             MockClient.return_value = mock_client
 
             async with SandboxClient() as client:
-                result = await client.exec_command("echo hello")
+                view = client.with_deadline(10)
+                await view.install_nodejs_packages(["left-pad"])
+                assert mock_client.post.call_args[1]["timeout"] <= 10
 
-            assert result.success
-            assert result.stdout == "hello"
+                with pytest.raises(TimeoutError):
+                    await client.exec_command("true", deadline=time.monotonic() - 1)
+                assert mock_client.post.await_count == 1
+
+                # The original client is unaffected
+                await client.exec_command("true")
+                assert mock_client.post.call_args[1]["timeout"] == client.timeout
 
     @pytest.mark.asyncio
     async def test_health_check_success(self):
         """Test health check success."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert (request.method, request.url.path) == ("GET", "/v1/sandbox")
+            return httpx.Response(200, json={})
+
+        async with _mock_sandbox(handler) as client:
+            assert await client.health_check()
+
+    @pytest.mark.asyncio
+    async def test_get_info_cached(self):
+        """Test that get_info is fetched once until invalidated."""
         mock_response = MagicMock()
         mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+        mock_response.content = json.dumps(
+            {"version": "1.0", "data": {"system": {"os": "linux"}}}
+        ).encode()
 
         with patch("httpx.AsyncClient") as MockClient:
             mock_client = AsyncMock()
@@ -165,16 +478,92 @@ class TestSandboxClient:
             MockClient.return_value = mock_client
 
             async with SandboxClient() as client:
-                healthy = await client.health_check()
+                first = await client.get_info()
+                second = await client.get_info()
+                assert first is second
+                assert mock_client.get.await_count == 1
 
-            assert healthy
+                client.invalidate_info()
+                await client.get_info()
+                assert mock_client.get.await_count == 2
+
+                cached = client._info_cache
+                await client.health_check()
+                assert client._info_cache is cached
+
+            assert first.os == "linux"
 
     @pytest.mark.asyncio
     async def test_write_file(self):
         """Test file write."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json={"success": True})
+
+        async with _mock_sandbox(handler) as client:
+            await client.write_file("/test.py", "print('hello')")
+
+        (request,) = requests
+        assert request.url == "http://sandbox.test/v1/file/write"
+        assert request.headers["content-type"] == "application/json"
+        assert json.loads(request.content) == {
+            "file": "/test.py",
+            "content": "print('hello')",
+        }
+
+    @pytest.mark.asyncio
+    async def test_write_file_binary(self):
+        """Test that bytes go through the multipart upload endpoint unchanged."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+        mock_response.content = b'{"data": {"file_path": "/data.bin"}}'
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                await client.write_file("/data.bin", b"\xff\xfe\x00")
+
+            call_args = mock_client.post.call_args
+            assert _path(call_args[0][0]) == "/v1/file/upload"
+            assert call_args[1]["files"]["file"] == (
+                "data.bin", b"\xff\xfe\x00", "application/octet-stream"
+            )
+            assert call_args[1]["data"] == {"path": "/data.bin"}
+
+    @pytest.mark.asyncio
+    async def test_write_file_text_bytes(self):
+        """Test that small UTF-8 bytes use the JSON write endpoint."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.raise_for_status = MagicMock()
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                await client.write_file("/notes.md", "# 标题\n".encode())
+
+            call_args = mock_client.post.call_args
+            assert _path(call_args[0][0]) == "/v1/file/write"
+            assert json.loads(call_args[1]["content"])["content"] == "# 标题\n"
+
+    @pytest.mark.asyncio
+    async def test_write_file_large_text_and_file_objects(self):
+        """Test that large text and file objects are uploaded, not JSON-encoded."""
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.raise_for_status = MagicMock()
+        mock_response.content = b'{"data": {}}'
 
         with patch("httpx.AsyncClient") as MockClient:
             mock_client = AsyncMock()
@@ -182,12 +571,522 @@ class TestSandboxClient:
             mock_client.aclose = AsyncMock()
             MockClient.return_value = mock_client
 
+            large = "x" * (1 << 20)
+            stream = io.BytesIO(b"streamed")
             async with SandboxClient() as client:
-                await client.write_file("/test.py", "print('hello')")
+                await client.write_file("/big.txt", large)
+                await client.write_file("/stream.bin", stream)
+                await client.write_file("/view.txt", memoryview(b"text"))
+
+            big, streamed, view = mock_client.post.call_args_list
+            assert _path(big[0][0]) == "/v1/file/upload"
+            assert big[1]["files"]["file"][1] == large.encode()
+            assert streamed[1]["files"]["file"][1] is stream
+            assert _path(view[0][0]) == "/v1/file/write"
+            assert json.loads(view[1]["content"])["content"] == "text"
+
+    @pytest.mark.asyncio
+    async def test_upload_file_from_path(self, tmp_path):
+        """Test that a local path is streamed as a multipart upload."""
+        source = tmp_path / "report.pdf"
+        source.write_bytes(b"%PDF-1.7 body")
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["body"] = request.read()
+            return httpx.Response(200, json={"data": {"file_path": "/home/gem/report.pdf"}})
+
+        client = SandboxClient("http://sandbox.test", shared=False)
+        client._client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        try:
+            path = await client.upload_file(
+                source, "/home/gem/report.pdf", content_type="application/pdf"
+            )
+        finally:
+            await client._client.aclose()
+
+        assert path == "/home/gem/report.pdf"
+        assert b"%PDF-1.7 body" in seen["body"]
+        assert b"Content-Type: application/pdf" in seen["body"]
+
+    @pytest.mark.asyncio
+    async def test_prepare_and_write_single_request(self):
+        """Test that mkdir and write are combined into one exec call."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps({"exit_code": 0, "stdout": "", "stderr": ""}).encode()
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                await client.prepare_and_write("/home/gem/a b", "/home/gem/a b/x.txt", "hi")
 
             mock_client.post.assert_called_once()
             call_args = mock_client.post.call_args
-            assert call_args[0][0] == "/files/write"
+            assert _path(call_args[0][0]) == "/v1/shell/exec"
+            command = json.loads(call_args[1]["content"])["command"]
+            assert command.startswith("mkdir -p '/home/gem/a b' && ")
+            assert command.endswith("| base64 -d > '/home/gem/a b/x.txt'")
+
+    @pytest.mark.asyncio
+    async def test_download_file_to_streams(self, tmp_path):
+        """Test streaming a download into a local file."""
+        import httpx
+
+        payload = b"\x00\x01" * 100_000
+
+        def handler(request):
+            assert request.url.params["path"] == "/home/gem/out.bin"
+            return httpx.Response(200, content=payload)
+
+        client = SandboxClient("http://sandbox.test", shared=False)
+        client._client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        target = tmp_path / "out.bin"
+        written = await client.download_file_to("/home/gem/out.bin", target)
+        await client._client.aclose()
+
+        assert written == len(payload)
+        assert target.read_bytes() == payload
+
+    @pytest.mark.asyncio
+    async def test_find_files_ndjson_and_json(self):
+        """Test find/search results from NDJSON streams and plain JSON."""
+        sent = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content)
+            sent.append(body)
+            if request.url.path == "/v1/file/find":
+                lines = b"".join(b'"/f%d.py"\n' % i for i in range(10))
+                return httpx.Response(
+                    200, content=lines, headers={"content-type": "application/x-ndjson"}
+                )
+            matches = [{"file": "/a.py", "line": i} for i in range(5)]
+            return httpx.Response(200, json={"data": {"matches": matches}})
+
+        client = SandboxClient("http://sandbox.test", shared=False)
+        client._client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        try:
+            found = await client.find_files("*.py", max_results=3)
+            matches = await client.search_files("TODO", max_results=2)
+        finally:
+            await client._client.aclose()
+
+        assert found == ["/f0.py", "/f1.py", "/f2.py"]
+        assert matches == [{"file": "/a.py", "line": 0}, {"file": "/a.py", "line": 1}]
+        assert sent[0]["max_results"] == 3
+
+    @pytest.mark.asyncio
+    async def test_read_file_large_uses_raw_download(self):
+        """Test that files above the threshold skip the JSON read endpoint."""
+        big = "x" * 100_000
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append((request.method, request.url.path))
+            path = request.url.params.get("path")
+            if request.method == "HEAD":
+                size = len(big) if path == "/big.txt" else 5
+                return httpx.Response(200, headers={"content-length": str(size)})
+            if request.method == "GET":
+                return httpx.Response(200, content=big.encode())
+            return httpx.Response(200, json={"data": {"content": "small"}})
+
+        client = SandboxClient("http://sandbox.test", shared=False)
+        client._client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        try:
+            assert await client.read_file("/big.txt", prefer_raw_over=65536) == big
+            assert ("POST", "/v1/file/read") not in requests
+            assert await client.read_file("/small.txt", prefer_raw_over=65536) == "small"
+            assert requests[-1] == ("POST", "/v1/file/read")
+
+            # A known size picks the raw download without a HEAD request
+            requests.clear()
+            assert await client.read_file("/big.txt", size=len(big)) == big
+            assert [method for method, _ in requests] == ["GET"]
+        finally:
+            await client._client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_read_file_plain_sends_one_request(self):
+        """Test that a plain read goes straight to the JSON endpoint."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append((request.method, request.url.path))
+            return httpx.Response(200, json={"data": {"content": "small"}})
+
+        async with _mock_sandbox(handler) as client:
+            assert await client.read_file("/small.txt") == "small"
+
+        assert requests == [("POST", "/v1/file/read")]
+
+    @pytest.mark.asyncio
+    async def test_list_files_formats(self):
+        """Test list_files parsing of AIO and generic entry formats."""
+        responses = [
+            {"data": {"files": [
+                {"name": "a", "path": "/a", "is_directory": True, "size": 0},
+                {"name": "b.txt", "path": "/b.txt", "is_directory": False, "size": 5,
+                 "modified_time": "t1"},
+            ]}},
+            {"data": {"files": [
+                {"Name": "c", "Path": "/c", "mode": "drwxr-xr-x"},
+                {"name": "d.txt", "path": "/d.txt", "type": "file", "Size": 7, "modTime": "t2"},
+            ]}},
+        ]
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = [
+                MagicMock(content=json.dumps(body).encode()) for body in responses
+            ]
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                aio = await client.list_files("/")
+                generic = await client.list_files("/")
+
+        assert [(f.name, f.is_dir, f.size, f.modified) for f in aio] == [
+            ("a", True, 0, ""),
+            ("b.txt", False, 5, "t1"),
+        ]
+        assert [(f.name, f.path, f.is_dir, f.size, f.modified) for f in generic] == [
+            ("c", "/c", True, 0, ""),
+            ("d.txt", "/d.txt", False, 7, "t2"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_read_files_bounded_and_ordered(self):
+        """Test that batch reads keep input order and respect concurrency."""
+        import asyncio
+
+        in_flight = 0
+        peak = 0
+
+        async def fake_read(path):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001 * (5 - int(path[-1])))
+            in_flight -= 1
+            return f"content of {path}"
+
+        client = SandboxClient()
+        paths = [f"/f{i}" for i in range(5)]
+        with patch.object(client, "read_file", side_effect=fake_read):
+            contents = await client.read_files(paths, concurrency=2)
+
+        assert contents == [f"content of {p}" for p in paths]
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_exec_batch_splits_results(self):
+        """Test that batched commands are split back per command."""
+        output = (
+            "hi\n\n__OS_DELIM_abc_0_0__\n"
+            "oops\n__OS_DELIM_abc_1_2__\n"
+        )
+        client = SandboxClient()
+        with patch("openskills.sandbox.client.secrets.token_hex", return_value="abc"), \
+                patch.object(client, "exec_command", AsyncMock(
+                    return_value=CommandResult(exit_code=0, stdout=output, stderr="")
+                )) as exec_command:
+            results = await client.exec_batch(["echo hi", "printf oops; exit 2", "true"])
+
+        exec_command.assert_awaited_once()
+        assert [(r.exit_code, r.stdout) for r in results] == [
+            (0, "hi\n"),
+            (2, "oops"),
+            (-1, ""),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_exec_batch_trimmed_output(self):
+        """Test that the last command still counts when the output is trimmed."""
+        output = "hi\n\n__OS_DELIM_abc_0_0__\n\n__OS_DELIM_abc_1_0__"
+        client = SandboxClient()
+        with patch("openskills.sandbox.client.secrets.token_hex", return_value="abc"), \
+                patch.object(client, "exec_command", AsyncMock(
+                    return_value=CommandResult(exit_code=0, stdout=output, stderr="")
+                )):
+            results = await client.exec_batch(["echo hi", "true"])
+
+        assert [(r.exit_code, r.stdout) for r in results] == [(0, "hi\n"), (0, "")]
+
+    @pytest.mark.asyncio
+    async def test_exec_many_streams_ndjson_results(self):
+        """Test that exec_many sends one request and yields streamed results in order."""
+        payloads = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            payloads.append((request.url.path, json.loads(request.content)))
+            body = (
+                b'{"data": {"output": "one", "exit_code": 0}, "success": true}\n'
+                b'{"exit_code": 3, "stdout": "", "stderr": "two"}\n'
+            )
+            return httpx.Response(
+                200, headers={"content-type": "application/x-ndjson"}, content=body
+            )
+
+        async with _mock_sandbox(handler) as client:
+            results = [r async for r in client.exec_many(["echo one", "false"], workdir="/w")]
+
+        assert payloads == [
+            ("/v1/shell/exec-many", {"commands": ["echo one", "false"], "workdir": "/w"})
+        ]
+        assert [(r.exit_code, r.stdout, r.stderr) for r in results] == [
+            (0, "one", ""),
+            (3, "", "two"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_exec_many_falls_back_to_exec_batch(self):
+        """Test that a server without exec-many gets exec_batch, probed only once."""
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            if request.url.path == "/v1/shell/exec-many":
+                return httpx.Response(404)
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "", "stderr": ""})
+
+        async with _mock_sandbox(handler) as client:
+            batched = [CommandResult(0, "a", ""), CommandResult(0, "b", "")]
+            with patch.object(client, "exec_batch", AsyncMock(return_value=batched)) as batch:
+                for _ in range(2):
+                    results = [r async for r in client.exec_many(["a", "b"])]
+                    assert results == batched
+
+        assert paths == ["/v1/shell/exec-many"]
+        assert batch.await_count == 2
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("caps", [["exec-many"], {"exec-many": True, "zero-copy": False}])
+    async def test_supports_reads_cached_capabilities(self, caps):
+        """Test that capability checks share one cached info request."""
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            return httpx.Response(200, json={"data": {"capabilities": caps}})
+
+        async with _mock_sandbox(handler) as client:
+            assert await client.supports("exec-many")
+            assert not await client.supports("zero-copy")
+            assert (await client.get_info()).capabilities == ("exec-many",)
+
+        assert paths == ["/v1/sandbox"]
+
+    @pytest.mark.asyncio
+    async def test_exec_many_skips_unadvertised_endpoint(self):
+        """Test that exec_many goes straight to exec_batch when capabilities omit it."""
+        paths = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            paths.append(request.url.path)
+            return httpx.Response(200, json={"data": {"capabilities": ["other"]}})
+
+        async with _mock_sandbox(handler) as client:
+            assert not await client.supports("exec-many")
+            batched = [CommandResult(0, "a", "")]
+            with patch.object(client, "exec_batch", AsyncMock(return_value=batched)):
+                assert [r async for r in client.exec_many(["a"])] == batched
+
+        assert paths == ["/v1/sandbox"]
+
+    @pytest.mark.asyncio
+    async def test_files_exist_batched_and_cached(self):
+        """Test that existence checks share one exec call and are cached."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps(
+            {"exit_code": 0, "stdout": "1\n0\n", "stderr": ""}
+        ).encode()
+        mock_response.raise_for_status = MagicMock()
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.return_value = mock_response
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            def exec_calls():
+                return sum(
+                    _path(call[0][0]) == "/v1/shell/exec"
+                    for call in mock_client.post.call_args_list
+                )
+
+            async with SandboxClient() as client:
+                found = await client.files_exist(["/a.py", "/b.py"])
+                assert found == {"/a.py": True, "/b.py": False}
+                assert exec_calls() == 1
+
+                # Served from the cache
+                assert not await client.file_exists("/b.py")
+                assert exec_calls() == 1
+
+                # Writing the file invalidates its cache entry
+                await client.write_file("/b.py", "x")
+                await client.file_exists("/b.py")
+                assert exec_calls() == 2
+
+    @pytest.mark.asyncio
+    async def test_file_exists_uses_head(self):
+        """Test that file_exists answers from HEAD and falls back on 405."""
+        import httpx
+
+        head_status = {"/a.txt": 200, "/b.txt": 404}
+        requests = []
+
+        def handler(request):
+            requests.append((request.method, request.url.path))
+            if request.method == "HEAD":
+                status = head_status.get(request.url.params["path"], 405)
+                return httpx.Response(status)
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "1\n"})
+
+        client = SandboxClient("http://sandbox.test", shared=False)
+        client._client = httpx.AsyncClient(
+            base_url="http://sandbox.test", transport=httpx.MockTransport(handler)
+        )
+        client._util_session = ""  # sessionless
+        try:
+            assert await client.file_exists("/a.txt")
+            assert not await client.file_exists("/b.txt")
+            assert all(method == "HEAD" for method, _ in requests)
+
+            # Unsupported HEAD falls back to the shell check, then sticks
+            assert await client.file_exists("/c.txt")
+            assert requests[-1] == ("POST", "/v1/shell/exec")
+            client._stat_cache.clear()
+            await client.file_exists("/a.txt")
+            assert requests[-1] == ("POST", "/v1/shell/exec")
+        finally:
+            await client._client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_head_404_without_download_route_is_not_cached(self):
+        """Test that a 404 is not taken as "missing" before HEAD is known to work."""
+        requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append((request.method, request.url.path))
+            if request.method == "HEAD":
+                return httpx.Response(404)  # no download route at all
+            if request.url.path == "/v1/file/read":
+                return httpx.Response(200, json={"data": {"content": "x"}})
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "1\n", "stderr": ""})
+
+        async with _mock_sandbox(handler) as client:
+            client._util_session = ""  # sessionless
+            assert await client.read_file("/a.txt", prefer_raw_over=65536) == "x"
+            assert "/a.txt" not in client._stat_cache
+            assert await client.file_exists("/a.txt")
+            assert requests[-1] == ("POST", "/v1/shell/exec")
+
+            # A known size skips the HEAD request
+            requests.clear()
+            assert await client.read_file("/b.txt", size=10) == "x"
+            assert requests == [("POST", "/v1/file/read")]
+
+    @pytest.mark.asyncio
+    async def test_utility_session_runs_one_command_at_a_time(self):
+        """Test that concurrent utility commands never share the busy session."""
+        created = []
+        sessions = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            payload = json.loads(request.content)
+            if request.url.path == "/v1/shell/sessions/create":
+                created.append(payload)
+                return httpx.Response(200, json={"data": {"session_id": "s1"}})
+            sessions.append(payload.get("session_id"))
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "", "stderr": ""})
+
+        async with _mock_sandbox(handler) as client:
+            await asyncio.gather(*(client.mkdir(f"/d{i}") for i in range(3)))
+            await client.mkdir("/d3")
+
+        assert created == [{}]  # default working directory
+        # One of the gathered mkdirs gets the session, the others run sessionless
+        assert sorted(sessions[:3], key=str) == [None, None, "s1"]
+        assert sessions[3] == "s1"
+
+    @pytest.mark.asyncio
+    async def test_install_python_packages_command(self):
+        """Test installer probing and the generated install command."""
+        from openskills.sandbox.client import SandboxInfo
+
+        client = SandboxClient()
+        info = SandboxInfo(version="1", home_dir="/home/gem", os="linux", user="gem")
+        exec_command = AsyncMock(return_value=CommandResult(0, "", ""))
+        with patch.object(client, "get_info", AsyncMock(return_value=info)) as get_info, \
+                patch.object(client, "exec_command", exec_command):
+            await client.install_python_packages(["numpy", "pkg[extra]>=1"], upgrade=True)
+            await client.install_python_packages_many([["numpy"], ["numpy", "pandas"]])
+
+        get_info.assert_awaited_once()
+        commands = [call[0][0] for call in exec_command.call_args_list]
+        assert commands == [
+            "pip install --no-input --disable-pip-version-check --quiet -U numpy 'pkg[extra]>=1'",
+            "pip install --no-input --disable-pip-version-check --quiet numpy pandas",
+        ]
+
+        client = SandboxClient()
+        info = SandboxInfo(
+            version="1", home_dir="/home/gem", os="linux", user="gem", available_tools=("uv",)
+        )
+        with patch.object(client, "get_info", AsyncMock(return_value=info)), \
+                patch.object(client, "exec_command", exec_command):
+            await client.install_python_packages(["numpy"])
+        assert exec_command.call_args[0][0] == "uv pip install --system --quiet numpy"
+
+    @pytest.mark.asyncio
+    async def test_utility_commands_reuse_session(self):
+        """Test that mkdir/file checks share one shell session."""
+        def respond(url, **kwargs):
+            response = MagicMock()
+            response.status_code = 200
+            response.raise_for_status = MagicMock()
+            if _path(url) == "/v1/shell/sessions/create":
+                body = {"data": {"session_id": "util-1"}}
+            else:
+                body = {"exit_code": 0, "stdout": "0\n", "stderr": ""}
+            response.content = json.dumps(body).encode()
+            return response
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.post.side_effect = respond
+            mock_client.delete.return_value = MagicMock(status_code=200)
+            mock_client.aclose = AsyncMock()
+            MockClient.return_value = mock_client
+
+            async with SandboxClient() as client:
+                await client.mkdir("/home/gem/out")
+                await client.file_exists("/home/gem/out/a.txt")
+
+            urls = [call[0][0] for call in mock_client.post.call_args_list]
+            assert urls.count("/v1/shell/sessions/create") == 1
+            for call in mock_client.post.call_args_list:
+                if _path(call[0][0]) == "/v1/shell/exec":
+                    assert json.loads(call[1]["content"])["session_id"] == "util-1"
+            mock_client.delete.assert_awaited_once_with("/v1/shell/sessions/util-1")
 
 
 class TestSandboxExecutor:
@@ -200,7 +1099,9 @@ class TestSandboxExecutor:
             mock_client = AsyncMock()
             mock_response = MagicMock()
             mock_response.status_code = 200
-            mock_response.json.return_value = {"exit_code": 0, "stdout": "", "stderr": ""}
+            mock_response.content = json.dumps(
+                {"exit_code": 0, "stdout": "", "stderr": ""}
+            ).encode()
             mock_client.post.return_value = mock_response
             mock_client.aclose = AsyncMock()
             MockClient.return_value = mock_client
@@ -219,7 +1120,7 @@ class TestSandboxExecutor:
 
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {"exit_code": 0, "stdout": "", "stderr": ""}
+        mock_response.content = json.dumps({"exit_code": 0, "stdout": "", "stderr": ""}).encode()
         mock_response.raise_for_status = MagicMock()
 
         with patch("httpx.AsyncClient") as MockClient:
@@ -234,6 +1135,359 @@ class TestSandboxExecutor:
             # Should have 2 commands: pip install and mkdir
             assert len(results) == 2
 
+    @pytest.mark.asyncio
+    async def test_enter_configures_pip_and_warms_up(self):
+        """Test that entering the executor configures pip and warms up python."""
+        client = MagicMock()
+        client.__aenter__ = AsyncMock(return_value=client)
+        client.__aexit__ = AsyncMock()
+        client.mkdir = AsyncMock(return_value=CommandResult(0, "", ""))
+        client.prepare_and_write = AsyncMock()
+        client.exec_command = AsyncMock(return_value=CommandResult(0, "", ""))
+
+        with patch("openskills.sandbox.executor.SandboxClient", return_value=client):
+            async with SandboxExecutor(verbose=False) as executor:
+                await executor._warmup_task
+            assert executor._warmup_task is None
+
+        assert client.exec_command.call_args[0][0].startswith("python3 -c ")
+
+        directory, path, content = client.prepare_and_write.call_args[0]
+        assert path == SandboxExecutor.PIP_CONF_PATH
+        assert path.startswith(directory + "/")
+        assert f"cache-dir = {SandboxExecutor.PIP_CACHE_DIR}" in content
+
+
+    @pytest.mark.asyncio
+    async def test_upload_directory_single_mkdir(self, tmp_path):
+        """Test that a tree is created with one mkdir and files upload concurrently."""
+        (tmp_path / "sub" / "deep").mkdir(parents=True)
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "sub" / "b.txt").write_text("b")
+        (tmp_path / "sub" / "deep" / "c.bin").write_bytes(b"\x00c")
+
+        client = MagicMock()
+        client.exec_command = AsyncMock(return_value=CommandResult(0, "", ""))
+        client.write_file = AsyncMock()
+        executor = SandboxExecutor()
+        executor._client = client
+
+        uploaded = await executor.upload_directory(tmp_path, "skill")
+
+        client.exec_command.assert_awaited_once()
+        command = client.exec_command.call_args[0][0]
+        assert command.startswith("mkdir -p ")
+        assert "/home/gem/skill/sub/deep" in command
+        written = {call[0][0]: call[0][1] for call in client.write_file.call_args_list}
+        assert written == {
+            "/home/gem/skill/a.txt": b"a",
+            "/home/gem/skill/sub/b.txt": b"b",
+            "/home/gem/skill/sub/deep/c.bin": b"\x00c",
+        }
+        assert sorted(uploaded) == sorted(written)
+
+        # Unchanged files are not uploaded again; changed large files are
+        # streamed from disk rather than read
+        client.upload_file = AsyncMock()
+        (tmp_path / "sub" / "deep" / "c.bin").write_bytes(b"\x00changed")
+        with patch.object(SandboxExecutor, "STREAM_UPLOAD_THRESHOLD", 1):
+            await executor.upload_directory(tmp_path, "skill")
+        assert client.write_file.await_count == 3
+        client.upload_file.assert_awaited_once_with(
+            tmp_path / "sub" / "deep" / "c.bin", "/home/gem/skill/sub/deep/c.bin"
+        )
+
+        # Directories created once are not created again
+        await executor.upload_directory(tmp_path, "skill")
+        client.exec_command.assert_awaited_once()
+        await executor._ensure_dir("/home/gem/skill/sub")
+        client.exec_command.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_setup_environment_without_dependencies(self):
+        """Test that an empty dependency runs nothing and marks the executor ready."""
+        client = MagicMock()
+        client.exec_command = AsyncMock()
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+
+        assert await executor.setup_environment(SkillDependency()) == []
+        assert executor._environment_ready
+        assert await executor.setup_environment(None) == []
+        client.exec_command.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_execute_rejects_unsupported_script_type(self, tmp_path):
+        """Test that unknown extensions fail before anything is uploaded."""
+        script = tmp_path / "run.RB"
+        script.write_text("puts 1")
+
+        client = MagicMock()
+        client.write_file = AsyncMock()
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+
+        with pytest.raises(ValueError, match=r"Unsupported script type: \.rb"):
+            await executor.execute(script)
+        client.write_file.assert_not_awaited()
+
+    def test_scan_files(self, tmp_path):
+        """Test the scandir walk used by upload_directory."""
+        (tmp_path / "sub" / "deep").mkdir(parents=True)
+        (tmp_path / "a.txt").write_text("a")
+        (tmp_path / "sub" / "deep" / "b.bin").write_bytes(b"bbb")
+        (tmp_path / "link").symlink_to(tmp_path / "sub", target_is_directory=True)
+
+        found = {rel: size for rel, _, size in SandboxExecutor._scan_files(str(tmp_path))}
+        assert found == {"a.txt": 1, "sub/deep/b.bin": 3}
+
+    @pytest.mark.asyncio
+    async def test_upload_script_skips_unchanged(self, tmp_path):
+        """Test that identical script content is uploaded once."""
+        script = tmp_path / "run.py"
+        script.write_text("print(1)")
+
+        client = MagicMock()
+        client.write_file = AsyncMock()
+        executor = SandboxExecutor()
+        executor._client = client
+
+        await executor.upload_script(script)
+        await executor.upload_script(script)
+        assert client.write_file.await_count == 1
+
+        script.write_text("print(2)")
+        os.utime(script, ns=(0, 10**9))
+        await executor.upload_script(script)
+        assert client.write_file.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_upload_script_reuses_cached_bytes(self, tmp_path):
+        """Test that an unmodified script is not read from disk again."""
+        script = tmp_path / "run.py"
+        script.write_text("print(1)")
+
+        client = MagicMock()
+        client.write_file = AsyncMock()
+        executor = SandboxExecutor()
+        executor._client = client
+
+        await executor.upload_script(script)
+        with patch.object(Path, "read_bytes", side_effect=AssertionError("re-read")):
+            await executor.upload_script(script, remote_name="copy.py")
+        assert client.write_file.call_args[0][1] == b"print(1)"
+
+    @pytest.mark.asyncio
+    async def test_execute_passes_stdin_without_quoting(self, tmp_path):
+        """Test that stdin is base64 piped, or uploaded to a file when large."""
+        import base64
+
+        script = tmp_path / "run.py"
+        script.write_text("import sys; print(sys.stdin.read())")
+
+        client = MagicMock()
+        client.write_file = AsyncMock()
+        client.exec_command = AsyncMock(return_value=CommandResult(0, "ok", ""))
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+
+        await executor.execute(script, input_data="it's $HOME")
+        command = client.exec_command.call_args[0][0]
+        encoded = base64.b64encode(b"it's $HOME\n").decode()
+        assert command == (
+            f"printf '%s\\n' '{encoded}' | base64 -d | python3 /home/gem/scripts/run.py"
+        )
+
+        big = "x" * (SandboxExecutor.MAX_INLINE_STDIN + 1)
+        await executor.execute(script, input_data=big)
+        stdin_path, data = client.write_file.call_args[0]
+        assert data == f"{big}\n".encode()
+        command = client.exec_command.call_args[0][0]
+        assert f"< {stdin_path};" in command
+        assert big not in command
+
+        await executor.execute(script, title="会议", count=2)
+        command = client.exec_command.call_args[0][0]
+        encoded = command.split("'")[3]
+        assert json.loads(base64.b64decode(encoded)) == {"title": "会议", "count": 2}
+
+    @pytest.mark.asyncio
+    async def test_setup_environment_parallel(self):
+        """Test that independent commands overlap with the pip install."""
+        running = 0
+        peak = 0
+
+        async def exec_command(command, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0)
+            running -= 1
+            return CommandResult(0, command, "")
+
+        client = MagicMock()
+        client.exec_command = exec_command
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+
+        dep = SkillDependency(python=["numpy"], system=["a", "b"], parallel=True)
+        results = await executor.setup_environment(dep)
+        assert [r.stdout for r in results] == [dep.get_pip_install_command(), "a", "b"]
+        assert peak == 3
+
+        peak = 0
+        await executor.setup_environment(dep.model_copy(update={"parallel": False}))
+        assert peak == 1
+
+        # Concurrent system commands are bounded; pip runs alongside them
+        peak = 0
+        executor.SETUP_CONCURRENCY = 2
+        await executor.setup_environment(dep.model_copy(update={"system": list("abcdef")}))
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_setup_environment_batches_steps(self, tmp_path, monkeypatch):
+        """Test that sequential steps run as one script with per-step results."""
+        commands = []
+
+        async def exec_command(command, **kwargs):
+            # Run the script in a local shell instead of the sandbox
+            commands.append(command)
+            proc = await asyncio.create_subprocess_exec(
+                "sh", "-c", command,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await proc.communicate()
+            return CommandResult(proc.returncode, stdout.decode(), stderr.decode())
+
+        client = MagicMock()
+        client.exec_command = exec_command
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+        monkeypatch.setattr(SandboxExecutor, "WORKSPACE_DIR", str(tmp_path))
+        monkeypatch.setattr(SandboxExecutor, "DEPS_MARKER_DIR", str(tmp_path / "deps"))
+        monkeypatch.setattr(
+            SkillDependency, "get_pip_install_command",
+            lambda self: "echo pip" if self.python else None,
+        )
+
+        dep = SkillDependency(python=["numpy"], system=["pwd", "echo oops >&2; printf x"])
+        results = await executor.setup_environment(dep)
+
+        assert len(commands) == 1
+        assert [r.stdout for r in results] == ["pip\n", f"{tmp_path}\n", "x"]
+        assert [r.stderr for r in results] == ["", "", "oops\n"]
+
+        dep = SkillDependency(system=["echo one", "echo bad >&2; exit 3", "echo never"])
+        with pytest.raises(SandboxExecutionError) as exc_info:
+            await executor.setup_environment(dep)
+        assert exc_info.value.exit_code == 3
+        assert exc_info.value.stderr == "bad\n"
+
+        commands.clear()
+        await executor.setup_environment(SkillDependency(system=["true"] * 3), batch=False)
+        assert len(commands) == 3
+
+        # A dependency set installed before is skipped after one check
+        commands.clear()
+        dep = SkillDependency(python=["numpy"], system=["echo run >> runs.txt"])
+        assert len(await executor.setup_environment(dep)) == 2
+        executor.logger = MagicMock()
+        assert await executor.setup_environment(dep) == []
+        executor.logger.installing_dependencies.assert_not_called()
+        executor.logger.dependency_installed.assert_not_called()
+        assert len(commands) == 2
+        assert (tmp_path / "runs.txt").read_text() == "run\n"
+        assert (tmp_path / "deps" / dep.cache_key()).exists()
+
+    @pytest.mark.asyncio
+    async def test_setup_environment_batches_with_mixed_output(self, tmp_path, monkeypatch):
+        """Test batched results when stdout and stderr come back as one output (AIO)."""
+
+        async def exec_command(command, **kwargs):
+            proc = await asyncio.create_subprocess_exec(
+                "sh", "-c", command,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+            )
+            output, _ = await proc.communicate()
+            return CommandResult(proc.returncode, output.decode(), "")
+
+        client = MagicMock()
+        client.exec_command = exec_command
+        executor = SandboxExecutor(verbose=False)
+        executor._client = client
+        monkeypatch.setattr(SandboxExecutor, "WORKSPACE_DIR", str(tmp_path))
+        monkeypatch.setattr(SandboxExecutor, "DEPS_MARKER_DIR", str(tmp_path / "deps"))
+
+        results = await executor.setup_environment(
+            SkillDependency(system=["echo a", "echo warn >&2; echo b"])
+        )
+        assert [(r.exit_code, r.stdout) for r in results] == [(0, "a\n"), (0, "warn\nb\n")]
+
+        dep = SkillDependency(system=["echo one", "echo bad >&2; exit 3", "echo never"])
+        with pytest.raises(SandboxExecutionError) as exc_info:
+            await executor.setup_environment(dep)
+        assert exc_info.value.exit_code == 3
+
+class TestSandboxLogger:
+    """Test SandboxLogger."""
+
+    def test_disabled_logger_does_no_work(self):
+        from openskills.sandbox.logger import SandboxLogger
+
+        console = MagicMock()
+        logger = SandboxLogger(console=console, enabled=False)
+        with patch.object(logger, "_print") as print_:
+            logger.download_progress(50)
+            logger.installing_dependencies(["a", "b", "c", "d"])
+        print_.assert_not_called()
+
+        logger.enabled = True
+        logger.info("hello")
+        console.print.assert_called_once()
+
+    def test_timestamp_formatted_once_per_second(self):
+        from openskills.sandbox import logger as logger_module
+
+        logger = logger_module.SandboxLogger(console=MagicMock())
+        with patch.object(logger_module.time, "time", return_value=1_000_000.2), \
+                patch.object(logger_module.time, "strftime", return_value="[x]") as strftime:
+            assert logger._timestamp() == "[x]"
+            assert logger._timestamp() == "[x]"
+        assert strftime.call_count == 1
+
+    def test_buffered_logger_batches_writes(self):
+        import io
+        from openskills.sandbox.logger import SandboxLogger
+
+        out = io.StringIO()
+        out.flush = MagicMock()
+        with patch("sys.stdout", out):
+            logger = SandboxLogger(buffered=True)
+        logger.progress("one")
+        logger.progress("two")
+        assert out.getvalue() == ""
+
+        logger.ready()
+        assert "one" in out.getvalue() and "two" in out.getvalue()
+        out.flush.assert_called()
+
+    def test_buffered_logger_is_not_kept_alive(self):
+        import gc
+        import io
+        import weakref
+        from openskills.sandbox.logger import SandboxLogger
+
+        out = io.StringIO()
+        with patch("sys.stdout", out):
+            logger = SandboxLogger(buffered=True)
+        logger.progress("pending")
+        ref = weakref.ref(logger)
+        del logger
+        gc.collect()
+
+        assert ref() is None
+        assert "pending" in out.getvalue()  # drained when collected
 
 class TestSandboxManager:
     """Test SandboxManager."""
@@ -253,11 +1507,7 @@ class TestSandboxManager:
         def create_mock_executor(*args, **kwargs):
             nonlocal call_count
             call_count += 1
-            mock_executor = AsyncMock()
-            mock_executor.__aenter__ = AsyncMock(return_value=mock_executor)
-            mock_executor.__aexit__ = AsyncMock()
-            mock_executor._id = call_count  # Track which instance
-            return mock_executor
+            return _StubExecutor(call_count)  # Track which instance
 
         with patch("openskills.sandbox.manager.SandboxExecutor", side_effect=create_mock_executor):
             async with SandboxManager(strategy=SandboxStrategy.PER_SKILL) as manager:
@@ -276,10 +1526,7 @@ class TestSandboxManager:
     async def test_persistent_strategy(self):
         """Test PERSISTENT strategy uses single executor."""
         with patch("openskills.sandbox.manager.SandboxExecutor") as MockExecutor:
-            mock_executor = AsyncMock()
-            mock_executor.__aenter__ = AsyncMock(return_value=mock_executor)
-            mock_executor.__aexit__ = AsyncMock()
-            MockExecutor.return_value = mock_executor
+            MockExecutor.return_value = _StubExecutor(1)
 
             async with SandboxManager(strategy=SandboxStrategy.PERSISTENT) as manager:
                 exec1 = await manager.get_executor("skill-a")
@@ -287,6 +1534,203 @@ class TestSandboxManager:
 
             assert exec1 is exec2  # Same instance for all skills
 
+    @pytest.mark.asyncio
+    async def test_executors_share_manager_pool(self):
+        """Test that executors run on one HTTP pool closed with the manager."""
+        with patch("openskills.sandbox.manager.SandboxExecutor") as MockExecutor:
+            MockExecutor.side_effect = lambda **kwargs: AsyncMock(mark_ready=MagicMock())
+
+            async with SandboxManager(strategy=SandboxStrategy.PER_SKILL) as manager:
+                await manager.get_executor("skill-a")
+                await manager.get_executor("skill-b")
+                pool = manager._http
+
+            clients = [call.kwargs["http_client"] for call in MockExecutor.call_args_list]
+            assert clients == [pool, pool]
+            assert pool.is_closed
+            assert manager._http is None
+
+    @pytest.mark.asyncio
+    async def test_per_skill_setup_does_not_block_other_skills(self):
+        """Test that a slow setup only serializes callers of the same skill."""
+        release = asyncio.Event()
+
+        async def slow_setup(dependency):
+            await release.wait()
+
+        def create_mock_executor(*args, **kwargs):
+            mock_executor = MagicMock()
+            mock_executor.__aenter__ = AsyncMock(return_value=mock_executor)
+            mock_executor.__aexit__ = AsyncMock()
+            mock_executor.setup_environment = AsyncMock(side_effect=slow_setup)
+            return mock_executor
+
+        slow_dep = SkillDependency(python=["numpy"])
+        with patch("openskills.sandbox.manager.SandboxExecutor", side_effect=create_mock_executor):
+            async with SandboxManager(strategy=SandboxStrategy.PER_SKILL) as manager:
+                slow = asyncio.create_task(manager.get_executor("skill-a", slow_dep))
+                slow_again = asyncio.create_task(manager.get_executor("skill-a", slow_dep))
+                await asyncio.sleep(0)
+
+                other = await asyncio.wait_for(manager.get_executor("skill-b"), 1.0)
+                assert not slow.done()
+
+                release.set()
+                exec_a, exec_a_again = await asyncio.gather(slow, slow_again)
+
+            assert exec_a is exec_a_again
+            assert exec_a is not other
+
+    @pytest.mark.asyncio
+    async def test_persistent_strategy_dedupes_dependency_installs(self, tmp_path):
+        """Test that identical dependency sets are installed once, across restarts."""
+        dep_a = SkillDependency(python=["numpy", "pandas"])
+        dep_b = SkillDependency(python=["pandas", "numpy"])
+        dep_c = SkillDependency(python=["requests"])
+        cache = tmp_path / "installed_deps.json"
+
+        with patch("openskills.sandbox.manager.SandboxExecutor") as MockExecutor:
+            mock_executor = MagicMock()
+            mock_executor.__aenter__ = AsyncMock(return_value=mock_executor)
+            mock_executor.__aexit__ = AsyncMock()
+            mock_executor.setup_environment = AsyncMock()
+            MockExecutor.return_value = mock_executor
+
+            manager = SandboxManager(strategy=SandboxStrategy.PERSISTENT, dep_cache_path=cache)
+            async with manager:
+                await manager.get_executor("skill-a", dep_a)
+                await manager.get_executor("skill-b", dep_b)
+                await manager.get_executor("skill-c", dep_c)
+            assert mock_executor.setup_environment.await_count == 2
+
+            # A new manager against the same sandbox skips both installs
+            manager = SandboxManager(strategy=SandboxStrategy.PERSISTENT, dep_cache_path=cache)
+            async with manager:
+                await manager.get_executor("skill-a", dep_a)
+                await manager.get_executor("skill-c", dep_c)
+            assert mock_executor.setup_environment.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_health_check_reuses_probe_client(self):
+        """Test that health checks share one client until cleanup."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+
+        with patch("httpx.AsyncClient") as MockClient:
+            mock_client = AsyncMock()
+            mock_client.get.return_value = mock_response
+            mock_client.is_closed = False
+            MockClient.return_value = mock_client
+
+            async with SandboxManager(base_url="http://probe.test") as manager:
+                assert await manager.health_check()
+                assert await manager.health_check()
+                assert manager._probe_client is not None
+            assert manager._probe_client is None
+
+        assert MockClient.call_count == 1
+        assert mock_client.get.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_per_skill_concurrent_requests_create_once(self):
+        """Test that concurrent requests create one executor per skill, in parallel."""
+        created = []
+        running = peak = 0
+
+        async def enter():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        def create_mock_executor(**kwargs):
+            executor = AsyncMock(mark_ready=MagicMock())
+            executor.__aenter__.side_effect = enter
+            created.append(executor)
+            return executor
+
+        with patch("openskills.sandbox.manager.SandboxExecutor", side_effect=create_mock_executor):
+            async with SandboxManager(cache_size=20) as manager:
+                skills = [f"skill-{i % 20}" for i in range(100)]
+                executors = await asyncio.gather(*(manager.get_executor(s) for s in skills))
+
+        assert len(created) == 20
+        assert peak == 20  # Distinct skills are set up concurrently
+        assert all(executors[i] is executors[i % 20] for i in range(100))
+
+    @pytest.mark.asyncio
+    async def test_prewarm_creates_executors_concurrently(self):
+        """Test that prewarm sets up distinct skills in parallel, within the bound."""
+        created = []
+        running = peak = 0
+
+        async def enter():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        def create_mock_executor(**kwargs):
+            executor = AsyncMock(mark_ready=MagicMock())
+            executor.__aenter__.side_effect = enter
+            created.append(executor)
+            return executor
+
+        with patch("openskills.sandbox.manager.SandboxExecutor", side_effect=create_mock_executor):
+            async with SandboxManager() as manager:
+                executors = await manager.prewarm(["a", "b", "c", "d", "a"])
+                assert peak == 4
+                assert executors[0] is executors[4]
+                assert set(manager.get_cache_info()["cached_skills"]) == {"a", "b", "c", "d"}
+
+                peak = 0
+                await manager.prewarm(["e", "f", "g", "h"], concurrency=2)
+                assert peak == 2
+
+            async with SandboxManager(strategy=SandboxStrategy.PER_EXECUTION) as manager:
+                assert await manager.prewarm(["a", "b"]) == []
+
+        assert len(created) == 8
+
+    @pytest.mark.asyncio
+    async def test_per_skill_lru_eviction(self):
+        """Test that hits skip the locks and the least recently used executor is evicted."""
+        with patch("openskills.sandbox.manager.SandboxExecutor") as MockExecutor:
+            MockExecutor.side_effect = lambda **kwargs: AsyncMock(mark_ready=MagicMock())
+
+            async with SandboxManager(cache_size=2) as manager:
+                a = await manager.get_executor("a")
+                await manager.get_executor("b")
+                async with manager._meta_lock:
+                    # Served from the cache while the lock is held
+                    assert await manager.get_executor("a") is a
+                await manager.get_executor("c")
+
+                assert manager.get_cache_info()["cached_skills"] == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_evicted_executor_leaves_pool_open(self):
+        """Test that evicting an executor keeps the manager's connection pool."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(200, json={"exit_code": 0, "stdout": "", "stderr": ""})
+
+        def create_pool(base_url, timeout):
+            return httpx.AsyncClient(base_url=base_url, transport=httpx.MockTransport(handler))
+
+        with patch("openskills.sandbox.manager.create_http_client", side_effect=create_pool):
+            async with SandboxManager(cache_size=1, verbose=False) as manager:
+                pool = manager._http
+                first = await manager.get_executor("a")
+                second = await manager.get_executor("b")  # Evicts "a"
+
+                assert first._client is None
+                assert second._client._client is pool
+                assert not pool.is_closed
+
+        assert pool.is_closed
+
     def test_get_cache_info(self):
         """Test cache info reporting."""
         manager = SandboxManager(strategy=SandboxStrategy.PER_SKILL, cache_size=5)